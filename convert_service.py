@@ -0,0 +1,557 @@
+from flask import Flask, request, send_file, jsonify
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import subprocess
+import hashlib
+import signal
+import json
+import threading
+import tempfile
+import shutil
+import zipfile
+import uuid
+import math
+import time
+import io
+import os
+import re
+
+app = Flask(__name__)
+
+# Conversion worker settings (override with environment variables)
+CONVERTER_WORKERS = int(os.getenv('CONVERTER_WORKERS', '2'))
+JOB_TTL_SECONDS = int(os.getenv('CONVERTER_JOB_TTL_SECONDS', '900'))
+
+# Admission control: at most CONVERTER_WORKERS conversions run and
+# MAX_QUEUE_DEPTH more wait; anything beyond that is rejected with 429
+MAX_QUEUE_DEPTH = int(os.getenv('CONVERTER_MAX_QUEUE_DEPTH', '8'))
+MAX_UPLOAD_MB = int(os.getenv('CONVERTER_MAX_UPLOAD_MB', '20'))
+app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_MB * 1024 * 1024
+
+# Output formats a single request may ask for (form field "formats")
+SUPPORTED_FORMATS = ('rtf', 'pdf', 'odt')
+OUTPUT_MIMETYPES = {
+    'rtf': 'application/rtf',
+    'pdf': 'application/pdf',
+    'odt': 'application/vnd.oasis.opendocument.text',
+}
+
+# Watchdog: a job whose LibreOffice runs (one per requested format) take
+# longer than this in total is killed. An input killed
+# DEAD_LETTER_AFTER_FAILURES times in a row is recorded in the dead-letter file
+# and rejected straight away until its entry expires or an admin deletes it.
+# Clients send byte-identical DOCX files for identical exams, so the content
+# hash is a stable key across resubmissions.
+CONVERSION_TIMEOUT_SECONDS = int(os.getenv('CONVERTER_TIMEOUT_SECONDS', '120'))
+DEAD_LETTER_AFTER_FAILURES = int(os.getenv('CONVERTER_DEAD_LETTER_AFTER_FAILURES', '2'))
+DEAD_LETTER_TTL_SECONDS = int(os.getenv('CONVERTER_DEAD_LETTER_TTL_HOURS', '24')) * 3600
+DEAD_LETTER_PATH = os.getenv(
+    'CONVERTER_DEAD_LETTER_PATH',
+    os.path.join(tempfile.gettempdir(), 'converter-dead-letter.jsonl')
+)
+
+# All conversions (synchronous and job based) run on this pool so the number
+# of concurrent LibreOffice processes never exceeds CONVERTER_WORKERS
+_executor = ThreadPoolExecutor(max_workers=CONVERTER_WORKERS, thread_name_prefix='convert-worker')
+
+# In-memory job registry: job_id -> job dict
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+# Conversions currently queued or running: content hash -> flight dict
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+# Moving average of conversion time, used to suggest Retry-After values
+_avg_conversion_seconds = 5.0
+
+# Inputs that hung or crashed LibreOffice: content hash -> dead-letter record
+_dead_letters = {}
+_dead_letters_lock = threading.Lock()
+
+# Consecutive watchdog kills per content hash not yet dead-lettered
+_failure_counts = {}
+
+class ConverterBusy(Exception):
+    """Raised when the admission queue is full"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Converter busy, retry after {retry_after} seconds")
+        self.retry_after = retry_after
+
+class ConversionKilled(Exception):
+    """Raised when the watchdog kills a LibreOffice run, or LibreOffice crashes"""
+
+class PoisonInput(Exception):
+    """Raised when an upload matches a dead-lettered input"""
+
+def load_dead_letters():
+    """Load unexpired poison inputs from DEAD_LETTER_PATH"""
+    now = time.time()
+    try:
+        with open(DEAD_LETTER_PATH, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    if record.get('expires_at', 0) > now:
+                        _dead_letters[record['content_hash']] = record
+                except (ValueError, KeyError):
+                    continue
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"Warning: Could not read dead-letter file: {e}")
+
+def save_dead_letters():
+    """Rewrite DEAD_LETTER_PATH with the current entries (caller holds _dead_letters_lock)"""
+    try:
+        with open(DEAD_LETTER_PATH, 'w', encoding='utf-8') as f:
+            for record in _dead_letters.values():
+                f.write(json.dumps(record) + '\n')
+    except Exception as e:
+        print(f"Warning: Could not write dead-letter file: {e}")
+
+def purge_expired_dead_letters():
+    """Drop dead-letter entries past their TTL (caller holds _dead_letters_lock)"""
+    now = time.time()
+    expired = [content_hash for content_hash, record in _dead_letters.items()
+               if record['expires_at'] <= now]
+    for content_hash in expired:
+        del _dead_letters[content_hash]
+    if expired:
+        save_dead_letters()
+
+def find_dead_letter(content_hash):
+    """The unexpired dead-letter record for an input, or None"""
+    with _dead_letters_lock:
+        purge_expired_dead_letters()
+        return _dead_letters.get(content_hash)
+
+def record_failure(content_hash, size, reason):
+    """Count a watchdog kill; dead-letter the input once it reaches DEAD_LETTER_AFTER_FAILURES"""
+    with _dead_letters_lock:
+        failures = _failure_counts.get(content_hash, 0) + 1
+        if failures < DEAD_LETTER_AFTER_FAILURES:
+            _failure_counts[content_hash] = failures
+            print(f"Input {content_hash[:12]} killed ({failures} of {DEAD_LETTER_AFTER_FAILURES}): {reason}")
+            return
+
+        _failure_counts.pop(content_hash, None)
+        now = time.time()
+        _dead_letters[content_hash] = {
+            'content_hash': content_hash,
+            'size': size,
+            'reason': reason,
+            'failures': failures,
+            'recorded_at': datetime.fromtimestamp(now, timezone.utc).isoformat(),
+            'expires_at': now + DEAD_LETTER_TTL_SECONDS,
+        }
+        save_dead_letters()
+    print(f"Dead-lettered input {content_hash[:12]} after {failures} failures: {reason}")
+
+def record_success(content_hash):
+    """Reset the failure count of an input that converted"""
+    with _dead_letters_lock:
+        _failure_counts.pop(content_hash, None)
+
+def clean_rtf_content(rtf_path):
+    """Clean up RTF content to fix encoding and formatting issues"""
+    try:
+        # Read the RTF file
+        with open(rtf_path, 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+
+        # Fix common encoding issues
+        content = content.replace('â€™', "'")  # Fix apostrophes
+        content = content.replace('â€œ', '"')  # Fix opening quotes
+        content = content.replace('â€', '"')   # Fix closing quotes
+        content = content.replace('â€"', '—')  # Fix em dash
+        content = content.replace('â€"', '–')  # Fix en dash
+        content = content.replace('Â', '')     # Remove unwanted Â characters
+
+        # Clean up excessive RTF formatting codes that can cause display issues
+        # Remove some problematic RTF codes while keeping basic formatting
+        content = re.sub(r'\\lang\d+', '', content)  # Remove language codes
+        content = re.sub(r'\\f\d+', '', content)     # Remove font references
+
+        # Write cleaned content back
+        with open(rtf_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+    except Exception as e:
+        print(f"Warning: Could not clean RTF content: {e}")
+        # Continue anyway with original file
+
+def get_worker_profile_dir():
+    """Return a LibreOffice user profile directory private to the current worker thread.
+
+    LibreOffice refuses to run two instances against the same profile, so each
+    worker keeps its own profile and reuses it between conversions.
+    """
+    worker_name = threading.current_thread().name
+    return os.path.join(tempfile.gettempdir(), f"lo-profile-{worker_name}")
+
+def reset_worker_profile():
+    """Throw away the current worker's LibreOffice profile so the next run starts clean"""
+    shutil.rmtree(get_worker_profile_dir(), ignore_errors=True)
+
+def run_libreoffice_conversion(input_path, output_dir, target_format='rtf',
+                               timeout=CONVERSION_TIMEOUT_SECONDS):
+    """Run LibreOffice headless on input_path and return the path of the converted file.
+
+    LibreOffice runs in its own process group so the watchdog can kill it
+    together with any helper processes it forked once ``timeout`` seconds pass.
+    """
+    process = subprocess.Popen([
+        'libreoffice',
+        f"-env:UserInstallation=file://{get_worker_profile_dir()}",
+        '--headless',
+        '--convert-to',
+        target_format,
+        '--outdir',
+        output_dir,
+        input_path
+    ], start_new_session=True)
+
+    try:
+        returncode = process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        process.wait()
+        # A killed instance can leave a locked or corrupt profile behind
+        reset_worker_profile()
+        raise ConversionKilled(f"LibreOffice exceeded the {CONVERSION_TIMEOUT_SECONDS} second job deadline")
+
+    if returncode < 0:
+        reset_worker_profile()
+        raise ConversionKilled(f"LibreOffice crashed with signal {-returncode}")
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, 'libreoffice')
+
+    # LibreOffice creates output with same name as input
+    base_name = os.path.splitext(os.path.basename(input_path))[0]
+    return os.path.join(output_dir, f"{base_name}.{target_format}")
+
+def convert_docx_bytes(docx_bytes, formats=('rtf',)):
+    """Convert DOCX bytes to every requested format and return {format: bytes}.
+
+    The upload is written once and all outputs are produced by the same worker
+    in one working directory, reusing that worker's warm LibreOffice profile.
+    The runs share one CONVERSION_TIMEOUT_SECONDS deadline, so a job takes no
+    longer than that however many formats it asks for.
+    """
+    deadline = time.monotonic() + CONVERSION_TIMEOUT_SECONDS
+    work_dir = tempfile.mkdtemp(prefix='convert-')
+    try:
+        docx_path = os.path.join(work_dir, 'input.docx')
+        with open(docx_path, 'wb') as f:
+            f.write(docx_bytes)
+
+        outputs = {}
+        for target_format in formats:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise ConversionKilled(f"LibreOffice exceeded the {CONVERSION_TIMEOUT_SECONDS} second job deadline")
+            output_path = run_libreoffice_conversion(docx_path, work_dir, target_format, remaining)
+
+            if target_format == 'rtf':
+                # Clean up the RTF content to fix encoding issues
+                clean_rtf_content(output_path)
+
+            with open(output_path, 'rb') as f:
+                outputs[target_format] = f.read()
+        return outputs
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def convert_docx_bytes_to_rtf(docx_bytes):
+    """Convert DOCX bytes to cleaned RTF bytes in a private working directory"""
+    return convert_docx_bytes(docx_bytes, ('rtf',))['rtf']
+
+def parse_formats(form):
+    """Read the requested output formats from a form ("rtf,pdf" or repeated fields)"""
+    requested = []
+    for value in form.getlist('formats'):
+        requested.extend(part.strip().lower() for part in value.split(',') if part.strip())
+    if not requested:
+        return ('rtf',)
+
+    unsupported = [fmt for fmt in requested if fmt not in SUPPORTED_FORMATS]
+    if unsupported:
+        raise ValueError(f"Unsupported format(s): {', '.join(unsupported)}. "
+                         f"Choose from: {', '.join(SUPPORTED_FORMATS)}")
+
+    # Keep request order but drop duplicates
+    return tuple(dict.fromkeys(requested))
+
+def build_output_response(outputs, formats):
+    """Send a single output as-is, or several outputs as one ZIP archive"""
+    if len(formats) == 1:
+        target_format = formats[0]
+        return send_file(io.BytesIO(outputs[target_format]), mimetype=OUTPUT_MIMETYPES[target_format],
+                         as_attachment=True, download_name=f"converted.{target_format}")
+
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w') as zf:
+        for target_format in formats:
+            # PDF and ODT are already compressed; only RTF benefits from deflate
+            compression = zipfile.ZIP_DEFLATED if target_format == 'rtf' else zipfile.ZIP_STORED
+            zf.writestr(f"converted.{target_format}", outputs[target_format], compress_type=compression)
+    archive.seek(0)
+    return send_file(archive, mimetype='application/zip',
+                     as_attachment=True, download_name='converted.zip')
+
+def submit_conversion(docx_bytes, formats=('rtf',)):
+    """Start converting docx_bytes, or join an identical conversion already in flight.
+
+    Returns (flight, coalesced). The flight dict is shared by every caller with
+    the same content hash and formats, so a burst of uploads of one document
+    costs a single LibreOffice run.
+    """
+    content_hash = hashlib.sha256(docx_bytes).hexdigest()
+
+    dead_letter = find_dead_letter(content_hash)
+    if dead_letter is not None:
+        raise PoisonInput(
+            f"This document previously hung the converter "
+            f"({dead_letter['reason']}); re-save it in Word and try again"
+        )
+
+    flight_key = f"{content_hash}:{'+'.join(formats)}"
+
+    with _inflight_lock:
+        flight = _inflight.get(flight_key)
+        if flight is not None:
+            flight['waiters'] += 1
+            return flight, True
+
+        # Joining an existing flight is free; new LibreOffice work must fit the queue
+        if len(_inflight) >= CONVERTER_WORKERS + MAX_QUEUE_DEPTH:
+            raise ConverterBusy(estimate_retry_after())
+
+        flight = {
+            'content_hash': content_hash,
+            'formats': formats,
+            'started_at': None,
+            'finished_at': None,
+            'waiters': 1,
+            'size': len(docx_bytes),
+        }
+
+        def run():
+            flight['started_at'] = time.time()
+            return convert_docx_bytes(docx_bytes, formats)
+
+        flight['future'] = _executor.submit(run)
+        _inflight[flight_key] = flight
+
+    def finish(future):
+        global _avg_conversion_seconds
+        flight['finished_at'] = time.time()
+        if flight['started_at'] is not None:
+            duration = flight['finished_at'] - flight['started_at']
+            _avg_conversion_seconds = 0.8 * _avg_conversion_seconds + 0.2 * duration
+        with _inflight_lock:
+            if _inflight.get(flight_key) is flight:
+                del _inflight[flight_key]
+        error = future.exception()
+        if error is None:
+            record_success(content_hash)
+        elif isinstance(error, ConversionKilled):
+            record_failure(content_hash, flight['size'], str(error))
+        else:
+            print(f"Conversion {content_hash[:12]} failed: {error}")
+
+    flight['future'].add_done_callback(finish)
+    return flight, False
+
+def estimate_retry_after():
+    """Seconds until a queue slot is likely to free up (one average conversion)"""
+    return max(1, math.ceil(_avg_conversion_seconds))
+
+def busy_response(error):
+    """429 response telling the client when to retry"""
+    response = jsonify({'error': str(error), 'retry_after': error.retry_after})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
+def purge_expired_jobs():
+    """Drop finished jobs whose results have not been collected within JOB_TTL_SECONDS"""
+    cutoff = time.time() - JOB_TTL_SECONDS
+    with _jobs_lock:
+        expired = [
+            job_id for job_id, job in _jobs.items()
+            if job['flight']['finished_at'] is not None and job['flight']['finished_at'] < cutoff
+        ]
+        for job_id in expired:
+            del _jobs[job_id]
+
+def job_status(job):
+    """Derive a job's status from its underlying conversion"""
+    flight = job['flight']
+    future = flight['future']
+    if not future.done():
+        return 'running' if flight['started_at'] is not None else 'queued'
+    return 'failed' if future.exception() is not None else 'done'
+
+def job_status_payload(job):
+    """Public JSON view of a job (never includes the result bytes)"""
+    def iso(timestamp):
+        return datetime.fromtimestamp(timestamp, timezone.utc).isoformat() if timestamp else None
+
+    flight = job['flight']
+    status = job_status(job)
+    payload = {
+        'job_id': job['id'],
+        'status': status,
+        'content_hash': flight['content_hash'],
+        'formats': list(flight['formats']),
+        'coalesced': job['coalesced'],
+        'submitted_at': iso(job['submitted_at']),
+        'started_at': iso(flight['started_at']),
+        'finished_at': iso(flight['finished_at']),
+        'status_url': f"/jobs/{job['id']}",
+    }
+    if status == 'done':
+        payload['result_url'] = f"/jobs/{job['id']}/result"
+    elif status == 'failed':
+        payload['error'] = str(flight['future'].exception())
+    return payload
+
+@app.route('/health', methods=['GET'])
+def health():
+    with _inflight_lock:
+        in_flight = len(_inflight)
+    return {
+        'status': 'healthy',
+        'service': 'LibreOffice Converter',
+        'in_flight': in_flight,
+        'capacity': CONVERTER_WORKERS + MAX_QUEUE_DEPTH,
+        'dead_letters': len(_dead_letters),
+    }
+
+@app.route('/dead-letters', methods=['GET'])
+def dead_letters():
+    """List inputs that hung or crashed LibreOffice"""
+    with _dead_letters_lock:
+        purge_expired_dead_letters()
+        return jsonify(list(_dead_letters.values()))
+
+@app.route('/dead-letters', methods=['DELETE'])
+def clear_dead_letters():
+    """Forget every dead-lettered input"""
+    with _dead_letters_lock:
+        cleared = len(_dead_letters)
+        _dead_letters.clear()
+        _failure_counts.clear()
+        save_dead_letters()
+    return jsonify({'cleared': cleared})
+
+@app.route('/dead-letters/<content_hash>', methods=['DELETE'])
+def delete_dead_letter(content_hash):
+    """Forget one dead-lettered input so it can be converted again"""
+    with _dead_letters_lock:
+        _failure_counts.pop(content_hash, None)
+        if _dead_letters.pop(content_hash, None) is None:
+            return jsonify({'error': 'Unknown dead-letter entry'}), 404
+        save_dead_letters()
+    return jsonify({'cleared': 1})
+
+@app.errorhandler(413)
+def upload_too_large(error):
+    return jsonify({'error': f"Upload exceeds {MAX_UPLOAD_MB} MB limit"}), 413
+
+@app.route('/convert', methods=['POST'])
+def convert():
+    if 'file' not in request.files:
+        return jsonify({'error': "Missing 'file' upload"}), 400
+
+    try:
+        formats = parse_formats(request.form)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    docx_bytes = request.files['file'].read()
+
+    try:
+        flight, _ = submit_conversion(docx_bytes, formats)
+        outputs = flight['future'].result()
+    except ConverterBusy as e:
+        return busy_response(e)
+    except PoisonInput as e:
+        return jsonify({'error': str(e)}), 422
+    except Exception as e:
+        return jsonify({'error': f"Conversion failed: {e}"}), 500
+
+    return build_output_response(outputs, formats)
+
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    """Queue a DOCX for conversion and return immediately with a job id"""
+    if 'file' not in request.files:
+        return jsonify({'error': "Missing 'file' upload"}), 400
+
+    try:
+        formats = parse_formats(request.form)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    purge_expired_jobs()
+
+    docx_bytes = request.files['file'].read()
+    try:
+        flight, coalesced = submit_conversion(docx_bytes, formats)
+    except ConverterBusy as e:
+        return busy_response(e)
+    except PoisonInput as e:
+        return jsonify({'error': str(e)}), 422
+
+    job_id = uuid.uuid4().hex
+    job = {
+        'id': job_id,
+        'submitted_at': time.time(),
+        'flight': flight,
+        'coalesced': coalesced,
+    }
+    with _jobs_lock:
+        _jobs[job_id] = job
+
+    response = jsonify(job_status_payload(job))
+    response.status_code = 202
+    response.headers['Location'] = f"/jobs/{job_id}"
+    return response
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Report the status of a conversion job"""
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job is None:
+            return jsonify({'error': 'Unknown or expired job'}), 404
+        return jsonify(job_status_payload(job))
+
+@app.route('/jobs/<job_id>/result', methods=['GET'])
+def get_job_result(job_id):
+    """Download the output of a finished conversion job (ZIP when several formats were requested)"""
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job is None:
+            return jsonify({'error': 'Unknown or expired job'}), 404
+        status = job_status(job)
+        if status == 'failed':
+            return jsonify(job_status_payload(job)), 500
+        if status != 'done':
+            return jsonify(job_status_payload(job)), 409
+        outputs = job['flight']['future'].result()
+        formats = job['flight']['formats']
+
+    return build_output_response(outputs, formats)
+
+load_dead_letters()
+
+if __name__ == '__main__':
+    app.run(host='0.0.0.0', port=5000, threaded=True)
@@ -0,0 +1,139 @@
+# Lightweight answer key reader for XLSX, ODS, CSV and TXT files
+# Streams the first sheet row by row and picks the answer column in the same
+# pass, so a one-column answer key never needs pandas or a full workbook load.
+
+import io
+import re
+import csv
+import zipfile
+import xml.etree.ElementTree as ET
+
+from input_decoding import detect_stream_encoding
+
+# A cell that looks like a multiple-choice answer
+ANSWER_PATTERN = re.compile(r'^[A-Da-d]$')
+
+# Only the leftmost columns are considered when looking for the answer column
+MAX_COLUMNS = 10
+
+# Stop reading once this many rows in a row have no answer-like cell
+MAX_TRAILING_ROWS = 25
+
+class AnswerKeyError(Exception):
+    """Raised when an answer key file cannot be read"""
+
+def _cell_text(value):
+    """Normalize a cell value to a stripped string ('' for empty cells)"""
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+def iter_xlsx_rows(source):
+    """Yield the first worksheet's rows as lists of strings using openpyxl read-only mode"""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise AnswerKeyError("Excel answer keys require 'openpyxl'. Please convert to CSV or TXT format.")
+
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        for row in sheet.iter_rows(max_col=MAX_COLUMNS, values_only=True):
+            yield [_cell_text(value) for value in row]
+    finally:
+        workbook.close()
+
+def iter_ods_rows(source):
+    """Yield the first sheet's rows from an ODS content.xml as lists of strings"""
+    from stream_extractors import iter_ods_rows as iter_ods_sheet_rows
+    return iter_ods_sheet_rows(source, max_columns=MAX_COLUMNS)
+
+def iter_csv_rows(source):
+    """Yield rows from a CSV byte stream as lists of strings"""
+    text_stream = io.TextIOWrapper(source, encoding=detect_stream_encoding(source), errors='replace', newline='')
+    try:
+        for row in csv.reader(text_stream):
+            yield [_cell_text(value) for value in row[:MAX_COLUMNS]]
+    finally:
+        text_stream.detach()
+
+def iter_txt_rows(source):
+    """Yield each line of a plain-text answer key as a one-cell row"""
+    text_stream = io.TextIOWrapper(source, encoding=detect_stream_encoding(source), errors='replace')
+    try:
+        for line in text_stream:
+            yield [line.strip()]
+    finally:
+        text_stream.detach()
+
+def find_answer_column(rows):
+    """Collect each column's non-empty cells in one pass and return the answer column.
+
+    The first column where at least half of the non-empty cells look like
+    answers (A-D) wins; header cells above the first answer are dropped. Falls
+    back to the first column when no column qualifies. Reading stops once
+    MAX_TRAILING_ROWS rows in a row contain no answer-like cell.
+    """
+    columns = []        # non-empty cell values per column
+    answer_counts = []  # answer-like cells per column
+    first_answer = []   # index into columns[i] of the first answer-like cell
+    rows_since_answer = 0
+    seen_answer = False
+
+    for row in rows:
+        row_has_answer = False
+        for index, value in enumerate(row):
+            if index >= len(columns):
+                columns.append([])
+                answer_counts.append(0)
+                first_answer.append(None)
+            if not value:
+                continue
+            if ANSWER_PATTERN.match(value):
+                if first_answer[index] is None:
+                    first_answer[index] = len(columns[index])
+                answer_counts[index] += 1
+                row_has_answer = True
+            columns[index].append(value)
+
+        if row_has_answer:
+            seen_answer = True
+            rows_since_answer = 0
+        elif seen_answer:
+            rows_since_answer += 1
+            if rows_since_answer >= MAX_TRAILING_ROWS:
+                break
+
+    for index, values in enumerate(columns):
+        if answer_counts[index] and answer_counts[index] >= max(1, len(values) // 2):
+            return values[first_answer[index]:]
+
+    return columns[0] if columns else []
+
+def read_answer_key(source, filename):
+    """Read an answer key file and return the list of answers.
+
+    ``source`` is a binary file object (an upload or ``io.BytesIO``); the file
+    type is taken from ``filename``. Raises AnswerKeyError for unsupported or
+    unreadable files.
+    """
+    name = filename.lower()
+    if name.endswith(('.xlsx', '.xlsm')):
+        rows = iter_xlsx_rows(source)
+    elif name.endswith('.ods'):
+        rows = iter_ods_rows(source)
+    elif name.endswith('.csv'):
+        rows = iter_csv_rows(source)
+    elif name.endswith('.txt'):
+        rows = iter_txt_rows(source)
+    else:
+        raise AnswerKeyError(f"Unsupported answer key file type: {filename}")
+
+    try:
+        return find_answer_column(rows)
+    except AnswerKeyError:
+        raise
+    except (zipfile.BadZipFile, KeyError, ET.ParseError) as e:
+        raise AnswerKeyError(f"Could not read {filename}: {e}")
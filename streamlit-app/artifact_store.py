@@ -0,0 +1,211 @@
+# Process-wide store for generated files (DOCX, RTF) and large texts
+# Session state keeps small ArtifactHandles instead of the bytes themselves.
+# Artifacts are content-addressed, so sessions producing the same file share
+# one copy. Past the memory cap the least recently used artifacts spill to a
+# local directory, and artifacts nobody has read for ARTIFACT_TTL_MINUTES are
+# dropped, which releases the memory of idle sessions.
+
+import os
+import json
+import time
+import atexit
+import shutil
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+
+# Artifact bytes kept in memory before spilling to disk
+ARTIFACT_MEMORY_BYTES = int(os.getenv('ARTIFACT_STORE_MB', '128')) * 1024 * 1024
+
+# Spilled artifact bytes kept on disk before the oldest are dropped
+ARTIFACT_DISK_BYTES = int(os.getenv('ARTIFACT_DISK_MB', '1024')) * 1024 * 1024
+
+# Artifacts not read for this long are dropped
+ARTIFACT_TTL_SECONDS = int(os.getenv('ARTIFACT_TTL_MINUTES', '120')) * 60
+
+# Parent directory for spill files (system temp dir when unset)
+ARTIFACT_SPILL_DIR = os.getenv('ARTIFACT_SPILL_DIR') or None
+
+# Fields of a processed-data record that are stored as artifacts, with their kind
+ARTIFACT_FIELDS = {
+    'instructions_text': 'text',
+    'instructions_docx': 'bytes',
+    'questions_list': 'json',
+    'exam_rtf_content': 'text',
+    'exam_rtf_bytes': 'bytes',
+    'exam_docx': 'bytes',
+}
+
+class ArtifactExpired(KeyError):
+    """An artifact was evicted (idle past its TTL or pushed out of the disk cap)"""
+
+class ArtifactHandle:
+    """Reference to a stored artifact; cheap to keep in session state"""
+
+    __slots__ = ('digest', 'kind', 'size')
+
+    def __init__(self, digest, kind, size):
+        self.digest = digest
+        self.kind = kind
+        self.size = size
+
+    def __repr__(self):
+        return f"ArtifactHandle({self.digest[:12]}, {self.kind}, {self.size} bytes)"
+
+def _encode(value, kind):
+    if kind == 'bytes':
+        return bytes(value)
+    if kind == 'json':
+        return json.dumps(value).encode('utf-8')
+    return value.encode('utf-8')
+
+def _decode(data, kind):
+    if kind == 'bytes':
+        return data
+    if kind == 'json':
+        return json.loads(data.decode('utf-8'))
+    return data.decode('utf-8')
+
+class ArtifactStore:
+    """Thread-safe, size-capped artifact store with spill to disk and TTL eviction"""
+
+    def __init__(self, memory_bytes=ARTIFACT_MEMORY_BYTES, disk_bytes=ARTIFACT_DISK_BYTES,
+                 ttl_seconds=ARTIFACT_TTL_SECONDS, spill_dir=ARTIFACT_SPILL_DIR):
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.ttl_seconds = ttl_seconds
+        self._spill_dir = tempfile.mkdtemp(prefix='examsoft-artifacts-', dir=spill_dir)
+        atexit.register(shutil.rmtree, self._spill_dir, True)
+
+        # digest -> [data or None when spilled, size, last access]; least recently used first
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_memory = 0
+        self.current_disk = 0
+        self.spills = 0
+        self.expirations = 0
+
+    def _path(self, digest):
+        return os.path.join(self._spill_dir, digest)
+
+    def put(self, value, kind='bytes'):
+        """Store a value and return its ArtifactHandle"""
+        data = _encode(value, kind)
+        digest = hashlib.sha256(data).hexdigest()
+
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                entry[2] = time.monotonic()
+                self._entries.move_to_end(digest)
+            else:
+                self._entries[digest] = [data, len(data), time.monotonic()]
+                self.current_memory += len(data)
+                self._enforce_limits()
+        return ArtifactHandle(digest, kind, len(data))
+
+    def get(self, handle):
+        """Return the stored value; raises ArtifactExpired if it was dropped"""
+        with self._lock:
+            self._expire()
+            entry = self._entries.get(handle.digest)
+            if entry is None:
+                raise ArtifactExpired(handle.digest)
+            entry[2] = time.monotonic()
+            self._entries.move_to_end(handle.digest)
+            data = entry[0]
+
+        if data is None:
+            try:
+                with open(self._path(handle.digest), 'rb') as f:
+                    data = f.read()
+            except FileNotFoundError:
+                # Dropped by another thread since the lookup
+                raise ArtifactExpired(handle.digest)
+        return _decode(data, handle.kind)
+
+    def contains(self, handle):
+        """True if the artifact is still stored"""
+        with self._lock:
+            self._expire()
+            return handle.digest in self._entries
+
+    def _enforce_limits(self):
+        """Spill least recently used artifacts past the memory cap, drop them past the disk cap"""
+        self._expire()
+        for digest, entry in self._entries.items():
+            if self.current_memory <= self.memory_bytes:
+                break
+            if entry[0] is None:
+                continue
+            with open(self._path(digest), 'wb') as f:
+                f.write(entry[0])
+            entry[0] = None
+            self.current_memory -= entry[1]
+            self.current_disk += entry[1]
+            self.spills += 1
+
+        while self.current_disk > self.disk_bytes:
+            digest = next(d for d, entry in self._entries.items() if entry[0] is None)
+            self._drop(digest)
+
+    def _expire(self):
+        """Drop artifacts not read within the TTL (oldest access first)"""
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self._entries:
+            digest, entry = next(iter(self._entries.items()))
+            if entry[2] >= cutoff:
+                break
+            self._drop(digest)
+            self.expirations += 1
+
+    def _drop(self, digest):
+        data, size, _ = self._entries.pop(digest)
+        if data is None:
+            self.current_disk -= size
+            try:
+                os.remove(self._path(digest))
+            except OSError:
+                pass
+        else:
+            self.current_memory -= size
+
+    def store_record(self, record):
+        """Copy of a processed-data record with its large fields replaced by handles"""
+        stored = dict(record)
+        for field, kind in ARTIFACT_FIELDS.items():
+            if stored.get(field) is not None:
+                stored[field] = self.put(stored[field], kind)
+        return stored
+
+    def load_record(self, record):
+        """Copy of a stored record with its handles replaced by values; raises ArtifactExpired"""
+        return {key: self.get(value) if isinstance(value, ArtifactHandle) else value
+                for key, value in record.items()}
+
+    def record_available(self, record):
+        """True if every artifact the record refers to is still stored"""
+        return all(self.contains(value) for value in record.values()
+                   if isinstance(value, ArtifactHandle))
+
+    def stats(self):
+        """Entry counts and memory/disk use"""
+        with self._lock:
+            self._expire()
+            return {
+                'entries': len(self._entries),
+                'spilled_entries': sum(1 for entry in self._entries.values() if entry[0] is None),
+                'memory_bytes': self.current_memory,
+                'max_memory_bytes': self.memory_bytes,
+                'disk_bytes': self.current_disk,
+                'max_disk_bytes': self.disk_bytes,
+                'spills': self.spills,
+                'expirations': self.expirations,
+            }
+
+def record_artifact_bytes(record):
+    """Bytes of stored artifacts a record refers to"""
+    if not record:
+        return 0
+    return sum(value.size for value in record.values() if isinstance(value, ArtifactHandle))
@@ -0,0 +1,63 @@
+# Long-running work (processing an exam, uploading to SharePoint) that
+# survives Streamlit reruns. Jobs run on a per-process executor and report
+# progress into a handle the script keeps in session state; each rerun reads
+# the handle instead of redoing or aborting the work.
+
+import os
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Jobs running at once across all sessions in this process
+MAX_BACKGROUND_JOBS = int(os.getenv('MAX_BACKGROUND_JOBS', '4'))
+
+# Seconds between reruns while a session has a job in flight
+JOB_POLL_SECONDS = float(os.getenv('JOB_POLL_SECONDS', '0.5'))
+
+_job_executor = ThreadPoolExecutor(max_workers=MAX_BACKGROUND_JOBS,
+                                   thread_name_prefix='background-job')
+
+class BackgroundJob:
+    """Handle for a submitted job: the worker's latest progress plus its Future"""
+
+    def __init__(self, label):
+        self.id = uuid.uuid4().hex
+        self.label = label
+        self.started = time.monotonic()
+        self.future = None
+        self._lock = threading.Lock()
+        self._fraction = 0.0
+        self._message = "Queued"
+
+    def report(self, fraction, message):
+        """Record progress from the worker thread (fraction between 0 and 1)"""
+        with self._lock:
+            self._fraction = min(max(fraction, 0.0), 1.0)
+            self._message = message
+
+    def progress(self):
+        """Latest (fraction, message) reported by the worker"""
+        with self._lock:
+            return self._fraction, self._message
+
+    def elapsed(self):
+        """Seconds since the job was submitted"""
+        return time.monotonic() - self.started
+
+    def done(self):
+        return self.future.done()
+
+    def result(self):
+        """The job's return value; re-raises the worker's exception"""
+        return self.future.result()
+
+def submit_job(label, function, *args, **kwargs):
+    """Run ``function(*args, report=job.report, **kwargs)`` in the background.
+
+    Returns the BackgroundJob handle straight away. The function must not
+    call Streamlit; it reports progress through ``report(fraction, message)``.
+    """
+    job = BackgroundJob(label)
+    job.future = _job_executor.submit(function, *args, report=job.report, **kwargs)
+    return job
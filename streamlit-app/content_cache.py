@@ -0,0 +1,240 @@
+# Byte-capped LRU cache for upload extraction results
+# Streamlit reruns the script on every widget interaction; caching extraction
+# by content hash keeps those reruns from re-reading the same uploads.
+# DiskCache adds an optional SQLite tier so several server processes on one
+# host share results.
+
+import os
+import sys
+import time
+import pickle
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Memory caps for the process-wide and per-session caches
+SHARED_CACHE_BYTES = int(os.getenv('EXTRACTION_CACHE_MB', '64')) * 1024 * 1024
+SESSION_CACHE_BYTES = int(os.getenv('SESSION_EXTRACTION_CACHE_MB', '16')) * 1024 * 1024
+
+# SQLite file for the cross-process tier (disabled when unset) and its size cap
+SHARED_CACHE_DB = os.getenv('SHARED_CACHE_DB', '')
+SHARED_CACHE_DB_BYTES = int(os.getenv('SHARED_CACHE_DB_MB', '512')) * 1024 * 1024
+
+# Disk entries older than this are dropped, so results from earlier deployments age out
+SHARED_CACHE_DB_TTL_SECONDS = int(os.getenv('SHARED_CACHE_DB_TTL_HOURS', '24')) * 3600
+
+# Least recently used rows deleted per step when the database is over its cap
+DISK_EVICTION_BATCH = 32
+
+def content_digest(data):
+    """SHA-256 hex digest of an upload's bytes"""
+    return hashlib.sha256(data).hexdigest()
+
+def estimate_size(value):
+    """Approximate memory held by a cached value (strings, lists and dicts of them)"""
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(key) + estimate_size(item)
+                                          for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    return sys.getsizeof(value)
+
+class ContentCache:
+    """Thread-safe LRU cache that evicts least recently used entries past a byte limit"""
+
+    def __init__(self, max_bytes=SHARED_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Return the cached value (marking it recently used) or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, size=None):
+        """Cache a value; values larger than the whole cache are not stored"""
+        if size is None:
+            size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= previous[1]
+            self._entries[key] = (value, size)
+            self.current_bytes += size
+
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """Entry count, memory use and hit/miss counters"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+class DiskCache:
+    """SQLite-backed cache shared by every server process on the host.
+
+    Has the same get/put/stats interface as ContentCache, so it can follow
+    one in a list of cache tiers. Entries are namespaced so one database can
+    serve several caches, and expire ``ttl_seconds`` after they were stored.
+    Values are pickled; the database must only be writable by this
+    application. Database errors and values that no longer unpickle (written
+    by an older version of the code) are logged and treated as misses, so a
+    locked or stale file never breaks a conversion.
+    """
+
+    def __init__(self, path, namespace, max_bytes=SHARED_CACHE_DB_BYTES,
+                 ttl_seconds=SHARED_CACHE_DB_TTL_SECONDS):
+        self.path = path
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        db = self._connect()
+        db.execute('CREATE TABLE IF NOT EXISTS cache ('
+                   'key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL)')
+        db.execute('CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)')
+        columns = [row[1] for row in db.execute('PRAGMA table_info(cache)')]
+        if 'stored' not in columns:
+            # Databases from before entries expired; their rows count as expired
+            try:
+                db.execute('ALTER TABLE cache ADD COLUMN stored REAL NOT NULL DEFAULT 0')
+            except sqlite3.OperationalError:
+                pass  # another process added it first
+
+    def _connect(self):
+        """This thread's connection (sqlite3 connections can't be shared between threads)"""
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            self._local.db = db
+        return db
+
+    def _key(self, key):
+        return f'{self.namespace}:{key!r}'
+
+    def _count(self, counter, amount=1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def get(self, key):
+        """Return the cached value (marking it recently used) or None"""
+        value = None
+        try:
+            db = self._connect()
+            row = db.execute('SELECT value, stored FROM cache WHERE key = ?', (self._key(key),)).fetchone()
+            if row is not None and row[1] < time.time() - self.ttl_seconds:
+                db.execute('DELETE FROM cache WHERE key = ?', (self._key(key),))
+                self._count('expirations')
+            elif row is not None:
+                try:
+                    value = pickle.loads(row[0])
+                except Exception as e:
+                    # Pickled by code that has since changed; drop it
+                    print(f"⚠️ Disk cache entry unreadable, dropping it: {e}")
+                    db.execute('DELETE FROM cache WHERE key = ?', (self._key(key),))
+                else:
+                    db.execute('UPDATE cache SET accessed = ? WHERE key = ?', (time.time(), self._key(key)))
+        except sqlite3.Error as e:
+            print(f"⚠️ Disk cache read failed: {e}")
+            value = None
+
+        self._count('hits' if value is not None else 'misses')
+        return value
+
+    def put(self, key, value, size=None):
+        """Cache a value; values larger than the whole cache are not stored"""
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.max_bytes:
+            return
+        now = time.time()
+        try:
+            db = self._connect()
+            db.execute('INSERT OR REPLACE INTO cache (key, value, size, accessed, stored) VALUES (?, ?, ?, ?, ?)',
+                       (self._key(key), data, len(data), now, now))
+            self._evict(db)
+        except sqlite3.Error as e:
+            print(f"⚠️ Disk cache write failed: {e}")
+
+    def _evict(self, db):
+        """Drop expired rows, then least recently used rows (any namespace) until the database fits its cap"""
+        expired = db.execute('DELETE FROM cache WHERE stored < ?', (time.time() - self.ttl_seconds,)).rowcount
+        if expired > 0:
+            self._count('expirations', expired)
+
+        total = db.execute('SELECT COALESCE(SUM(size), 0) FROM cache').fetchone()[0]
+        while total > self.max_bytes:
+            rows = db.execute('SELECT key, size FROM cache ORDER BY accessed LIMIT ?',
+                              (DISK_EVICTION_BATCH,)).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                db.execute('DELETE FROM cache WHERE key = ?', (key,))
+                total -= size
+                self._count('evictions')
+                if total <= self.max_bytes:
+                    break
+
+    def clear(self):
+        """Drop every entry in this namespace"""
+        try:
+            self._connect().execute('DELETE FROM cache WHERE key LIKE ?', (f'{self.namespace}:%',))
+        except sqlite3.Error as e:
+            print(f"⚠️ Disk cache clear failed: {e}")
+
+    def stats(self):
+        """Entry count and size for this namespace, plus this process's hit/miss counters"""
+        try:
+            entries, size = self._connect().execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache WHERE key LIKE ?',
+                (f'{self.namespace}:%',)
+            ).fetchone()
+        except sqlite3.Error:
+            entries, size = 0, 0
+        with self._lock:
+            return {
+                'entries': entries,
+                'bytes': size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
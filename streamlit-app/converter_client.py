@@ -0,0 +1,209 @@
+# Client for the LibreOffice converter service
+# Submits DOCX files as conversion jobs and polls for the RTF in a background
+# thread, so the Streamlit script can keep working while LibreOffice runs.
+# Requests share one pooled session, so connections (and TLS handshakes) are
+# reused across conversions.
+
+import io
+import os
+import time
+import random
+import hashlib
+import zipfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Seconds to wait for a single HTTP call to the converter
+REQUEST_TIMEOUT = 30
+
+# Seconds to wait for a job to finish before giving up. The service kills a
+# job after CONVERTER_TIMEOUT_SECONDS (120 by default) across all its formats,
+# so this leaves room for that deadline plus time queued behind other jobs.
+JOB_TIMEOUT = int(os.getenv('CONVERTER_JOB_TIMEOUT', '300'))
+
+# Poll interval grows from the first value up to the second
+POLL_INTERVAL_START = 0.25
+POLL_INTERVAL_MAX = 2.0
+
+# Retries when the converter answers 429/503 (busy)
+MAX_BUSY_RETRIES = 5
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 30.0
+
+# Background threads that wait on the converter for the Streamlit script
+_client_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='converter-client')
+
+# Seconds to wait for the converter's /health endpoint when warming up
+HEALTH_TIMEOUT = 5
+
+# Keep-alive connections for the converter; room for every client thread plus callers
+_http = requests.Session()
+_http.mount('http://', HTTPAdapter(pool_maxsize=8))
+_http.mount('https://', HTTPAdapter(pool_maxsize=8))
+
+# Conversions this process is already waiting on: (content hash, endpoint) -> Future
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+def get_default_endpoint():
+    """Get the configured /convert endpoint, falling back to the local Docker API"""
+    try:
+        from azure_config_loader import get_converter_endpoint
+        return get_converter_endpoint()
+    except ImportError:
+        return "http://localhost:8080/convert"
+
+def get_converter_base_url(api_url):
+    """Strip the /convert suffix from a converter endpoint URL"""
+    base_url = api_url.rstrip('/')
+    if base_url.endswith('/convert'):
+        base_url = base_url[:-len('/convert')]
+    return base_url
+
+def get_backoff_delay(response, attempt):
+    """Seconds to wait before retrying a busy response.
+
+    Honors Retry-After when the server sends it, otherwise uses exponential
+    backoff. Jitter spreads out clients that were rejected together.
+    """
+    retry_after = response.headers.get('Retry-After', '')
+    if retry_after.isdigit():
+        delay = float(retry_after)
+        return min(delay + random.uniform(0, delay * 0.5), BACKOFF_MAX)
+    return random.uniform(0, min(BACKOFF_BASE * 2 ** attempt, BACKOFF_MAX))
+
+def post_with_backoff(url, files, timeout, data=None):
+    """POST to the converter, retrying with jittered backoff while it reports busy"""
+    for attempt in range(MAX_BUSY_RETRIES + 1):
+        response = _http.post(url, files=files, data=data, timeout=timeout)
+        if response.status_code not in (429, 503) or attempt == MAX_BUSY_RETRIES:
+            return response
+        delay = get_backoff_delay(response, attempt)
+        print(f"⏳ Converter busy ({response.status_code}), retrying in {delay:.1f}s")
+        time.sleep(delay)
+
+def convert_bytes_sync(docx_bytes, api_url, formats=('rtf',)):
+    """Blocking POST /convert, used when the service has no job API"""
+    response = post_with_backoff(
+        api_url,
+        files={'file': ('input.docx', docx_bytes)},
+        data={'formats': ','.join(formats)},
+        timeout=JOB_TIMEOUT
+    )
+    response.raise_for_status()
+    return response.content
+
+def submit_job(docx_bytes, base_url, formats=('rtf',)):
+    """POST /jobs and return the job id, or None if the service has no job API"""
+    response = post_with_backoff(
+        f"{base_url}/jobs",
+        files={'file': ('input.docx', docx_bytes)},
+        data={'formats': ','.join(formats)},
+        timeout=REQUEST_TIMEOUT
+    )
+    if response.status_code in (404, 405):
+        return None
+    response.raise_for_status()
+    return response.json()['job_id']
+
+def wait_for_job(job_id, base_url, timeout=JOB_TIMEOUT):
+    """Poll GET /jobs/{id} until the job is done and return the result body"""
+    deadline = time.monotonic() + timeout
+    poll_interval = POLL_INTERVAL_START
+
+    while True:
+        response = _http.get(f"{base_url}/jobs/{job_id}", timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        status = response.json()
+
+        if status['status'] == 'done':
+            result = _http.get(f"{base_url}/jobs/{job_id}/result", timeout=REQUEST_TIMEOUT)
+            result.raise_for_status()
+            return result.content
+        if status['status'] == 'failed':
+            raise RuntimeError(f"Conversion job failed: {status.get('error', 'unknown error')}")
+
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"Conversion job {job_id} did not finish within {timeout} seconds")
+
+        time.sleep(poll_interval)
+        poll_interval = min(poll_interval * 2, POLL_INTERVAL_MAX)
+
+def convert_bytes(docx_bytes, api_url, formats=('rtf',)):
+    """Convert DOCX bytes, preferring the job API over a blocking POST.
+
+    Returns the converted file, or a ZIP archive when several formats are requested.
+    """
+    base_url = get_converter_base_url(api_url)
+
+    job_id = submit_job(docx_bytes, base_url, formats)
+    if job_id is None:
+        # Older converter deployments only expose /convert
+        return convert_bytes_sync(docx_bytes, api_url, formats)
+
+    return wait_for_job(job_id, base_url)
+
+def warm_up(api_url=None):
+    """Open a pooled connection to the converter via GET /health; True if it answered"""
+    if api_url is None:
+        api_url = get_default_endpoint()
+    try:
+        response = _http.get(f"{get_converter_base_url(api_url)}/health", timeout=HEALTH_TIMEOUT)
+    except requests.RequestException as e:
+        print(f"⚠️ Converter not reachable during warm-up: {e}")
+        return False
+    return response.ok
+
+def unpack_outputs(content, formats):
+    """Split a converter response into {format: bytes}"""
+    if len(formats) == 1:
+        return {formats[0]: content}
+
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(content))
+    except zipfile.BadZipFile:
+        raise RuntimeError("Converter returned a single file; it does not support multi-format output")
+
+    with archive:
+        return {fmt: archive.read(f"converted.{fmt}") for fmt in formats}
+
+def convert_formats(docx_bytes, formats, api_url=None):
+    """Convert DOCX bytes to several formats in one converter request and return {format: bytes}"""
+    if api_url is None:
+        api_url = get_default_endpoint()
+    formats = tuple(dict.fromkeys(fmt.lower() for fmt in formats))
+    return unpack_outputs(convert_bytes(docx_bytes, api_url, formats), formats)
+
+def start_conversion(docx_path, api_url=None):
+    """Start converting a DOCX file and return a Future resolving to the RTF bytes.
+
+    The file is read before returning, so the caller may delete it right away.
+    Call ``.result()`` on the returned future once the other work is done.
+    Identical documents submitted while a conversion is in flight share one
+    request to the converter.
+    """
+    if api_url is None:
+        api_url = get_default_endpoint()
+
+    with open(docx_path, "rb") as f:
+        docx_bytes = f.read()
+
+    key = (hashlib.sha256(docx_bytes).hexdigest(), api_url)
+
+    with _inflight_lock:
+        future = _inflight.get(key)
+        if future is not None:
+            return future
+        future = _client_executor.submit(convert_bytes, docx_bytes, api_url)
+        _inflight[key] = future
+
+    def forget(done_future):
+        with _inflight_lock:
+            if _inflight.get(key) is done_future:
+                del _inflight[key]
+
+    future.add_done_callback(forget)
+    return future
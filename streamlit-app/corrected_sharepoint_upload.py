@@ -2,8 +2,11 @@
 Corrected SharePoint upload functions that target the IT site correctly
 """
 
-def upload_to_sharepoint_corrected(access_token, file_content, filename):
-    """Upload to correct SharePoint path: IT/Shared Documents/ExamSoft/File-converter/Import with robust error handling"""
+def upload_to_sharepoint_corrected(access_token, file_content, filename, on_progress=None):
+    """Upload to correct SharePoint path: IT/Shared Documents/ExamSoft/File-converter/Import with robust error handling
+
+    on_progress(bytes_sent, total_bytes) is called after each chunk of a session upload.
+    """
     try:
         import requests
         from urllib.parse import quote
@@ -42,7 +45,7 @@ def upload_to_sharepoint_corrected(access_token, file_content, filename):
         # Step 3: Use different upload methods based on file size
         if content_size > 4 * 1024 * 1024:  # > 4MB, use session upload
             print("📤 Large file detected, using upload session...")
-            return upload_large_file_with_session(access_token, file_content, clean_filename)
+            return upload_large_file_with_session(access_token, file_content, clean_filename, on_progress)
         else:
             print("📤 Small file, using direct upload...")
             return upload_small_file_direct(access_token, file_content, clean_filename)
@@ -182,7 +185,7 @@ def upload_small_file_direct(access_token, file_content, filename):
     print(f"❌ All upload attempts failed")
     return False, "Could not upload to any path in IT site"
 
-def upload_large_file_with_session(access_token, file_content, filename):
+def upload_large_file_with_session(access_token, file_content, filename, on_progress=None):
     """Upload large files using upload session to IT site"""
     try:
         import requests
@@ -258,6 +261,9 @@ def upload_large_file_with_session(access_token, file_content, filename):
                 if chunk_response.status_code not in [202, 200, 201]:
                     print(f"❌ Chunk upload failed: {chunk_response.text}")
                     return False, f"Chunk upload failed: {chunk_response.status_code}"
+                
+                if on_progress is not None:
+                    on_progress(end, total_size)
             
             # Final response should contain file info
             if chunk_response.status_code in [200, 201]:
@@ -0,0 +1,110 @@
+# "Download all" ZIP of the generated files plus a manifest
+# zipfile writes into an unseekable sink and the chunks are handed on as each
+# member is written, so the archive is never assembled in memory as a whole.
+# DOCX files are already deflate-compressed and are stored as-is.
+
+import io
+import os
+import json
+import hashlib
+import zipfile
+import tempfile
+from datetime import datetime
+
+# Bytes written to an archive member at a time
+BUNDLE_CHUNK_BYTES = 1024 * 1024
+
+# Bundles larger than this are spooled to disk rather than kept in memory
+BUNDLE_SPOOL_BYTES = int(os.getenv('BUNDLE_SPOOL_MB', '8')) * 1024 * 1024
+
+class _ChunkSink(io.RawIOBase):
+    """Unseekable write target that collects zipfile output until it is drained"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        chunks, self._chunks = self._chunks, []
+        return chunks
+
+def bundle_members(record, include_exam_docx=False):
+    """(archive name, bytes, compression) for each generated file in a loaded record"""
+    members = []
+    if record.get('instructions_docx'):
+        members.append((record['instructions_filename'], record['instructions_docx'], zipfile.ZIP_STORED))
+
+    exam_rtf = record.get('exam_rtf_bytes') or record['exam_rtf_content']
+    if isinstance(exam_rtf, str):
+        exam_rtf = exam_rtf.encode('utf-8')
+    members.append((record['exam_filename'], exam_rtf, zipfile.ZIP_DEFLATED))
+
+    if include_exam_docx and record.get('exam_docx'):
+        docx_name = os.path.splitext(record['exam_filename'])[0] + '.docx'
+        members.append((docx_name, record['exam_docx'], zipfile.ZIP_STORED))
+    return members
+
+def build_manifest(record, members):
+    """Manifest describing the bundle: question counts and a SHA-256 per file"""
+    return {
+        'generated': datetime.now().isoformat(timespec='seconds'),
+        'exam_file': record['exam_filename'],
+        'rtf_source': 'libreoffice' if record.get('exam_rtf_bytes') else 'basic',
+        'questions': record['mc_count'] + record['essay_count'],
+        'multiple_choice': record['mc_count'],
+        'essay': record['essay_count'],
+        'answer_key_entries': len(record.get('answer_key') or []),
+        'answer_key_flags': len(record.get('answer_flags') or {}),
+        'files': [
+            {'name': name, 'bytes': len(data), 'sha256': hashlib.sha256(data).hexdigest()}
+            for name, data, _ in members
+        ],
+    }
+
+def stream_bundle(record, include_exam_docx=False):
+    """Yield the ZIP archive for a loaded record in chunks as it is written"""
+    members = bundle_members(record, include_exam_docx)
+    manifest = json.dumps(build_manifest(record, members), indent=2).encode('utf-8')
+    members.append(('manifest.json', manifest, zipfile.ZIP_DEFLATED))
+
+    date_time = datetime.now().timetuple()[:6]
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w') as archive:
+        for name, data, compression in members:
+            info = zipfile.ZipInfo(name, date_time=date_time)
+            info.compress_type = compression
+            info.file_size = len(data)
+            with archive.open(info, 'w') as member:
+                for start in range(0, len(data), BUNDLE_CHUNK_BYTES):
+                    member.write(data[start:start + BUNDLE_CHUNK_BYTES])
+                    yield from sink.drain()
+            yield from sink.drain()
+    # Central directory, written on close
+    yield from sink.drain()
+
+def build_bundle_file(record, include_exam_docx=False):
+    """The bundle as a file object, spooled to disk past BUNDLE_SPOOL_BYTES"""
+    bundle = tempfile.SpooledTemporaryFile(max_size=BUNDLE_SPOOL_BYTES, prefix='bundle-')
+    for chunk in stream_bundle(record, include_exam_docx):
+        bundle.write(chunk)
+    bundle.seek(0)
+    return bundle
+
+def notice_bundle_file(message):
+    """A ZIP holding only README.txt with ``message``, for when the files can't be bundled"""
+    bundle = io.BytesIO()
+    with zipfile.ZipFile(bundle, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('README.txt', message + '\n')
+    bundle.seek(0)
+    return bundle
+
+def bundle_filename(record):
+    """ZIP name matching the exam file, e.g. CONST_001_Smith_exm_250101.zip"""
+    return os.path.splitext(record['exam_filename'])[0] + '.zip'
@@ -0,0 +1,47 @@
+# ExamSoft formatting core: question parsing, formatting and the RTF/DOCX emitters
+# Imports nothing from Streamlit. python-docx and the converter client are
+# loaded on first use, so tools and worker processes can import this cheaply.
+
+from examsoft_core.text import clean_text_encoding, generate_filename, parse_exam_content
+from examsoft_core.formatting import (
+    format_instructions_rtf,
+    format_multiple_choice_question,
+    format_essay_question,
+    create_rtf_content,
+)
+from examsoft_core.parsing import (
+    parse_questions_from_text,
+    classify_question,
+    parse_answer_key_with_header_detection,
+    BlockMemo,
+)
+from examsoft_core.review import is_essay, find_answer_mismatches
+from examsoft_core.docx_writer import generate_docx_with_questions, generate_instructions_docx
+from examsoft_core.conversion import (
+    default_endpoint,
+    convert_docx_to_rtf_via_api,
+    convert_docx_via_api_multi,
+    start_docx_to_rtf_conversion,
+)
+
+__all__ = [
+    'clean_text_encoding',
+    'generate_filename',
+    'parse_exam_content',
+    'format_instructions_rtf',
+    'format_multiple_choice_question',
+    'format_essay_question',
+    'create_rtf_content',
+    'parse_questions_from_text',
+    'classify_question',
+    'parse_answer_key_with_header_detection',
+    'BlockMemo',
+    'is_essay',
+    'find_answer_mismatches',
+    'generate_docx_with_questions',
+    'generate_instructions_docx',
+    'default_endpoint',
+    'convert_docx_to_rtf_via_api',
+    'convert_docx_via_api_multi',
+    'start_docx_to_rtf_conversion',
+]
@@ -0,0 +1,50 @@
+# DOCX to RTF conversion through the LibreOffice converter service
+# converter_client (and requests) load on the first conversion, not on import.
+
+# Used when no endpoint is passed and the Azure config loader is unavailable
+DEFAULT_CONVERTER_ENDPOINT = "http://localhost:8080/convert"
+
+def default_endpoint():
+    """Converter endpoint from the Azure configuration, or the local Docker default"""
+    try:
+        from azure_config_loader import get_converter_endpoint
+    except ImportError:
+        return DEFAULT_CONVERTER_ENDPOINT
+    return get_converter_endpoint()
+
+def convert_docx_to_rtf_via_api(docx_path, rtf_path, api_url=None):
+    """Send DOCX to the LibreOffice Docker API and save the returned RTF."""
+    if api_url is None:
+        api_url = default_endpoint()
+    
+    from converter_client import post_with_backoff, JOB_TIMEOUT
+    with open(docx_path, "rb") as f:
+        # Retries with jittered backoff while the converter answers 429
+        files = {'file': ('input.docx', f.read())}
+        response = post_with_backoff(api_url, files=files, timeout=JOB_TIMEOUT)
+        response.raise_for_status()
+        with open(rtf_path, "wb") as out:
+            out.write(response.content)
+
+def convert_docx_via_api_multi(docx_path, formats=('rtf', 'pdf'), api_url=None):
+    """Convert one DOCX to several formats (rtf, pdf, odt) in a single converter request.
+
+    Returns a dict mapping each format to its bytes, e.g. the ExamSoft RTF plus
+    a PDF proof for the professor.
+    """
+    from converter_client import convert_formats
+    if api_url is None:
+        api_url = default_endpoint()
+    with open(docx_path, "rb") as f:
+        return convert_formats(f.read(), formats, api_url=api_url)
+
+def start_docx_to_rtf_conversion(docx_path, api_url=None):
+    """Submit DOCX to the converter job API without blocking.
+
+    Returns a Future resolving to the RTF bytes, so the caller can build other
+    artifacts while LibreOffice runs.
+    """
+    from converter_client import start_conversion
+    if api_url is None:
+        api_url = default_endpoint()
+    return start_conversion(docx_path, api_url=api_url)
@@ -0,0 +1,191 @@
+# DOCX emitters for the exam file sent to LibreOffice and the instructions file
+# python-docx is imported on first use so importing the core stays cheap.
+# Both files start from a styled blank document built once per process, and
+# are saved with fixed ZIP timestamps so identical content gives identical
+# bytes (the converter deduplicates work by content hash).
+
+import io
+import re
+import zipfile
+
+from examsoft_core.text import clean_text_encoding
+
+# Serialized blank document with the Normal style set; built on first use
+_template_bytes = None
+
+def _new_document():
+    """A blank Times New Roman 12pt document opened from the prebuilt template"""
+    global _template_bytes
+    from docx import Document
+    if _template_bytes is None:
+        from docx.shared import Pt
+        doc = Document()
+        font = doc.styles['Normal'].font
+        font.name = 'Times New Roman'
+        font.size = Pt(12)
+        buffer = io.BytesIO()
+        doc.save(buffer)
+        _template_bytes = buffer.getvalue()
+    return Document(io.BytesIO(_template_bytes))
+
+# Timestamp written for every ZIP entry (the earliest a ZIP can record)
+FIXED_ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+def _save_deterministic(doc):
+    """Serialize a document with fixed ZIP entry timestamps and return the bytes"""
+    saved = io.BytesIO()
+    doc.save(saved)
+
+    normalized = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(saved.getvalue())) as source, \
+            zipfile.ZipFile(normalized, 'w') as target:
+        for info in source.infolist():
+            entry = zipfile.ZipInfo(info.filename, date_time=FIXED_ZIP_DATE_TIME)
+            entry.compress_type = info.compress_type
+            entry.external_attr = info.external_attr
+            target.writestr(entry, source.read(info))
+    return normalized.getvalue()
+
+def warm_up():
+    """Import python-docx and build the template before the first exam is generated"""
+    _new_document()
+
+def generate_docx_with_questions(questions_list, instructions_text, output_path):
+    """Generate a DOCX file with instructions and questions, formatted simply."""
+    from docx.shared import Pt, Inches
+    # Default font is Times New Roman 12pt
+    doc = _new_document()
+    # Do NOT add instructions to the main exam file
+    # Add questions
+    for q in questions_list:
+        lines = q.split('\n')
+        is_essay = False
+        for idx, line in enumerate(lines):
+            line = line.strip()
+            # Replace problematic bullets/question marks with standard text
+            line = line.replace('\u2022', '-')
+            line = line.replace('\u25CF', '-')
+            line = line.replace('\u25A0', '-')
+            line = line.replace('\u25CB', '-')
+            line = line.replace('\u25AA', '-')
+            line = line.replace('\u25B2', '-')
+            line = line.replace('\u25BA', '-')
+            line = line.replace('\u25C6', '-')
+            line = line.replace('\u25CF', '-')
+            line = line.replace('\uFFFD', '-')
+            # Remove any leading non-ASCII chars
+            line = re.sub(r'^[^\x00-\x7F]+', '', line)
+            if line == 'Type: E':
+                is_essay = True
+                # Do not add a separate heading, handled below
+            elif is_essay and re.match(r'^\d+\. ', line):
+                # Essay question number and content: prepend 'Type: E'
+                qnum_match = re.match(r'^(\d+)(\. )(.*)', line)
+                if qnum_match:
+                    para = doc.add_paragraph()
+                    run_type = para.add_run('Type: E ')
+                    run_type.bold = True
+                    run_type.font.name = 'Times New Roman'
+                    run_type.font.size = Pt(12)
+                    run_num = para.add_run(qnum_match.group(1) + qnum_match.group(2))
+                    run_num.bold = True
+                    run_num.font.name = 'Times New Roman'
+                    run_num.font.size = Pt(12)
+                    run_txt = para.add_run(qnum_match.group(3))
+                    run_txt.font.name = 'Times New Roman'
+                    run_txt.font.size = Pt(12)
+                else:
+                    para = doc.add_paragraph('Type: E ' + line)
+                    for run in para.runs:
+                        run.font.name = 'Times New Roman'
+                        run.font.size = Pt(12)
+            elif re.match(r'^\d+\. ', line):
+                # Bold question number, normal text after (non-essay)
+                qnum_match = re.match(r'^(\d+)(\. )(.*)', line)
+                if qnum_match:
+                    para = doc.add_paragraph()
+                    run_num = para.add_run(qnum_match.group(1) + qnum_match.group(2))
+                    run_num.bold = True
+                    run_num.font.name = 'Times New Roman'
+                    run_num.font.size = Pt(12)
+                    run_txt = para.add_run(qnum_match.group(3))
+                    run_txt.font.name = 'Times New Roman'
+                    run_txt.font.size = Pt(12)
+                else:
+                    doc.add_paragraph(line)
+            elif re.match(r'^[*]?[A-D]\. ', line):
+                # Indented plain paragraph for answer choices, preserve asterisk
+                para = doc.add_paragraph(line)
+                para.paragraph_format.left_indent = Inches(0.25)
+                for run in para.runs:
+                    run.font.name = 'Times New Roman'
+                    run.font.size = Pt(12)
+            elif is_essay and idx > 0:
+                # Essay content
+                para = doc.add_paragraph(line)
+                para.paragraph_format.left_indent = Inches(0.25)
+                for run in para.runs:
+                    run.font.name = 'Times New Roman'
+                    run.font.size = Pt(12)
+            else:
+                para = doc.add_paragraph(line)
+                for run in para.runs:
+                    run.font.name = 'Times New Roman'
+                    run.font.size = Pt(12)
+        doc.add_paragraph('')
+    with open(output_path, 'wb') as f:
+        f.write(_save_deterministic(doc))
+
+def generate_instructions_docx(instructions_text):
+    """Generate a DOCX file with instructions, return as bytes"""
+    from docx.shared import Pt
+    from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+    # Default font is Times New Roman 12pt
+    doc = _new_document()
+    
+    # Add title
+    title = doc.add_heading('INSTRUCTIONS', level=1)
+    title.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+    title_run = title.runs[0]
+    title_run.font.name = 'Times New Roman'
+    title_run.font.size = Pt(12)
+    title_run.bold = True
+    
+    # Headers that should be bold
+    bold_headers = ["Time", "Reference Materials", "Questions", "Multiple-Choice:", "Essay:", "Word Count:", "Please be sure to follow"]
+    
+    # Split instructions into paragraphs and format properly
+    paragraphs = instructions_text.split('\n\n')
+    for para_text in paragraphs:
+        if para_text.strip():
+            # Clean the text and handle encoding issues
+            clean_para = clean_text_encoding(para_text.strip())
+            para = doc.add_paragraph()
+            
+            # Check if this paragraph starts with a bold header
+            is_bold_header = any(clean_para.startswith(header) for header in bold_headers)
+            
+            if is_bold_header:
+                # Find where the header ends
+                for header in bold_headers:
+                    if clean_para.startswith(header):
+                        # Add the header as bold
+                        header_run = para.add_run(header)
+                        header_run.font.name = 'Times New Roman'
+                        header_run.font.size = Pt(12)
+                        header_run.bold = True
+                        
+                        # Add the rest as normal text
+                        remaining_text = clean_para[len(header):]
+                        if remaining_text:
+                            normal_run = para.add_run(remaining_text)
+                            normal_run.font.name = 'Times New Roman'
+                            normal_run.font.size = Pt(12)
+                        break
+            else:
+                # Regular paragraph
+                run = para.add_run(clean_para)
+                run.font.name = 'Times New Roman'
+                run.font.size = Pt(12)
+    
+    return _save_deterministic(doc)
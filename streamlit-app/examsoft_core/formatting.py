@@ -0,0 +1,198 @@
+# ExamSoft question formatting and the basic RTF emitter
+
+import re
+
+def format_instructions_rtf(text):
+    """Format instructions as clean RTF"""
+    # Clean the text
+    text = re.sub(r'\s+', ' ', text)
+    text = text.strip()
+    
+    # Create simple RTF format
+    rtf_header = r"{\rtf1\ansi\deff0{\fonttbl{\f0 Times New Roman;}}\f0\fs24"
+    
+    # Convert to RTF with proper line breaks
+    rtf_text = text.replace('\n', r'\line ')
+    
+    # Close RTF
+    return rtf_header + rtf_text + "}"
+
+def format_multiple_choice_question(q_num, content, answer_key, use_asterisk_method=True, mc_index=None):
+    """Format a multiple choice question according to ExamSoft RTF import guidelines"""
+    lines = content.split('\n')
+    question_text = []
+    choices = []
+    current_section = "question"
+    
+    # Enhanced patterns to catch indented answer choices
+    choice_patterns = [
+        r'^\s*([A-D])\.\s*(.+)',    # Standard or indented: "A. answer" or "    A. answer"
+        r'^\s*([A-D])\)\s*(.+)',    # Alternative: "A) answer"
+    ]
+    
+    # First pass: try to find explicit A,B,C,D choices
+    found_explicit_choices = False
+    for line in lines:
+        if not line.strip():
+            continue
+            
+        choice_match = None
+        for pattern in choice_patterns:
+            choice_match = re.match(pattern, line)
+            if choice_match:
+                found_explicit_choices = True
+                break
+        
+        if choice_match:
+            current_section = "choices"
+            choice_letter = choice_match.group(1)
+            choice_text = choice_match.group(2)
+            # Check if this is the correct answer
+            if use_asterisk_method and mc_index is not None and mc_index < len(answer_key):
+                correct_answer = answer_key[mc_index].upper().strip()
+                if choice_letter.upper() == correct_answer:
+                    choices.append(f"*{choice_letter}. {choice_text}")
+                else:
+                    choices.append(f"{choice_letter}. {choice_text}")
+            else:
+                choices.append(f"{choice_letter}. {choice_text}")
+        else:
+            if current_section == "question":
+                question_text.append(line.strip())
+    
+    # If no explicit choices found, but this was classified as MC, try to auto-assign A,B,C,D
+    if not found_explicit_choices:
+        # Look for "Which of the following" pattern and extract potential answers
+        potential_answers = []
+        question_stem = []
+        collecting_answers = False
+        
+        for line in lines:
+            line_stripped = line.strip()
+            if not line_stripped:
+                continue
+            
+            if 'which of the following' in line_stripped.lower():
+                question_stem.append(line_stripped)
+                collecting_answers = True
+            elif collecting_answers and len(line_stripped) > 10:  # Potential answer
+                potential_answers.append(line_stripped)
+            elif not collecting_answers:
+                question_stem.append(line_stripped)
+        
+        question_text = question_stem
+        
+        # Assign A,B,C,D to the potential answers
+        choice_letters = ['A', 'B', 'C', 'D']
+        for i, answer in enumerate(potential_answers[:4]):  # Limit to 4 choices
+            if i < len(choice_letters):
+                letter = choice_letters[i]
+                # Check if this is the correct answer
+                if use_asterisk_method and mc_index is not None and mc_index < len(answer_key):
+                    correct_answer = answer_key[mc_index].upper().strip()
+                    if letter == correct_answer:
+                        choices.append(f"*{letter}. {answer}")
+                    else:
+                        choices.append(f"{letter}. {answer}")
+                else:
+                    choices.append(f"{letter}. {answer}")
+    
+    result = []
+    if question_text:
+        # Join all question text
+        full_text = ' '.join(question_text)
+        
+        # Check if the question has multiple paragraphs (indicated by double newlines or long content)
+        paragraphs = []
+        
+        # Split by double newlines first
+        if '\n\n' in full_text:
+            paragraphs = [p.strip() for p in full_text.split('\n\n') if p.strip()]
+        else:
+            # For very long questions, try to split into logical paragraphs
+            # Look for sentence endings followed by capital letters (new paragraph indicators)
+            sentences = full_text.split('. ')
+            current_paragraph = []
+            
+            for i, sentence in enumerate(sentences):
+                current_paragraph.append(sentence)
+                
+                # If this is a long paragraph (>200 chars) and next sentence starts with capital, split
+                current_text = '. '.join(current_paragraph)
+                if (len(current_text) > 200 and 
+                    i < len(sentences) - 1 and 
+                    len(sentences[i + 1]) > 0 and 
+                    sentences[i + 1][0].isupper()):
+                    
+                    # Check if this looks like a natural paragraph break
+                    if not sentence.endswith(('Mr', 'Mrs', 'Dr', 'vs', 'Inc', 'Ltd', 'Co')):
+                        paragraphs.append(current_text + '.')
+                        current_paragraph = []
+            
+            # Add remaining text
+            if current_paragraph:
+                remaining = '. '.join(current_paragraph)
+                if not remaining.endswith('.') and len(sentences) > 1:
+                    remaining += '.'
+                paragraphs.append(remaining)
+        
+        # Format the question with paragraph tags if multiple paragraphs
+        if len(paragraphs) > 1:
+            result.append(f"{q_num}.")  # Question number on separate line
+            for para in paragraphs:
+                result.append(f"<p>{para}</p>")
+        else:
+            # Single paragraph - use standard formatting
+            full_question = f"{q_num}. {full_text}"
+            result.append(full_question)
+    
+    result.extend(choices)
+    return '\n'.join(result)
+
+def format_essay_question(q_num, content):
+    """Format an essay question according to ExamSoft RTF import guidelines"""
+    # Clean up the content
+    content = re.sub(r'Type:\s*E\s*\d*\.?\s*', '', content)
+    content = content.strip()
+    result = []
+    # Split into paragraphs by double newlines
+    paragraphs = [p.strip() for p in content.split('\n\n') if p.strip()]
+    # Output 'Type: E' and question number/title outside <p> tags
+    result.append(f"Type: E")
+    # If first paragraph looks like a title (e.g. 'ESSAY' or has word count), put it as the question line
+    if paragraphs:
+        # If first paragraph is all-caps or contains 'ESSAY' or 'Word Count', treat as title
+        first_para = paragraphs[0]
+        if re.match(r'^[A-Z\s()\-:;0-9.]+$', first_para) or 'ESSAY' in first_para.upper() or 'WORD COUNT' in first_para.upper():
+            result.append(f"{q_num}. {first_para}")
+            para_body = paragraphs[1:]
+        else:
+            result.append(f"{q_num}.")
+            para_body = paragraphs
+        # Wrap each body paragraph in <p> tags
+        for p in para_body:
+            result.append(f"<p>{p}</p>")
+    else:
+        # Fallback: just output question number and single paragraph
+        result.append(f"{q_num}.")
+        result.append(f"<p>{content}</p>")
+    return '\n'.join(result)
+
+def create_rtf_content(questions_list, answer_key=None, use_answer_key_method=False):
+    """Create RTF content for ExamSoft import"""
+    # Use Times New Roman, 12pt, normal spacing, and proper paragraph breaks
+    rtf_header = r"{\rtf1\ansi\deff0{\fonttbl{\f0 Times New Roman;}}\f0\fs24 "
+    rtf_body = ""
+    for question in questions_list:
+        # Convert HTML <br> tags to RTF paragraph breaks
+        question_rtf = question.replace("<br>", r"\par ")
+        # Remove any other HTML tags
+        question_rtf = re.sub(r'<[^>]+>', '', question_rtf)
+        # Each question and its answers are separated by a single paragraph break
+        rtf_body += question_rtf + r"\par "
+    # Add answer key section if using the alternative method
+    if use_answer_key_method and answer_key:
+        rtf_body += r"\par Answers:\par "
+        for i, answer in enumerate(answer_key, 1):
+            rtf_body += f"{i}. {answer.lower()}" + r"\par "
+    return rtf_header + rtf_body + "}"
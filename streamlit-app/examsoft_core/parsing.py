@@ -0,0 +1,171 @@
+# Splits pasted or extracted exam text into formatted ExamSoft questions
+
+import re
+from collections import OrderedDict
+
+from examsoft_core.formatting import format_multiple_choice_question, format_essay_question
+
+# Formatted blocks remembered by a BlockMemo (about one large exam's worth, several times over)
+MEMO_MAX_BLOCKS = 2000
+
+class BlockMemo:
+    """Bounded LRU of formatted question blocks, so re-parsing edited text only formats changed blocks"""
+
+    def __init__(self, max_blocks=MEMO_MAX_BLOCKS):
+        self.max_blocks = max_blocks
+        self._blocks = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_format(self, key, build):
+        """Return the block formatted for ``key``, calling ``build()`` only if it is not remembered"""
+        if key in self._blocks:
+            self._blocks.move_to_end(key)
+            self.hits += 1
+            return self._blocks[key]
+
+        self.misses += 1
+        value = build()
+        self._blocks[key] = value
+        if len(self._blocks) > self.max_blocks:
+            self._blocks.popitem(last=False)
+        return value
+
+def parse_questions_from_text(questions_text, answer_key, use_asterisk_method=True, memo=None):
+    """Parse questions from the text and format for ExamSoft.
+
+    With a BlockMemo, blocks whose text (and answer) are unchanged since an
+    earlier call are reused instead of formatted again.
+    """
+    formatted_questions = []
+    mc_index = 0  # index for multiple choice questions only
+    
+    # Simple approach: Split on numbered questions and treat them all as MC
+    # Extract essays separately and add at the end
+    
+    # First, extract essays that are NOT numbered questions
+    essay_content = None
+    essay_match = re.search(r'(?:^|\n)\s*(ESSAY[^\n]*.*?)(?=\n\s*\d+\.\s|\Z)', questions_text, re.DOTALL | re.IGNORECASE)
+    if essay_match:
+        essay_content = essay_match.group(1).strip()
+        # Remove essay from the text to avoid interference
+        questions_text = questions_text[:essay_match.start()] + questions_text[essay_match.end():]
+    
+    # Parse numbered questions - ALL are treated as multiple choice
+    question_blocks = re.split(r'(?:^|\n)\s*(?:Type:\s*E\s+)?(\d+)\.\s+', questions_text)
+    highest_question_num = 0
+    
+    for i in range(1, len(question_blocks), 2):
+        if i + 1 < len(question_blocks):
+            q_num = int(question_blocks[i])
+            highest_question_num = max(highest_question_num, q_num)
+            q_content = question_blocks[i + 1].strip()
+            
+            if q_content:  # Only process if there's content
+                # Template logic: ALL numbered questions are multiple choice
+                if memo is None:
+                    formatted_q = format_multiple_choice_question(q_num, q_content, answer_key, use_asterisk_method, mc_index)
+                else:
+                    # Only the answer for this question affects its formatting
+                    answer = answer_key[mc_index] if use_asterisk_method and mc_index < len(answer_key) else None
+                    formatted_q = memo.get_or_format(
+                        ('mc', q_num, q_content, use_asterisk_method, answer),
+                        lambda: format_multiple_choice_question(q_num, q_content, answer_key, use_asterisk_method, mc_index)
+                    )
+                mc_index += 1
+                if formatted_q:
+                    formatted_questions.append(formatted_q)
+    
+    # Add essay question at the end if found
+    if essay_content:
+        next_question_num = highest_question_num + 1
+        if memo is None:
+            formatted_q = format_essay_question(next_question_num, essay_content)
+        else:
+            formatted_q = memo.get_or_format(
+                ('essay', next_question_num, essay_content),
+                lambda: format_essay_question(next_question_num, essay_content)
+            )
+        if formatted_q:
+            formatted_questions.append(formatted_q)
+    
+    return formatted_questions
+
+def classify_question(q_content):
+    """Classify question as 'mc' or 'essay' based on content and structure."""
+    lines = q_content.split('\n')
+    
+    # Method 0: Primary template logic - if content has "ESSAY" indicators, it's essay
+    if 'ESSAY' in q_content.upper() or 'WORD COUNT' in q_content.upper():
+        return 'essay'
+    
+    # Method 1: Check for explicit A, B, C, D answer choices
+    choice_patterns = [
+        r'^\s*[A-D]\.\s+',      # Standard: "A. answer" (allows leading whitespace)
+        r'^\s*[A-D]\)\s+',      # Alternative: "A) answer"
+    ]
+    
+    found_choices = set()
+    for line in lines:
+        line_stripped = line.strip()
+        if line_stripped:
+            for pattern in choice_patterns:
+                match = re.match(pattern, line_stripped)
+                if match:
+                    letter = line_stripped[0].upper()
+                    if letter in ['A', 'B', 'C', 'D']:
+                        found_choices.add(letter)
+    
+    # If we found explicit A,B,C,D labels, it's definitely multiple choice
+    if len(found_choices) >= 2 and 'A' in found_choices:
+        return 'mc'
+    
+    # Method 2: Template logic - numbered questions are typically multiple choice
+    # In the document structure, numbered questions (like "3. question text") are MC
+    # while essays start with "ESSAY QUESTION" headers
+    first_line = lines[0].strip() if lines else ""
+    
+    # Check if content starts with a number (indicating numbered question structure)
+    if re.match(r'^\d+\.\s', first_line):
+        # This follows the numbered question template - likely multiple choice
+        # Look for "Which of the following" + multiple answer options as confirmation
+        has_which_following = any('which of the following' in line.lower() for line in lines)
+        
+        if has_which_following:
+            # Count potential answer lines
+            potential_answers = []
+            for line in lines:
+                line_stripped = line.strip()
+                if (line_stripped and 
+                    not line_stripped.lower().startswith('which of the following') and
+                    not line_stripped.endswith('?') and
+                    not re.match(r'^\d+\.', line_stripped) and  # Not a question number
+                    len(line_stripped) > 5):  # Reasonable answer length
+                    potential_answers.append(line_stripped)
+            
+            # If we found multiple potential answers, it's multiple choice
+            if len(potential_answers) >= 3:
+                return 'mc'
+        
+        # Even without "which of the following", numbered questions are usually MC
+        return 'mc'
+    
+    # Default: if it doesn't follow numbered question structure, treat as essay
+    return 'essay'
+
+def parse_answer_key_with_header_detection(answer_key_text):
+    """Parse a pasted answer key, taking the first letter on each line"""
+    if not answer_key_text:
+        return []
+    
+    lines = [line.strip() for line in answer_key_text.strip().split('\n') if line.strip()]
+    
+    # Simple implementation - just extract letters
+    answers = []
+    for line in lines:
+        # Look for patterns like "A", "1. A", "A.", etc.
+        match = re.search(r'[A-Za-z]', line)
+        if match:
+            answers.append(match.group().upper())
+    
+    return answers
@@ -0,0 +1,40 @@
+# Answer key checks for the formatted questions shown in the review preview
+
+import re
+
+CHOICE_LINE = re.compile(r'^(\*?)([A-D])\. ', re.MULTILINE)
+
+def is_essay(question):
+    """True for formatted essay questions"""
+    return question.startswith("Type: E")
+
+def find_answer_mismatches(questions_list, answer_key, use_asterisk_method=True):
+    """Map question index to a reason for each multiple-choice question whose answer looks wrong.
+
+    Flags questions with no answer in the key, a key letter that is not one
+    of the question's choices, or (asterisk method) no choice marked correct.
+    Returns {} when there is no answer key at all.
+    """
+    flags = {}
+    if not answer_key:
+        # No key supplied; answers are marked by hand in the questions
+        return flags
+    mc_index = 0
+
+    for index, question in enumerate(questions_list):
+        if is_essay(question):
+            continue
+
+        choices = CHOICE_LINE.findall(question)
+        letters = {letter for _, letter in choices}
+        answer = answer_key[mc_index].upper().strip() if mc_index < len(answer_key) else ''
+
+        if not answer:
+            flags[index] = "No answer in the answer key"
+        elif answer not in letters:
+            flags[index] = f"Answer {answer} is not one of the choices ({', '.join(sorted(letters)) or 'none found'})"
+        elif use_asterisk_method and not any(marker for marker, _ in choices):
+            flags[index] = "No choice marked correct"
+        mc_index += 1
+
+    return flags
@@ -0,0 +1,102 @@
+# Text clean-up and naming helpers shared by the parser and the emitters
+
+import re
+from datetime import datetime
+
+from input_decoding import needs_mojibake_repair, repair_mojibake
+
+# Every mojibake sequence the replacement table handles starts with one of these
+MOJIBAKE_LEADS = ('â€', 'Ã', 'Â')
+
+# Repaired punctuation normalized to the same ASCII the replacement table produces
+REPAIRED_PUNCTUATION = str.maketrans({
+    '\u2019': "'",
+    '\u2018': "'",
+    '\u201c': '"',
+    '\u201d': '"',
+    '\u2013': '-',
+    '\u2026': '...',
+})
+
+def clean_text_encoding(text):
+    """Fix common mojibake/encoding issues from Windows-1252/UTF-8 mismatches."""
+    # Uploads are decoded with the right encoding up front, so most text is clean
+    if not any(lead in text for lead in MOJIBAKE_LEADS):
+        return text
+    if needs_mojibake_repair(text):
+        repaired = repair_mojibake(text)
+        if repaired is not None:
+            return repaired.translate(REPAIRED_PUNCTUATION)
+    
+    replacements = {
+        'â€™': "'",
+        'â€œ': '"',
+        'â€': '"',
+        'â€˜': "'",
+        'â€“': '-',
+        'â€”': '—',
+        'â€¦': '...',
+        'â€¢': '•',
+        'â€': '"',
+        'â€\x9d': '"',
+        'â€\x9c': '"',
+        'â€\x98': "'",
+        'â€\x99': "'",
+        'Ã©': 'é',
+        'Ã¨': 'è',
+        'Ã¢': 'â',
+        'Ãª': 'ê',
+        'Ã®': 'î',
+        'Ã´': 'ô',
+        'Ã¶': 'ö',
+        'Ã¼': 'ü',
+        'Ã«': 'ë',
+        'Ã§': 'ç',
+        'Ã ': 'à',
+        'Ã¹': 'ù',
+        'Ã»': 'û',
+        'Ã¼': 'ü',
+        'ÃŸ': 'ß',
+        'Â©': '©',
+        'Â®': '®',
+        'Â±': '±',
+        'Â·': '·',
+        'Â°': '°',
+        'Â¼': '¼',
+        'Â½': '½',
+        'Â¾': '¾',
+        'Â«': '«',
+        'Â»': '»',
+        'Â·': '·',
+        'Â': '',
+    }
+    for bad, good in replacements.items():
+        text = text.replace(bad, good)
+    return text
+
+def generate_filename(course, section, professor, file_type, extension="rtf"):
+    """Generate filename with format: COURSE_SECTION_PROFESSOR_TYPE_YYMMDD.ext"""
+    # Get current date in YYMMDD format
+    date_stamp = datetime.now().strftime("%y%m%d")
+    
+    # Clean inputs
+    course_clean = course.strip().upper() if course.strip() else "COURSE"
+    section_clean = section.strip() if section.strip() else "001"
+    professor_clean = professor.strip().title() if professor.strip() else "Professor"
+    
+    # Generate filename
+    filename = f"{course_clean}_{section_clean}_{professor_clean}_{file_type}_{date_stamp}.{extension}"
+    return filename
+
+def parse_exam_content(text):
+    """Parse exam text into instructions and questions sections"""
+    # text is already cleaned by clean_text_encoding
+    # Find the split between instructions and questions
+    multiple_choice_match = re.search(r'MULTIPLE[-\s]*CHOICE', text, re.IGNORECASE)
+    if multiple_choice_match:
+        instructions_text = text[:multiple_choice_match.start()].strip()
+        questions_text = text[multiple_choice_match.end():].strip()
+        return instructions_text, questions_text
+    else:
+        # If no MULTIPLE-CHOICE found, assume everything is questions
+        return "", text
@@ -1,26 +1,11 @@
-import tempfile
 import os
 import subprocess
-import requests
-from datetime import datetime
 import streamlit as st
-import pandas as pd
-from pathlib import Path
-import re
-import docx
-from docx import Document
-from docx.shared import Inches
-from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
-import io
-from io import BytesIO
 import zipfile
 
-# Try to import optional dependencies
-try:
-    from striprtf.striprtf import rtf_to_text
-    RTF_AVAILABLE = True
-except ImportError:
-    RTF_AVAILABLE = False
+# Parsing, formatting and the RTF/DOCX emitters live in the UI-free core package;
+# parse_exam_content is re-exported for utils/testing/debug_questions.py
+from examsoft_core import clean_text_encoding, parse_exam_content
 
 # Import Microsoft 365 configuration
 try:
@@ -44,8 +29,11 @@ try:
     SHAREPOINT_INTEGRATION_AVAILABLE = True
     
     # Direct upload function with correct path
-    def upload_to_sharepoint_corrected(access_token, file_content, filename):
-        """Upload to correct SharePoint path: IT/Shared Documents/ExamSoft/File-converter/Import with robust error handling"""
+    def upload_to_sharepoint_corrected(access_token, file_content, filename, on_progress=None):
+        """Upload to correct SharePoint path: IT/Shared Documents/ExamSoft/File-converter/Import with robust error handling
+
+        on_progress(bytes_sent, total_bytes) is called after each chunk of a session upload.
+        """
         try:
             import requests
             from urllib.parse import quote
@@ -87,7 +75,7 @@ try:
             # Step 3: Use different upload methods based on file size
             if content_size > 4 * 1024 * 1024:  # > 4MB, use session upload
                 print("📤 Large file detected, using upload session...")
-                return upload_large_file_with_session(site_id, access_token, file_content, clean_filename)
+                return upload_large_file_with_session(site_id, access_token, file_content, clean_filename, on_progress)
             else:
                 print("📤 Small file, using direct upload...")
                 return upload_small_file_direct(site_id, access_token, file_content, clean_filename)
@@ -299,7 +287,7 @@ try:
         
         return False, "All upload methods failed - this may be a permissions or configuration issue"
     
-    def upload_large_file_with_session(site_id, access_token, file_content, filename):
+    def upload_large_file_with_session(site_id, access_token, file_content, filename, on_progress=None):
         """Upload large files using upload session"""
         import requests
         from urllib.parse import quote
@@ -350,6 +338,8 @@ try:
                     if chunk_response.status_code not in [202, 200, 201]:
                         print(f"❌ Chunk upload failed: {chunk_response.text}")
                         return False, f"Chunk upload failed: {chunk_response.status_code}"
+                    if on_progress is not None:
+                        on_progress(end, total_size)
                 
                 # Final response should contain file info
                 if chunk_response.status_code in [200, 201]:
@@ -377,93 +367,6 @@ try:
 except ImportError as e:
     SHAREPOINT_INTEGRATION_AVAILABLE = False
 
-def generate_docx_with_questions(questions_list, instructions_text, output_path):
-    """Generate a DOCX file with instructions and questions, formatted simply."""
-    doc = Document()
-    # Set default font to Times New Roman 12pt
-    style = doc.styles['Normal']
-    font = style.font
-    font.name = 'Times New Roman'
-    font.size = docx.shared.Pt(12)
-    # Do NOT add instructions to the main exam file
-    # Add questions
-    for q in questions_list:
-        lines = q.split('\n')
-        is_essay = False
-        for idx, line in enumerate(lines):
-            line = line.strip()
-            # Replace problematic bullets/question marks with standard text
-            line = line.replace('\u2022', '-')
-            line = line.replace('\u25CF', '-')
-            line = line.replace('\u25A0', '-')
-            line = line.replace('\u25CB', '-')
-            line = line.replace('\u25AA', '-')
-            line = line.replace('\u25B2', '-')
-            line = line.replace('\u25BA', '-')
-            line = line.replace('\u25C6', '-')
-            line = line.replace('\u25CF', '-')
-            line = line.replace('\uFFFD', '-')
-            # Remove any leading non-ASCII chars
-            line = re.sub(r'^[^\x00-\x7F]+', '', line)
-            if line == 'Type: E':
-                is_essay = True
-                # Do not add a separate heading, handled below
-            elif is_essay and re.match(r'^\d+\. ', line):
-                # Essay question number and content: prepend 'Type: E'
-                qnum_match = re.match(r'^(\d+)(\. )(.*)', line)
-                if qnum_match:
-                    para = doc.add_paragraph()
-                    run_type = para.add_run('Type: E ')
-                    run_type.bold = True
-                    run_type.font.name = 'Times New Roman'
-                    run_type.font.size = docx.shared.Pt(12)
-                    run_num = para.add_run(qnum_match.group(1) + qnum_match.group(2))
-                    run_num.bold = True
-                    run_num.font.name = 'Times New Roman'
-                    run_num.font.size = docx.shared.Pt(12)
-                    run_txt = para.add_run(qnum_match.group(3))
-                    run_txt.font.name = 'Times New Roman'
-                    run_txt.font.size = docx.shared.Pt(12)
-                else:
-                    para = doc.add_paragraph('Type: E ' + line)
-                    for run in para.runs:
-                        run.font.name = 'Times New Roman'
-                        run.font.size = docx.shared.Pt(12)
-            elif re.match(r'^\d+\. ', line):
-                # Bold question number, normal text after (non-essay)
-                qnum_match = re.match(r'^(\d+)(\. )(.*)', line)
-                if qnum_match:
-                    para = doc.add_paragraph()
-                    run_num = para.add_run(qnum_match.group(1) + qnum_match.group(2))
-                    run_num.bold = True
-                    run_num.font.name = 'Times New Roman'
-                    run_num.font.size = docx.shared.Pt(12)
-                    run_txt = para.add_run(qnum_match.group(3))
-                    run_txt.font.name = 'Times New Roman'
-                    run_txt.font.size = docx.shared.Pt(12)
-                else:
-                    doc.add_paragraph(line)
-            elif re.match(r'^[*]?[A-D]\. ', line):
-                # Indented plain paragraph for answer choices, preserve asterisk
-                para = doc.add_paragraph(line)
-                para.paragraph_format.left_indent = docx.shared.Inches(0.25)
-                for run in para.runs:
-                    run.font.name = 'Times New Roman'
-                    run.font.size = docx.shared.Pt(12)
-            elif is_essay and idx > 0:
-                # Essay content
-                para = doc.add_paragraph(line)
-                para.paragraph_format.left_indent = docx.shared.Inches(0.25)
-                for run in para.runs:
-                    run.font.name = 'Times New Roman'
-                    run.font.size = docx.shared.Pt(12)
-            else:
-                para = doc.add_paragraph(line)
-                for run in para.runs:
-                    run.font.name = 'Times New Roman'
-                    run.font.size = docx.shared.Pt(12)
-        doc.add_paragraph('')
-    doc.save(output_path)
 
 def convert_docx_to_rtf_with_libreoffice(docx_path, rtf_path):
     """Convert DOCX to RTF using LibreOffice headless mode."""
@@ -496,32 +399,6 @@ except ImportError:
         return "http://localhost:8080/convert"
 
 
-def convert_docx_to_rtf_via_api(docx_path, rtf_path, api_url=None):
-    """Send DOCX to the LibreOffice Docker API and save the returned RTF."""
-    if api_url is None:
-        api_url = get_converter_endpoint()
-    
-    with open(docx_path, "rb") as f:
-        files = {'file': f}
-        response = requests.post(api_url, files=files)
-        response.raise_for_status()
-        with open(rtf_path, "wb") as out:
-            out.write(response.content)
-
-def generate_filename(course, section, professor, file_type, extension="rtf"):
-    """Generate filename with format: COURSE_SECTION_PROFESSOR_TYPE_YYMMDD.ext"""
-    # Get current date in YYMMDD format
-    date_stamp = datetime.now().strftime("%y%m%d")
-    
-    # Clean inputs
-    course_clean = course.strip().upper() if course.strip() else "COURSE"
-    section_clean = section.strip() if section.strip() else "001"
-    professor_clean = professor.strip().title() if professor.strip() else "Professor"
-    
-    # Generate filename
-    filename = f"{course_clean}_{section_clean}_{professor_clean}_{file_type}_{date_stamp}.{extension}"
-    return filename
-
 # SharePoint integration imports
 try:
     import msal
@@ -530,518 +407,60 @@ try:
 except ImportError:
     SHAREPOINT_AVAILABLE = False
 
-def clean_text_encoding(text):
-    """Fix common mojibake/encoding issues from Windows-1252/UTF-8 mismatches."""
-    replacements = {
-        'â€™': "'",
-        'â€œ': '"',
-        'â€': '"',
-        'â€˜': "'",
-        'â€“': '-',
-        'â€”': '—',
-        'â€¦': '...',
-        'â€¢': '•',
-        'â€': '"',
-        'â€\x9d': '"',
-        'â€\x9c': '"',
-        'â€\x98': "'",
-        'â€\x99': "'",
-        'Ã©': 'é',
-        'Ã¨': 'è',
-        'Ã¢': 'â',
-        'Ãª': 'ê',
-        'Ã®': 'î',
-        'Ã´': 'ô',
-        'Ã¶': 'ö',
-        'Ã¼': 'ü',
-        'Ã«': 'ë',
-        'Ã§': 'ç',
-        'Ã ': 'à',
-        'Ã¹': 'ù',
-        'Ã»': 'û',
-        'Ã¼': 'ü',
-        'ÃŸ': 'ß',
-        'Â©': '©',
-        'Â®': '®',
-        'Â±': '±',
-        'Â·': '·',
-        'Â°': '°',
-        'Â¼': '¼',
-        'Â½': '½',
-        'Â¾': '¾',
-        'Â«': '«',
-        'Â»': '»',
-        'Â·': '·',
-        'Â': '',
-    }
-    for bad, good in replacements.items():
-        text = text.replace(bad, good)
-    return text
 
 def extract_text_from_rtf(file):
     """Extract clean text from RTF file"""
-    try:
-        from striprtf.striprtf import rtf_to_text
-        content = file.read().decode('utf-8', errors='ignore')
-        text = rtf_to_text(content)
-        return clean_text_encoding(text)
-    except ImportError:
-        # Manual RTF text extraction
-        content = file.read().decode('utf-8', errors='ignore')
-        # ...existing code...
-        # Remove any remaining hex/numeric artifacts
-        content = re.sub(r'\b\d{8,}\b', ' ', content)
-        text = content.strip()
-        return clean_text_encoding(text)
+    from stream_extractors import extract_rtf_text
+    # Tokenize the raw bytes; pictures, objects and tables are skipped undecoded
+    text = extract_rtf_text(file)
+    return clean_text_encoding(text)
 
 def extract_text_from_docx(file):
     """Extract text from DOCX file"""
-    doc = docx.Document(file)
-    text = "\n".join([para.text for para in doc.paragraphs])
+    from stream_extractors import extract_docx_text
+    try:
+        # Stream word/document.xml instead of building the python-docx tree
+        text = extract_docx_text(file)
+    except (zipfile.BadZipFile, KeyError):
+        import docx
+        file.seek(0)
+        doc = docx.Document(file)
+        text = "\n".join([para.text for para in doc.paragraphs])
     return clean_text_encoding(text)
 
 def extract_text_from_odt(file):
     """Extract text from ODT file"""
+    from stream_extractors import extract_odt_text
     try:
-        from odf.text import P
-        from odf.opendocument import load
-        doc = load(file)
-        paragraphs = doc.getElementsByType(P)
-        text_content = []
-        for p in paragraphs:
-            text_content.append(str(p))
-        return clean_text_encoding('\n'.join(text_content))
-    except ImportError:
-        st.error("❌ ODT support requires 'odfpy' library. Please convert to DOCX format.")
-        return ""
+        # Stream content.xml instead of building odfpy's DOM
+        return clean_text_encoding(extract_odt_text(file))
     except Exception as e:
         st.error(f"❌ Failed to read ODT file: {str(e)}")
         return ""
 
 def extract_text(file):
-    """Extract text from uploaded file based on file type"""
-    file_extension = file.name.lower().split('.')[-1]
-    if file_extension == 'rtf':
-        return extract_text_from_rtf(file)
-    elif file_extension in ['docx', 'doc']:
-        return extract_text_from_docx(file)
-    elif file_extension == 'odt':
-        return extract_text_from_odt(file)
-    else:
-        st.error(f"Unsupported file type: {file_extension}")
+    """Extract text from uploaded file based on its sniffed format"""
+    from extractor_registry import extract_document, UnsupportedFormatError
+    try:
+        result = extract_document(file.read(), file.name)
+    except UnsupportedFormatError as e:
+        st.error(f"Unsupported file type: {e}")
+        return ""
+    except Exception as e:
+        st.error(f"❌ Failed to read {file.name}: {str(e)}")
         return ""
+    return clean_text_encoding(result['text'])
 
 def load_answer_key(file):
     """Load answer key from Excel, ODS, or CSV file"""
+    from answer_key_reader import read_answer_key
     try:
-        if file.name.endswith('.xlsx'):
-            # Try reading with and without header
-            try:
-                df = pd.read_excel(file, header=0)
-            except Exception:
-                file.seek(0)
-                df = pd.read_excel(file, header=None)
-        elif file.name.endswith('.ods'):
-            # ODS file
-            try:
-                df = pd.read_excel(file, engine='odf', header=0)
-            except Exception:
-                file.seek(0)
-                df = pd.read_excel(file, engine='odf', header=None)
-        else:
-            try:
-                df = pd.read_csv(file, header=0)
-            except Exception:
-                file.seek(0)
-                df = pd.read_csv(file, header=None)
-
-        # Find the first non-empty column (works for header/no-header)
-        for col in df.columns:
-            col_data = df[col].dropna().astype(str).str.strip()
-            # Only use if at least half the rows are non-empty and look like answers (A-D or a-d)
-            if col_data.str.match(r'^[A-Da-d]$').sum() >= max(1, len(col_data) // 2):
-                answers = col_data.tolist()
-                return answers
-        # Fallback: just use the first column, skipping empty rows
-        answers = df.iloc[:, 0].dropna().astype(str).str.strip().tolist()
-        return answers
+        # Streams the first sheet and detects the answer column in one pass
+        return read_answer_key(file, file.name)
     except Exception as e:
         st.error(f"Error loading answer key: {e}")
         return []
 
-def parse_exam_content(text):
-    """Parse exam text into instructions and questions sections"""
-    # text is already cleaned by clean_text_encoding
-    # Find the split between instructions and questions
-    multiple_choice_match = re.search(r'MULTIPLE[-\s]*CHOICE', text, re.IGNORECASE)
-    if multiple_choice_match:
-        instructions_text = text[:multiple_choice_match.start()].strip()
-        questions_text = text[multiple_choice_match.end():].strip()
-        return instructions_text, questions_text
-    else:
-        # If no MULTIPLE-CHOICE found, assume everything is questions
-        return "", text
-
-def format_instructions_rtf(text):
-    """Format instructions as clean RTF"""
-    # Clean the text
-    text = re.sub(r'\s+', ' ', text)
-    text = text.strip()
-    
-    # Create simple RTF format
-    rtf_header = r"{\rtf1\ansi\deff0{\fonttbl{\f0 Times New Roman;}}\f0\fs24"
-    
-    # Convert to RTF with proper line breaks
-    rtf_text = text.replace('\n', r'\line ')
-    
-    # Close RTF
-    return rtf_header + rtf_text + "}"
-
-def generate_instructions_docx(instructions_text):
-    """Generate a DOCX file with instructions, return as bytes"""
-    doc = Document()
-    
-    # Set default font to Times New Roman 12pt
-    style = doc.styles['Normal']
-    font = style.font
-    font.name = 'Times New Roman'
-    font.size = docx.shared.Pt(12)
-    
-    # Add title
-    title = doc.add_heading('INSTRUCTIONS', level=1)
-    title.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-    title_run = title.runs[0]
-    title_run.font.name = 'Times New Roman'
-    title_run.font.size = docx.shared.Pt(12)
-    title_run.bold = True
-    
-    # Headers that should be bold
-    bold_headers = ["Time", "Reference Materials", "Questions", "Multiple-Choice:", "Essay:", "Word Count:", "Please be sure to follow"]
-    
-    # Split instructions into paragraphs and format properly
-    paragraphs = instructions_text.split('\n\n')
-    for para_text in paragraphs:
-        if para_text.strip():
-            # Clean the text and handle encoding issues
-            clean_para = clean_text_encoding(para_text.strip())
-            para = doc.add_paragraph()
-            
-            # Check if this paragraph starts with a bold header
-            is_bold_header = any(clean_para.startswith(header) for header in bold_headers)
-            
-            if is_bold_header:
-                # Find where the header ends
-                for header in bold_headers:
-                    if clean_para.startswith(header):
-                        # Add the header as bold
-                        header_run = para.add_run(header)
-                        header_run.font.name = 'Times New Roman'
-                        header_run.font.size = docx.shared.Pt(12)
-                        header_run.bold = True
-                        
-                        # Add the rest as normal text
-                        remaining_text = clean_para[len(header):]
-                        if remaining_text:
-                            normal_run = para.add_run(remaining_text)
-                            normal_run.font.name = 'Times New Roman'
-                            normal_run.font.size = docx.shared.Pt(12)
-                        break
-            else:
-                # Regular paragraph
-                run = para.add_run(clean_para)
-                run.font.name = 'Times New Roman'
-                run.font.size = docx.shared.Pt(12)
-    
-    # Save to bytes
-    doc_bytes = io.BytesIO()
-    doc.save(doc_bytes)
-    doc_bytes.seek(0)
-    return doc_bytes.getvalue()
-
-def parse_questions_from_text(questions_text, answer_key, use_asterisk_method=True):
-    """Parse questions from the text and format for ExamSoft"""
-    formatted_questions = []
-    mc_index = 0  # index for multiple choice questions only
-    
-    # Simple approach: Split on numbered questions and treat them all as MC
-    # Extract essays separately and add at the end
-    
-    # First, extract essays that are NOT numbered questions
-    essay_content = None
-    essay_match = re.search(r'(?:^|\n)\s*(ESSAY[^\n]*.*?)(?=\n\s*\d+\.\s|\Z)', questions_text, re.DOTALL | re.IGNORECASE)
-    if essay_match:
-        essay_content = essay_match.group(1).strip()
-        # Remove essay from the text to avoid interference
-        questions_text = questions_text[:essay_match.start()] + questions_text[essay_match.end():]
-    
-    # Parse numbered questions - ALL are treated as multiple choice
-    question_blocks = re.split(r'(?:^|\n)\s*(?:Type:\s*E\s+)?(\d+)\.\s+', questions_text)
-    highest_question_num = 0
-    
-    for i in range(1, len(question_blocks), 2):
-        if i + 1 < len(question_blocks):
-            q_num = int(question_blocks[i])
-            highest_question_num = max(highest_question_num, q_num)
-            q_content = question_blocks[i + 1].strip()
-            
-            if q_content:  # Only process if there's content
-                # Template logic: ALL numbered questions are multiple choice
-                formatted_q = format_multiple_choice_question(q_num, q_content, answer_key, use_asterisk_method, mc_index)
-                mc_index += 1
-                if formatted_q:
-                    formatted_questions.append(formatted_q)
-    
-    # Add essay question at the end if found
-    if essay_content:
-        next_question_num = highest_question_num + 1
-        formatted_q = format_essay_question(next_question_num, essay_content)
-        if formatted_q:
-            formatted_questions.append(formatted_q)
-    
-    return formatted_questions
-
-def classify_question(q_content):
-    """Classify question as 'mc' or 'essay' based on content and structure."""
-    lines = q_content.split('\n')
-    
-    # Method 0: Primary template logic - if content has "ESSAY" indicators, it's essay
-    if 'ESSAY' in q_content.upper() or 'WORD COUNT' in q_content.upper():
-        return 'essay'
-    
-    # Method 1: Check for explicit A, B, C, D answer choices
-    choice_patterns = [
-        r'^\s*[A-D]\.\s+',      # Standard: "A. answer" (allows leading whitespace)
-        r'^\s*[A-D]\)\s+',      # Alternative: "A) answer"
-    ]
-    
-    found_choices = set()
-    for line in lines:
-        line_stripped = line.strip()
-        if line_stripped:
-            for pattern in choice_patterns:
-                match = re.match(pattern, line_stripped)
-                if match:
-                    letter = line_stripped[0].upper()
-                    if letter in ['A', 'B', 'C', 'D']:
-                        found_choices.add(letter)
-    
-    # If we found explicit A,B,C,D labels, it's definitely multiple choice
-    if len(found_choices) >= 2 and 'A' in found_choices:
-        return 'mc'
-    
-    # Method 2: Template logic - numbered questions are typically multiple choice
-    # In the document structure, numbered questions (like "3. question text") are MC
-    # while essays start with "ESSAY QUESTION" headers
-    first_line = lines[0].strip() if lines else ""
-    
-    # Check if content starts with a number (indicating numbered question structure)
-    if re.match(r'^\d+\.\s', first_line):
-        # This follows the numbered question template - likely multiple choice
-        # Look for "Which of the following" + multiple answer options as confirmation
-        has_which_following = any('which of the following' in line.lower() for line in lines)
-        
-        if has_which_following:
-            # Count potential answer lines
-            potential_answers = []
-            for line in lines:
-                line_stripped = line.strip()
-                if (line_stripped and 
-                    not line_stripped.lower().startswith('which of the following') and
-                    not line_stripped.endswith('?') and
-                    not re.match(r'^\d+\.', line_stripped) and  # Not a question number
-                    len(line_stripped) > 5):  # Reasonable answer length
-                    potential_answers.append(line_stripped)
-            
-            # If we found multiple potential answers, it's multiple choice
-            if len(potential_answers) >= 3:
-                return 'mc'
-        
-        # Even without "which of the following", numbered questions are usually MC
-        return 'mc'
-    
-    # Default: if it doesn't follow numbered question structure, treat as essay
-    return 'essay'
-
-def format_multiple_choice_question(q_num, content, answer_key, use_asterisk_method=True, mc_index=None):
-    """Format a multiple choice question according to ExamSoft RTF import guidelines"""
-    lines = content.split('\n')
-    question_text = []
-    choices = []
-    current_section = "question"
-    
-    # Enhanced patterns to catch indented answer choices
-    choice_patterns = [
-        r'^\s*([A-D])\.\s*(.+)',    # Standard or indented: "A. answer" or "    A. answer"
-        r'^\s*([A-D])\)\s*(.+)',    # Alternative: "A) answer"
-    ]
-    
-    # First pass: try to find explicit A,B,C,D choices
-    found_explicit_choices = False
-    for line in lines:
-        if not line.strip():
-            continue
-            
-        choice_match = None
-        for pattern in choice_patterns:
-            choice_match = re.match(pattern, line)
-            if choice_match:
-                found_explicit_choices = True
-                break
-        
-        if choice_match:
-            current_section = "choices"
-            choice_letter = choice_match.group(1)
-            choice_text = choice_match.group(2)
-            # Check if this is the correct answer
-            if use_asterisk_method and mc_index is not None and mc_index < len(answer_key):
-                correct_answer = answer_key[mc_index].upper().strip()
-                if choice_letter.upper() == correct_answer:
-                    choices.append(f"*{choice_letter}. {choice_text}")
-                else:
-                    choices.append(f"{choice_letter}. {choice_text}")
-            else:
-                choices.append(f"{choice_letter}. {choice_text}")
-        else:
-            if current_section == "question":
-                question_text.append(line.strip())
-    
-    # If no explicit choices found, but this was classified as MC, try to auto-assign A,B,C,D
-    if not found_explicit_choices:
-        # Look for "Which of the following" pattern and extract potential answers
-        potential_answers = []
-        question_stem = []
-        collecting_answers = False
-        
-        for line in lines:
-            line_stripped = line.strip()
-            if not line_stripped:
-                continue
-            
-            if 'which of the following' in line_stripped.lower():
-                question_stem.append(line_stripped)
-                collecting_answers = True
-            elif collecting_answers and len(line_stripped) > 10:  # Potential answer
-                potential_answers.append(line_stripped)
-            elif not collecting_answers:
-                question_stem.append(line_stripped)
-        
-        question_text = question_stem
-        
-        # Assign A,B,C,D to the potential answers
-        choice_letters = ['A', 'B', 'C', 'D']
-        for i, answer in enumerate(potential_answers[:4]):  # Limit to 4 choices
-            if i < len(choice_letters):
-                letter = choice_letters[i]
-                # Check if this is the correct answer
-                if use_asterisk_method and mc_index is not None and mc_index < len(answer_key):
-                    correct_answer = answer_key[mc_index].upper().strip()
-                    if letter == correct_answer:
-                        choices.append(f"*{letter}. {answer}")
-                    else:
-                        choices.append(f"{letter}. {answer}")
-                else:
-                    choices.append(f"{letter}. {answer}")
-    
-    result = []
-    if question_text:
-        # Join all question text
-        full_text = ' '.join(question_text)
-        
-        # Check if the question has multiple paragraphs (indicated by double newlines or long content)
-        paragraphs = []
-        
-        # Split by double newlines first
-        if '\n\n' in full_text:
-            paragraphs = [p.strip() for p in full_text.split('\n\n') if p.strip()]
-        else:
-            # For very long questions, try to split into logical paragraphs
-            # Look for sentence endings followed by capital letters (new paragraph indicators)
-            sentences = full_text.split('. ')
-            current_paragraph = []
-            
-            for i, sentence in enumerate(sentences):
-                current_paragraph.append(sentence)
-                
-                # If this is a long paragraph (>200 chars) and next sentence starts with capital, split
-                current_text = '. '.join(current_paragraph)
-                if (len(current_text) > 200 and 
-                    i < len(sentences) - 1 and 
-                    len(sentences[i + 1]) > 0 and 
-                    sentences[i + 1][0].isupper()):
-                    
-                    # Check if this looks like a natural paragraph break
-                    if not sentence.endswith(('Mr', 'Mrs', 'Dr', 'vs', 'Inc', 'Ltd', 'Co')):
-                        paragraphs.append(current_text + '.')
-                        current_paragraph = []
-            
-            # Add remaining text
-            if current_paragraph:
-                remaining = '. '.join(current_paragraph)
-                if not remaining.endswith('.') and len(sentences) > 1:
-                    remaining += '.'
-                paragraphs.append(remaining)
-        
-        # Format the question with paragraph tags if multiple paragraphs
-        if len(paragraphs) > 1:
-            result.append(f"{q_num}.")  # Question number on separate line
-            for para in paragraphs:
-                result.append(f"<p>{para}</p>")
-        else:
-            # Single paragraph - use standard formatting
-            full_question = f"{q_num}. {full_text}"
-            result.append(full_question)
-    
-    result.extend(choices)
-    return '\n'.join(result)
-
-def format_essay_question(q_num, content):
-    """Format an essay question according to ExamSoft RTF import guidelines"""
-    # Clean up the content
-    content = re.sub(r'Type:\s*E\s*\d*\.?\s*', '', content)
-    content = content.strip()
-    result = []
-    # Split into paragraphs by double newlines
-    paragraphs = [p.strip() for p in content.split('\n\n') if p.strip()]
-    # Output 'Type: E' and question number/title outside <p> tags
-    result.append(f"Type: E")
-    # If first paragraph looks like a title (e.g. 'ESSAY' or has word count), put it as the question line
-    if paragraphs:
-        # If first paragraph is all-caps or contains 'ESSAY' or 'Word Count', treat as title
-        first_para = paragraphs[0]
-        if re.match(r'^[A-Z\s()\-:;0-9.]+$', first_para) or 'ESSAY' in first_para.upper() or 'WORD COUNT' in first_para.upper():
-            result.append(f"{q_num}. {first_para}")
-            para_body = paragraphs[1:]
-        else:
-            result.append(f"{q_num}.")
-            para_body = paragraphs
-        # Wrap each body paragraph in <p> tags
-        for p in para_body:
-            result.append(f"<p>{p}</p>")
-    else:
-        # Fallback: just output question number and single paragraph
-        result.append(f"{q_num}.")
-        result.append(f"<p>{content}</p>")
-    return '\n'.join(result)
-
-def create_rtf_content(questions_list, answer_key=None, use_answer_key_method=False):
-    """Create RTF content for ExamSoft import"""
-    # Use Times New Roman, 12pt, normal spacing, and proper paragraph breaks
-    rtf_header = r"{\rtf1\ansi\deff0{\fonttbl{\f0 Times New Roman;}}\f0\fs24 "
-    rtf_body = ""
-    for question in questions_list:
-        # Convert HTML <br> tags to RTF paragraph breaks
-        question_rtf = question.replace("<br>", r"\par ")
-        # Remove any other HTML tags
-        question_rtf = re.sub(r'<[^>]+>', '', question_rtf)
-        # Each question and its answers are separated by a single paragraph break
-        rtf_body += question_rtf + r"\par "
-    # Add answer key section if using the alternative method
-    if use_answer_key_method and answer_key:
-        rtf_body += r"\par Answers:\par "
-        for i, answer in enumerate(answer_key, 1):
-            rtf_body += f"{i}. {answer.lower()}" + r"\par "
-    return rtf_header + rtf_body + "}"
-
 
 def main():
     """Main Streamlit application function"""
@@ -1121,7 +540,6 @@ if __name__ == "__main__":
     main()
 
 # Prevent UI execution during import for safe_formatter
-import os
 if os.environ.get('STREAMLIT_IMPORT_ONLY') == '1':
     # Skip all UI code when imported by safe_formatter
     pass
@@ -0,0 +1,41 @@
+# Runs independent upload extractions (instructions, questions, answer key)
+# concurrently on a small thread pool. Progress callbacks fire on the calling
+# thread, so they are free to update Streamlit widgets.
+
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Uploads are extracted at most this many at a time
+MAX_EXTRACTION_WORKERS = 3
+
+_extraction_executor = ThreadPoolExecutor(max_workers=MAX_EXTRACTION_WORKERS,
+                                          thread_name_prefix='upload-extract')
+
+def run_extractions(tasks, on_update=None):
+    """Run extraction tasks concurrently and wait for all of them.
+
+    ``tasks`` maps a name to ``(function, *args)``. Returns a dict mapping
+    each name to ``{'result', 'error', 'seconds'}``; a task that raises keeps
+    its exception in 'error' instead of failing the others. ``on_update(name,
+    outcome, done, total)`` is called as each task finishes.
+    """
+    started = time.perf_counter()
+    futures = {
+        _extraction_executor.submit(function, *args): name
+        for name, (function, *args) in tasks.items()
+    }
+
+    outcomes = {}
+    for future in as_completed(futures):
+        name = futures[future]
+        try:
+            outcome = {'result': future.result(), 'error': None}
+        except Exception as e:
+            outcome = {'result': None, 'error': e}
+        outcome['seconds'] = time.perf_counter() - started
+        outcomes[name] = outcome
+
+        if on_update is not None:
+            on_update(name, outcome, len(outcomes), len(futures))
+
+    return outcomes
@@ -0,0 +1,193 @@
+# Registry of text extractors keyed by sniffed file format
+# Uploads are identified from their leading bytes rather than the browser's
+# MIME type or the file extension, and each extractor's module is only
+# imported the first time a file of that format shows up.
+
+import io
+import csv
+import zipfile
+import importlib
+
+# Bytes examined when sniffing text formats
+SNIFF_BYTES = 8192
+
+ZIP_MAGIC = b'PK\x03\x04'
+OLE_MAGIC = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+PDF_MAGIC = b'%PDF'
+UTF8_BOM = b'\xef\xbb\xbf'
+
+ODF_MIMETYPES = {
+    b'application/vnd.oasis.opendocument.text': 'odt',
+    b'application/vnd.oasis.opendocument.spreadsheet': 'ods',
+}
+
+class UnsupportedFormatError(Exception):
+    """Raised when an upload is not in a format we can extract text from"""
+
+def _as_file(data):
+    """Binary file object over an upload without copying file-like (memory-mapped) input"""
+    if hasattr(data, 'seek'):
+        data.seek(0)
+        return data
+    return io.BytesIO(data)
+
+def extract_plain_text(data):
+    """Decode a plain-text upload (BOM, then UTF-8, then Windows-1252)"""
+    from input_decoding import decode_bytes
+    return decode_bytes(data)[0]
+
+# format -> extractor definition. 'extract' and 'page_count' are
+# "module:function" references resolved on first use. Capabilities:
+#   streaming   - the extractor works through the file without loading a full document model
+#   page_count  - a page count can be read from the file's metadata
+#   answers     - the extractor returns (text, answers) rather than text
+# 'version' is part of the extraction cache key; bump it when an extractor's
+# output changes so stale cached text is not served.
+EXTRACTORS = {
+    'docx': {'label': 'Word document', 'extract': 'stream_extractors:extract_docx_text',
+             'page_count': 'stream_extractors:docx_page_count', 'streaming': True, 'version': 1},
+    'rtf': {'label': 'RTF document', 'extract': 'stream_extractors:extract_rtf_text',
+            'page_count': 'stream_extractors:rtf_page_count', 'streaming': True, 'version': 2},
+    'odt': {'label': 'ODT document', 'extract': 'stream_extractors:extract_odt_text',
+            'page_count': 'stream_extractors:odt_page_count', 'streaming': True, 'version': 3},
+    'txt': {'label': 'text file', 'extract': 'extractor_registry:extract_plain_text',
+            'page_count': None, 'streaming': True, 'version': 2},
+    'csv': {'label': 'CSV file', 'extract': 'tabular_extract:extract_tabular_text',
+            'page_count': None, 'streaming': True, 'answers': True, 'version': 2},
+    'xlsx': {'label': 'Excel file', 'extract': 'tabular_extract:extract_tabular_text',
+             'page_count': None, 'streaming': False, 'answers': True, 'version': 1},
+    'ods': {'label': 'ODS file', 'extract': 'tabular_extract:extract_tabular_text',
+            'page_count': None, 'streaming': True, 'answers': True, 'version': 2},
+}
+
+# Resolved "module:function" references
+_resolved = {}
+
+def register_extractor(fmt, label, extract, page_count=None, streaming=False, answers=False, version=1):
+    """Add or replace the extractor for a format"""
+    EXTRACTORS[fmt] = {'label': label, 'extract': extract, 'page_count': page_count,
+                       'streaming': streaming, 'answers': answers, 'version': version}
+
+def _resolve(reference):
+    """Import the function behind a "module:function" reference"""
+    if callable(reference):
+        return reference
+    if reference not in _resolved:
+        module_name, function_name = reference.split(':')
+        _resolved[reference] = getattr(importlib.import_module(module_name), function_name)
+    return _resolved[reference]
+
+def _sniff_zip(data):
+    """Tell DOCX, XLSX, ODT and ODS apart from the zip contents"""
+    # ODF stores an uncompressed 'mimetype' entry first, right after its 30-byte header
+    if data[30:38] == b'mimetype':
+        for mimetype, fmt in ODF_MIMETYPES.items():
+            if data[38:38 + len(mimetype)] == mimetype:
+                return fmt
+
+    try:
+        with zipfile.ZipFile(_as_file(data)) as archive:
+            names = archive.namelist()
+    except zipfile.BadZipFile:
+        return None
+
+    if 'word/document.xml' in names:
+        return 'docx'
+    if 'xl/workbook.xml' in names:
+        return 'xlsx'
+    if 'mimetype' in names:
+        with zipfile.ZipFile(_as_file(data)) as archive:
+            return ODF_MIMETYPES.get(archive.read('mimetype').strip())
+    return None
+
+def _looks_like_csv(head):
+    """True when the first lines split into the same number (>1) of fields"""
+    lines = [line for line in head.splitlines()[:20] if line.strip()]
+    if len(lines) > 1 and len(head) == SNIFF_BYTES:
+        # The last line was probably cut off mid-record
+        lines = lines[:-1]
+    if len(lines) < 2:
+        return False
+    try:
+        dialect = csv.Sniffer().sniff('\n'.join(lines), delimiters=',;\t')
+    except csv.Error:
+        return False
+    widths = {len(row) for row in csv.reader(lines, dialect)}
+    return len(widths) == 1 and widths.pop() > 1
+
+def sniff_format(data, filename=''):
+    """Identify an upload's format from its bytes.
+
+    Containers (zip, RTF, OLE, PDF) are decided by magic bytes alone. For plain
+    text the .csv/.txt extension wins when present, otherwise a CSV heuristic
+    decides. Raises UnsupportedFormatError for formats we cannot read.
+    """
+    head = bytes(data[:SNIFF_BYTES])
+    extension = filename.lower().rsplit('.', 1)[-1] if '.' in filename else ''
+
+    if head.startswith(ZIP_MAGIC):
+        fmt = _sniff_zip(data)
+        if fmt is None:
+            raise UnsupportedFormatError("Unrecognized zip-based file. Please upload DOCX, ODT, XLSX or ODS.")
+        return fmt
+    if head.lstrip(UTF8_BOM).lstrip().startswith(b'{\\rtf'):
+        return 'rtf'
+    if head.startswith(OLE_MAGIC):
+        raise UnsupportedFormatError("Legacy Word/Excel (.doc/.xls) files are not supported. Please save as DOCX or XLSX.")
+    if head.startswith(PDF_MAGIC):
+        raise UnsupportedFormatError("PDF files are not supported. Please upload DOCX, RTF, ODT or TXT.")
+    from input_decoding import detect_encoding
+    encoding = detect_encoding(head, partial=True)
+    if b'\x00' in head and not encoding.startswith(('utf-16', 'utf-32')):
+        raise UnsupportedFormatError("Binary file type not recognized.")
+
+    if extension in ('csv', 'txt'):
+        return extension
+    return 'csv' if _looks_like_csv(head.decode(encoding, errors='replace')) else 'txt'
+
+def get_extractor(fmt):
+    """Return the extractor definition for a format"""
+    try:
+        return EXTRACTORS[fmt]
+    except KeyError:
+        raise UnsupportedFormatError(f"No extractor registered for '{fmt}' files.")
+
+def extract_document(data, filename='', caches=()):
+    """Sniff and extract an upload.
+
+    Returns a dict with the detected 'format', its 'label', the extracted
+    'text', any 'answers' found in a question-bank spreadsheet and the
+    recorded 'pages' (None when the format or file does not provide it).
+
+    ``caches`` are ContentCache (or DiskCache) instances checked in order (fastest first),
+    keyed by the SHA-256 of the bytes, the format and the extractor version.
+    The returned dict may be shared with other callers; do not modify it.
+    """
+    fmt = sniff_format(data, filename)
+    extractor = get_extractor(fmt)
+
+    key = None
+    if caches:
+        from content_cache import content_digest
+        key = (content_digest(data), fmt, extractor.get('version', 1))
+        for index, cache in enumerate(caches):
+            result = cache.get(key)
+            if result is not None:
+                for faster_cache in caches[:index]:
+                    faster_cache.put(key, result)
+                return result
+
+    extract = _resolve(extractor['extract'])
+    if extractor.get('answers'):
+        text, answers = extract(data, f'upload.{fmt}')
+    else:
+        text, answers = extract(data), []
+
+    pages = None
+    if extractor.get('page_count'):
+        pages = _resolve(extractor['page_count'])(data)
+
+    result = {'format': fmt, 'label': extractor['label'], 'text': text, 'answers': answers, 'pages': pages}
+    for cache in caches:
+        cache.put(key, result)
+    return result
@@ -0,0 +1,75 @@
+# Decode uploaded text once, with the right encoding
+# Picks the encoding from a BOM, or from whether the bytes are valid UTF-8
+# (falling back to Windows-1252), instead of decoding as UTF-8 with errors
+# ignored and repairing the damage afterwards.
+
+import re
+import codecs
+
+# Bytes examined when choosing an encoding for a stream
+DETECT_BYTES = 64 * 1024
+
+BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+# Bytes Windows-1252 leaves undefined; text containing them is decoded as Latin-1
+CP1252_UNDEFINED = re.compile(rb'[\x81\x8d\x8f\x90\x9d]')
+
+# UTF-8 text that was decoded as Windows-1252/Latin-1 somewhere upstream
+# (e.g. 'â€™' for a curly apostrophe, 'Ã©' for é)
+MOJIBAKE_PATTERN = re.compile(
+    '\u00e2\u20ac'                       # 'â€' starts ’ “ ” – — … •
+    '|\u00c3[\u0080-\u00bf\u0152-\u0178\u2013-\u203a]'  # 'Ã' + a continuation byte (é, ü, ...)
+    '|\u00c2[\u00a0-\u00bf]'            # 'Â' + a Latin-1 symbol (©, °, ...)
+)
+
+def detect_encoding(sample, partial=False):
+    """Choose an encoding for some bytes.
+
+    A BOM wins; otherwise UTF-8 if the bytes are valid UTF-8 (ASCII included),
+    else Windows-1252. With ``partial=True`` the sample may end mid-character.
+    """
+    sample = bytes(sample)
+    for bom, encoding in BOMS:
+        if sample.startswith(bom):
+            return encoding
+
+    if sample.isascii():
+        return 'utf-8'
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=not partial)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+
+    if CP1252_UNDEFINED.search(sample):
+        return 'latin-1'
+    return 'cp1252'
+
+def decode_bytes(data):
+    """Decode a whole text upload in one pass and return (text, encoding)"""
+    encoding = detect_encoding(data)
+    return bytes(data).decode(encoding, errors='replace'), encoding
+
+def detect_stream_encoding(stream):
+    """Choose an encoding from the start of a binary stream, leaving it at position 0"""
+    stream.seek(0)
+    sample = stream.read(DETECT_BYTES)
+    stream.seek(0)
+    return detect_encoding(sample, partial=len(sample) == DETECT_BYTES)
+
+def needs_mojibake_repair(text):
+    """True if the text shows UTF-8-read-as-Windows-1252 damage"""
+    return MOJIBAKE_PATTERN.search(text) is not None
+
+def repair_mojibake(text):
+    """Undo a UTF-8 → Windows-1252 mix-up when the whole text round-trips, else return None"""
+    try:
+        return text.encode('cp1252').decode('utf-8')
+    except UnicodeError:
+        return None
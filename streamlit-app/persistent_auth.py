@@ -12,6 +12,29 @@ except ImportError:
     CONFIG_AVAILABLE = False
     M365_CONFIG = {}
 
+# MSAL's cache of authority discovery responses, shared by every app this process
+# creates so only the first sign-in waits on it. It holds no tokens.
+MSAL_HTTP_CACHE = {}
+
+def create_msal_app():
+    """Public client app for the configured tenant, reusing cached authority discovery"""
+    return msal.PublicClientApplication(
+        M365_CONFIG['client_id'],
+        authority=M365_CONFIG['authority'],
+        http_cache=MSAL_HTTP_CACHE
+    )
+
+def warm_up_msal():
+    """Run authority discovery ahead of the first sign-in; True if it succeeded"""
+    if not CONFIG_AVAILABLE or not M365_CONFIG.get('client_id') or not M365_CONFIG.get('authority'):
+        return False
+    try:
+        create_msal_app()
+    except Exception as e:
+        print(f"⚠️ MSAL authority discovery failed during warm-up: {e}")
+        return False
+    return True
+
 # Token storage file (encrypted with simple base64 for basic obfuscation)
 # Generate unique cache file per browser session
 def get_session_cache_file():
@@ -163,10 +186,7 @@ def cleanup_old_cache_files():
 def refresh_access_token(refresh_token):
     """Refresh the access token using the refresh token"""
     try:
-        app = msal.PublicClientApplication(
-            M365_CONFIG['client_id'],
-            authority=M365_CONFIG['authority']
-        )
+        app = create_msal_app()
         
         # Try to refresh the token
         result = app.acquire_token_by_refresh_token(
@@ -196,10 +216,7 @@ def get_device_flow():
             raise ValueError("Scopes not found in configuration")
         
         # Create MSAL app and device flow
-        app = msal.PublicClientApplication(
-            M365_CONFIG['client_id'],
-            authority=M365_CONFIG['authority']
-        )
+        app = create_msal_app()
         
         flow = app.initiate_device_flow(scopes=M365_CONFIG['scope'])
         
@@ -0,0 +1,163 @@
+# One processing pipeline for the paste and file tabs
+# Parses questions, builds the instructions DOCX and basic RTF, and collects
+# the LibreOffice RTF. Results are memoized by a digest of every input, so
+# pressing Process again with the same inputs reuses the stored artifacts.
+# File names embed today's date, so they are added on every run rather than
+# cached with the artifacts.
+
+import os
+import json
+import hashlib
+import tempfile
+
+# Memory cap for the shared result cache
+PIPELINE_CACHE_BYTES = int(os.getenv('PIPELINE_CACHE_MB', '128')) * 1024 * 1024
+
+def pipeline_digest(instructions_text, questions_text, answer_key, use_asterisk_method,
+                    course, section, professor, api_url):
+    """SHA-256 over every input that affects the generated files"""
+    inputs = {
+        'instructions': instructions_text,
+        'questions': questions_text,
+        'answer_key': list(answer_key),
+        'asterisk': bool(use_asterisk_method),
+        'course': course,
+        'section': section,
+        'professor': professor,
+        'api_url': api_url,
+    }
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode('utf-8')).hexdigest()
+
+def _no_report(fraction, message):
+    pass
+
+def name_files(record, course, section, professor):
+    """Copy of a processed-data record with today's instructions and exam file names"""
+    from examsoft_core import generate_filename
+    return dict(
+        record,
+        instructions_filename=generate_filename(course, section, professor, "ins", "docx"),
+        exam_filename=generate_filename(course, section, professor, "exm", "rtf"),
+    )
+
+def build_exam_package(instructions_text, questions_text, answer_key, use_asterisk_method,
+                       course, section, professor, api_url, report=None):
+    """Run the whole pipeline and return the processed-data dict, or None if no questions were found.
+
+    'conversion_error' is set (and 'exam_rtf_bytes' is None) when the
+    LibreOffice conversion failed and only the basic RTF is available.
+    ``report(fraction, message)`` is called as each stage finishes.
+    The record has no file names; add them with name_files().
+    """
+    report = report or _no_report
+    from examsoft_core import (
+        parse_questions_from_text, create_rtf_content, find_answer_mismatches,
+        generate_instructions_docx, generate_docx_with_questions, start_docx_to_rtf_conversion
+    )
+
+    report(0.05, "Parsing questions")
+    questions_list = parse_questions_from_text(questions_text, answer_key, use_asterisk_method)
+    if not questions_list:
+        return None
+    report(0.25, f"Parsed {len(questions_list)} questions")
+
+    mc_count = sum(1 for q in questions_list if not q.startswith("Type: E"))
+    essay_count = sum(1 for q in questions_list if q.startswith("Type: E"))
+
+    # Start LibreOffice conversion first so it runs while the
+    # instructions DOCX and basic RTF are built below
+    conversion = None
+    conversion_error = None
+    exam_docx = None
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            docx_path = os.path.join(tmpdir, "ExamSoft_Export.docx")
+            generate_docx_with_questions(questions_list, '', docx_path)
+            with open(docx_path, 'rb') as f:
+                exam_docx = f.read()
+            report(0.4, "Exam DOCX built")
+            conversion = start_docx_to_rtf_conversion(docx_path, api_url=api_url)
+            report(0.45, "Conversion pending")
+    except Exception as e:
+        conversion_error = e
+
+    instructions_docx = None
+    if instructions_text:
+        instructions_docx = generate_instructions_docx(instructions_text)
+        report(0.55, "Instructions DOCX built")
+
+    exam_rtf_content = create_rtf_content(
+        questions_list,
+        answer_key if not use_asterisk_method else None,
+        not use_asterisk_method
+    )
+
+    exam_rtf_bytes = None
+    if conversion is not None:
+        report(0.6, "Basic RTF built, waiting for LibreOffice conversion")
+        try:
+            exam_rtf_bytes = conversion.result()
+        except Exception as e:
+            conversion_error = e
+    report(1.0, "Done")
+
+    return {
+        'instructions_text': instructions_text,
+        'instructions_docx': instructions_docx,
+        'questions_list': questions_list,
+        'exam_rtf_content': exam_rtf_content,
+        'exam_rtf_bytes': exam_rtf_bytes,
+        'exam_docx': exam_docx,
+        'mc_count': mc_count,
+        'essay_count': essay_count,
+        'answer_key': answer_key,
+        'answer_flags': find_answer_mismatches(questions_list, answer_key, use_asterisk_method),
+        'use_asterisk_method': use_asterisk_method,
+        'conversion_error': str(conversion_error) if conversion_error else None,
+    }
+
+def run_pipeline(instructions_text, questions_text, answer_key, use_asterisk_method,
+                 course, section, professor, api_url, cache=None, report=None, store=None,
+                 shared_cache=None):
+    """Return (processed data, reused) for these inputs, building them only on a cache miss.
+
+    Results whose LibreOffice conversion failed are not cached, so the next
+    run retries the converter. Cached results are shared; do not modify them.
+    With an ArtifactStore the generated files and texts are kept in the store
+    and the returned record holds ArtifactHandles in their place. File names
+    are generated for each call, so a record reused on a later day is named
+    for that day.
+    ``shared_cache`` (a DiskCache) is checked after ``cache`` and holds the
+    full records, so other server processes can reuse them.
+    """
+    digest = pipeline_digest(instructions_text, questions_text, answer_key, use_asterisk_method,
+                             course, section, professor, api_url)
+    if cache is not None:
+        cached = cache.get(digest)
+        if cached is not None and store is not None and not store.record_available(cached):
+            # Its artifacts were dropped while idle; build them again
+            cached = None
+        if cached is not None:
+            if report is not None:
+                report(1.0, "Reused the files generated earlier")
+            return name_files(cached, course, section, professor), True
+
+    result = shared_cache.get(digest) if shared_cache is not None else None
+    reused = result is not None
+    if reused:
+        if report is not None:
+            report(1.0, "Reused files generated by another server process")
+    else:
+        result = build_exam_package(instructions_text, questions_text, answer_key, use_asterisk_method,
+                                    course, section, professor, api_url, report)
+        if result is None:
+            return None, False
+        result['digest'] = digest
+        if shared_cache is not None and result['conversion_error'] is None:
+            shared_cache.put(digest, result)
+
+    if store is not None:
+        result = store.store_record(result)
+    if cache is not None and result['conversion_error'] is None:
+        cache.put(digest, result)
+    return name_files(result, course, section, professor), reused
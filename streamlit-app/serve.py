@@ -0,0 +1,23 @@
+# Launch the Streamlit server with warm-up started as it boots
+# Streamlit has no server-start hook, so this starts warmup in a background
+# thread and then hands over to `streamlit run` in the same process; the app
+# script reuses everything the warm-up loaded.
+#
+# Usage: python serve.py [streamlit run options], e.g. --server.port=8501
+
+import os
+import sys
+
+from streamlit.web import cli as streamlit_cli
+
+from warmup import start_warmup
+
+APP_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'streamlit_app.py')
+
+def main():
+    start_warmup()
+    sys.argv = ['streamlit', 'run', APP_SCRIPT, *sys.argv[1:]]
+    return streamlit_cli.main()
+
+if __name__ == '__main__':
+    sys.exit(main())
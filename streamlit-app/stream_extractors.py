@@ -0,0 +1,675 @@
+# Streaming text extractors for uploaded exam documents
+# These read the document XML straight out of the zip with iterparse instead of
+# building a full object tree, so large documents with images stay cheap.
+
+import io
+import re
+import mmap
+import zipfile
+import xml.etree.ElementTree as ET
+
+# WordprocessingML namespaces
+W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+MC_NS = '{http://schemas.openxmlformats.org/markup-compatibility/2006}'
+
+W_P = W_NS + 'p'
+W_T = W_NS + 't'
+W_TAB = W_NS + 'tab'
+W_BR = W_NS + 'br'
+W_CR = W_NS + 'cr'
+W_NO_BREAK_HYPHEN = W_NS + 'noBreakHyphen'
+W_BODY = W_NS + 'body'
+W_NUM_ID = W_NS + 'numId'
+W_ILVL = W_NS + 'ilvl'
+W_VAL = W_NS + 'val'
+MC_FALLBACK = MC_NS + 'Fallback'
+
+# Characters used when a list level is a bullet rather than a number
+BULLET_MARKER = '•'
+
+def _open_zip(source):
+    """Open a zip from a path, file object, memory map, bytes or memoryview"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    elif hasattr(source, 'seek'):
+        source.seek(0)
+    return zipfile.ZipFile(source)
+
+def _to_roman(number):
+    """Convert a positive integer to an upper-case Roman numeral"""
+    numerals = [(1000, 'M'), (900, 'CM'), (500, 'D'), (400, 'CD'), (100, 'C'), (90, 'XC'),
+                (50, 'L'), (40, 'XL'), (10, 'X'), (9, 'IX'), (5, 'V'), (4, 'IV'), (1, 'I')]
+    result = ''
+    for value, numeral in numerals:
+        while number >= value:
+            result += numeral
+            number -= value
+    return result
+
+def _to_letters(number):
+    """Convert 1, 2, ... 27 to A, B, ... AA the way Word numbers lists"""
+    letter = chr(ord('A') + (number - 1) % 26)
+    return letter * ((number - 1) // 26 + 1)
+
+def _format_number(number, num_fmt):
+    """Render a list counter in the given w:numFmt"""
+    if num_fmt == 'upperLetter':
+        return _to_letters(number)
+    if num_fmt == 'lowerLetter':
+        return _to_letters(number).lower()
+    if num_fmt == 'upperRoman':
+        return _to_roman(number)
+    if num_fmt == 'lowerRoman':
+        return _to_roman(number).lower()
+    return str(number)
+
+def _load_numbering(archive):
+    """Read word/numbering.xml into {numId: {ilvl: (numFmt, lvlText, start)}}"""
+    try:
+        data = archive.read('word/numbering.xml')
+    except KeyError:
+        return {}
+
+    root = ET.fromstring(data)
+    abstract_levels = {}
+    for abstract in root.iter(W_NS + 'abstractNum'):
+        levels = {}
+        for lvl in abstract.iter(W_NS + 'lvl'):
+            start = lvl.find(W_NS + 'start')
+            num_fmt = lvl.find(W_NS + 'numFmt')
+            lvl_text = lvl.find(W_NS + 'lvlText')
+            levels[int(lvl.get(W_ILVL, '0'))] = (
+                num_fmt.get(W_VAL, 'decimal') if num_fmt is not None else 'decimal',
+                lvl_text.get(W_VAL, '') if lvl_text is not None else '',
+                int(start.get(W_VAL, '1')) if start is not None else 1,
+            )
+        abstract_levels[abstract.get(W_NS + 'abstractNumId')] = levels
+
+    numbering = {}
+    for num in root.iter(W_NS + 'num'):
+        abstract_ref = num.find(W_NS + 'abstractNumId')
+        if abstract_ref is not None:
+            numbering[num.get(W_NS + 'numId')] = abstract_levels.get(abstract_ref.get(W_VAL), {})
+    return numbering
+
+class _ListCounters:
+    """Track Word's automatic list numbering while paragraphs stream past"""
+
+    def __init__(self, numbering):
+        self.numbering = numbering
+        self.counters = {}
+
+    def marker(self, num_id, ilvl):
+        """Return the rendered marker (e.g. '3. ' or 'B. ') for the next item in a list"""
+        levels = self.numbering.get(num_id)
+        if not levels or num_id == '0':
+            return ''
+        counters = self.counters.setdefault(num_id, {})
+
+        num_fmt, lvl_text, start = levels.get(ilvl, ('decimal', f'%{ilvl + 1}.', 1))
+        counters[ilvl] = counters.get(ilvl, start - 1) + 1
+        # Starting a level restarts every deeper level
+        for deeper in [level for level in counters if level > ilvl]:
+            del counters[deeper]
+
+        if num_fmt == 'bullet':
+            return f"{BULLET_MARKER} "
+        if num_fmt == 'none':
+            return ''
+
+        def replace(match):
+            level = int(match.group(1)) - 1
+            level_fmt, _, level_start = levels.get(level, ('decimal', '', 1))
+            return _format_number(counters.get(level, level_start), level_fmt)
+
+        text = re.sub(r'%(\d)', replace, lvl_text)
+        return f"{text} " if text else ''
+
+def iter_docx_paragraphs(source):
+    """Yield the text of each DOCX paragraph (including table cells) in document order.
+
+    Tabs and line breaks inside a paragraph are kept as '\\t' and '\\n', and
+    automatic list numbering is rendered as a text prefix. Elements are cleared
+    as soon as they are consumed, so memory stays flat for large documents.
+    """
+    with _open_zip(source) as archive:
+        counters = _ListCounters(_load_numbering(archive))
+
+        with archive.open('word/document.xml') as xml_stream:
+            body = None
+            paragraphs = []     # stack of [text parts, numId, ilvl] for nested paragraphs
+            fallback_depth = 0  # inside mc:Fallback, which repeats mc:Choice content
+
+            for event, elem in ET.iterparse(xml_stream, events=('start', 'end')):
+                tag = elem.tag
+
+                if event == 'start':
+                    if tag == W_P:
+                        paragraphs.append([[], None, 0])
+                    elif tag == MC_FALLBACK:
+                        fallback_depth += 1
+                    elif tag == W_BODY:
+                        body = elem
+                    continue
+
+                if tag == MC_FALLBACK:
+                    fallback_depth -= 1
+                    elem.clear()
+                    continue
+
+                if fallback_depth or not paragraphs:
+                    continue
+
+                current = paragraphs[-1]
+                if tag == W_T:
+                    current[0].append(elem.text or '')
+                elif tag == W_TAB:
+                    current[0].append('\t')
+                elif tag in (W_BR, W_CR):
+                    current[0].append('\n')
+                elif tag == W_NO_BREAK_HYPHEN:
+                    current[0].append('-')
+                elif tag == W_NUM_ID:
+                    current[1] = elem.get(W_VAL)
+                elif tag == W_ILVL:
+                    current[2] = int(elem.get(W_VAL, '0'))
+                elif tag == W_P:
+                    parts, num_id, ilvl = paragraphs.pop()
+                    marker = counters.marker(num_id, ilvl) if num_id is not None else ''
+                    elem.clear()
+                    if not paragraphs and body is not None:
+                        # Drop finished top-level content from the tree
+                        body.clear()
+                    yield marker + ''.join(parts)
+
+def extract_docx_text(source):
+    """Extract all paragraph text from a DOCX, one paragraph per line"""
+    return '\n'.join(iter_docx_paragraphs(source))
+
+# --- RTF -------------------------------------------------------------------
+
+# Destination groups whose content is never document text. They are skipped by
+# brace matching without decoding, which is what keeps \pict/\objdata cheap.
+# \listtext and \pntext are kept: they hold the rendered list numbers.
+RTF_SKIP_DESTINATIONS = frozenset((
+    'annotation', 'atnauthor', 'atndate', 'atnid', 'author', 'bkmkend', 'bkmkstart',
+    'colortbl', 'colorschememapping', 'comment', 'company', 'creatim', 'datafield',
+    'datastore', 'defchp', 'defpap', 'doccomm', 'docvar', 'falt', 'fldinst',
+    'filetbl', 'fonttbl', 'footer', 'footerf', 'footerl', 'footerr', 'footnote',
+    'generator', 'header', 'headerf', 'headerl', 'headerr', 'info', 'keywords',
+    'latentstyles', 'listoverridetable', 'listtable', 'manager',
+    'nonshppict', 'objclass', 'objdata', 'objname', 'operator', 'pgdsctbl', 'pict',
+    'pntxta', 'pntxtb', 'printim', 'revtbl', 'revtim', 'rsidtbl',
+    'shppict', 'stylesheet', 'subject', 'themedata', 'title', 'xmlnstbl',
+))
+
+# Control words that stand for a character
+RTF_SPECIAL_CHARACTERS = {
+    'tab': '\t', 'line': '\n', 'cell': '\t', 'emdash': '\u2014', 'endash': '\u2013',
+    'emspace': ' ', 'enspace': ' ', 'qmspace': ' ', 'bullet': '\u2022',
+    'lquote': '\u2018', 'rquote': '\u2019', 'ldblquote': '\u201c', 'rdblquote': '\u201d',
+}
+
+# Control words that end a paragraph
+RTF_PARAGRAPH_BREAKS = frozenset(('par', 'row', 'page', 'sect'))
+
+# Character set control words that pick the default code page
+RTF_CHARSETS = {'ansi': 'cp1252', 'mac': 'mac_roman', 'pc': 'cp437', 'pca': 'cp850'}
+
+# Control symbols (backslash + one non-letter)
+RTF_CONTROL_SYMBOLS = {b'~': '\u00a0', b'_': '-', b'-': '', b'\\': '\\', b'{': '{', b'}': '}'}
+
+_RTF_TOKEN = re.compile(
+    rb"\\([a-zA-Z]{1,32})(-?\d{1,10})? ?"  # control word with optional parameter
+    rb"|\\'([0-9a-fA-F]{2})"                # hex-escaped byte in the document code page
+    rb"|\\(.)"                              # control symbol
+    rb"|([{}])"                             # group start / end
+    rb"|[\r\n]+"                            # raw line breaks carry no meaning in RTF
+    rb"|([^\\{}\r\n]+)",                    # plain text run
+    re.DOTALL
+)
+_RTF_GROUP_SCAN = re.compile(rb'[{}\\]')
+_RTF_DESTINATION = re.compile(rb'\\(\*)|\\([a-zA-Z]{1,32})')
+_RTF_BIN = re.compile(rb'\\bin(\d+) ?')
+_SURROGATES = re.compile('[\ud800-\udfff]')
+
+def _read_source(source):
+    """Return the raw bytes of a path, file object, bytes or memoryview.
+
+    Memory maps are returned as they are: they are already bytes-like, and
+    scanning them in place avoids copying a large spooled upload.
+    """
+    if isinstance(source, mmap.mmap):
+        return source
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    if hasattr(source, 'read'):
+        return source.read()
+    with open(source, 'rb') as f:
+        return f.read()
+
+def _skip_rtf_group(data, pos):
+    """Return the position just past the group whose '{' is at data[pos]"""
+    depth = 0
+    while True:
+        match = _RTF_GROUP_SCAN.search(data, pos)
+        if match is None:
+            return len(data)
+        pos = match.start()
+        char = data[pos:pos + 1]
+        if char == b'{':
+            depth += 1
+            pos += 1
+        elif char == b'}':
+            depth -= 1
+            pos += 1
+            if depth == 0:
+                return pos
+        else:
+            binary = _RTF_BIN.match(data, pos)
+            # \binN is followed by N raw bytes that may contain braces
+            pos = binary.end() + int(binary.group(1)) if binary else pos + 2
+
+def _rtf_codec(codepage):
+    """Python codec name for an RTF \\ansicpg value"""
+    codec = f'cp{codepage}'
+    try:
+        ''.encode(codec)
+        return codec
+    except LookupError:
+        return 'cp1252'
+
+def iter_rtf_paragraphs(source):
+    """Yield the text of each RTF paragraph in document order.
+
+    Font/colour/style tables, pictures, embedded objects, headers and every
+    ignorable (\\*) destination are skipped without being decoded. Text is
+    decoded with the document's \\ansicpg code page and \\uN escapes are
+    honored along with their \\ucN fallback characters.
+    """
+    data = _read_source(source)
+    codec = 'cp1252'
+    uc_skip = 1            # fallback characters that follow each \uN
+    states = []            # uc_skip saved for each open group
+    pending_skip = 0       # fallback characters still to drop
+    raw = bytearray()      # undecoded bytes in the current paragraph
+    parts = []             # decoded text in the current paragraph
+
+    def flush():
+        if raw:
+            parts.append(raw.decode(codec, errors='replace'))
+            raw.clear()
+
+    def finish():
+        flush()
+        text = ''.join(parts)
+        parts.clear()
+        if _SURROGATES.search(text):
+            # \uN pairs for characters outside the BMP arrive as surrogates
+            text = text.encode('utf-16', 'surrogatepass').decode('utf-16', errors='replace')
+        return text
+
+    pos = 0
+    end = len(data)
+    while pos < end:
+        match = _RTF_TOKEN.match(data, pos)
+        if match is None:
+            # Only a lone backslash at the very end (a truncated file) matches nothing
+            break
+        pos = match.end()
+        word, param, hex_byte, symbol, brace, text = match.groups()
+
+        if text is not None:
+            if pending_skip:
+                dropped = min(pending_skip, len(text))
+                pending_skip -= dropped
+                text = text[dropped:]
+            if not text.isascii():
+                # RTF text should be 7-bit; literal 8-bit runs usually come from
+                # generators (including our own) that write UTF-8 straight through
+                try:
+                    decoded = text.decode('utf-8')
+                except UnicodeDecodeError:
+                    pass
+                else:
+                    flush()
+                    parts.append(decoded)
+                    continue
+            raw += text
+        elif hex_byte is not None:
+            if pending_skip:
+                pending_skip -= 1
+            else:
+                raw.append(int(hex_byte, 16))
+        elif brace is not None:
+            pending_skip = 0
+            if brace == b'{':
+                destination = _RTF_DESTINATION.match(data, pos)
+                if destination and (destination.group(1) or
+                                    destination.group(2).decode('ascii') in RTF_SKIP_DESTINATIONS):
+                    pos = _skip_rtf_group(data, match.start())
+                    continue
+                states.append(uc_skip)
+            elif states:
+                uc_skip = states.pop()
+        elif word is not None:
+            if pending_skip:
+                pending_skip -= 1
+                continue
+            word = word.decode('ascii')
+            if word in RTF_PARAGRAPH_BREAKS:
+                yield finish()
+            elif word == 'u' and param is not None:
+                flush()
+                parts.append(chr(int(param) % 0x10000))
+                pending_skip = uc_skip
+            elif word == 'uc' and param is not None:
+                uc_skip = int(param)
+            elif word in RTF_SPECIAL_CHARACTERS:
+                flush()
+                parts.append(RTF_SPECIAL_CHARACTERS[word])
+            elif word in RTF_CHARSETS:
+                flush()
+                codec = RTF_CHARSETS[word]
+            elif word == 'ansicpg' and param is not None:
+                flush()
+                codec = _rtf_codec(param.decode('ascii'))
+            elif word == 'bin' and param is not None:
+                pos += int(param)
+        elif symbol is not None:
+            if pending_skip:
+                pending_skip -= 1
+            elif symbol in RTF_CONTROL_SYMBOLS:
+                flush()
+                parts.append(RTF_CONTROL_SYMBOLS[symbol])
+
+    text = finish()
+    if text:
+        yield text
+
+def extract_rtf_text(source):
+    """Extract all paragraph text from an RTF document, one paragraph per line"""
+    return '\n'.join(iter_rtf_paragraphs(source))
+
+# --- OpenDocument -------------------------------------------------------------
+
+ODF_TEXT_NS = '{urn:oasis:names:tc:opendocument:xmlns:text:1.0}'
+ODF_STYLE_NS = '{urn:oasis:names:tc:opendocument:xmlns:style:1.0}'
+ODF_TABLE_NS = '{urn:oasis:names:tc:opendocument:xmlns:table:1.0}'
+ODF_OFFICE_NS = '{urn:oasis:names:tc:opendocument:xmlns:office:1.0}'
+
+ODF_P = ODF_TEXT_NS + 'p'
+ODF_H = ODF_TEXT_NS + 'h'
+ODF_LIST = ODF_TEXT_NS + 'list'
+ODF_LIST_ITEM = ODF_TEXT_NS + 'list-item'
+ODF_LIST_STYLE = ODF_TEXT_NS + 'list-style'
+ODF_TEXT_BODY = ODF_OFFICE_NS + 'text'
+ODF_TABLE = ODF_TABLE_NS + 'table'
+ODF_TABLE_ROW = ODF_TABLE_NS + 'table-row'
+ODF_TABLE_CELLS = (ODF_TABLE_NS + 'table-cell', ODF_TABLE_NS + 'covered-table-cell')
+
+# Elements whose content is not part of the running text
+ODF_SKIP = frozenset((ODF_OFFICE_NS + 'annotation', ODF_TEXT_NS + 'note',
+                      ODF_TEXT_NS + 'tracked-changes'))
+
+# ODF style:num-format values mapped onto the Word names used by _format_number
+ODF_NUM_FORMATS = {'1': 'decimal', 'a': 'lowerLetter', 'A': 'upperLetter',
+                   'i': 'lowerRoman', 'I': 'upperRoman', '': 'none'}
+
+def _odf_text(elem, parts):
+    """Append the text of an ODF text element (spans, links, spaces, tabs) to parts"""
+    tag = elem.tag
+    if tag == ODF_TEXT_NS + 's':
+        parts.append(' ' * int(elem.get(ODF_TEXT_NS + 'c', '1')))
+    elif tag == ODF_TEXT_NS + 'tab':
+        parts.append('\t')
+    elif tag == ODF_TEXT_NS + 'line-break':
+        parts.append('\n')
+    elif tag not in ODF_SKIP:
+        if tag in (ODF_P, ODF_H) and parts:
+            # A paragraph nested in a frame or text box starts a new line
+            parts.append('\n')
+        if elem.text:
+            parts.append(elem.text)
+        for child in elem:
+            _odf_text(child, parts)
+            if child.tail:
+                parts.append(child.tail)
+
+def _odf_list_levels(list_style):
+    """Read a text:list-style into {level: (numFmt, prefix, suffix, start, display_levels)}"""
+    levels = {}
+    for level_style in list_style:
+        level = int(level_style.get(ODF_TEXT_NS + 'level', '1'))
+        if level_style.tag == ODF_TEXT_NS + 'list-level-style-number':
+            levels[level] = (
+                ODF_NUM_FORMATS.get(level_style.get(ODF_STYLE_NS + 'num-format', '1'), 'decimal'),
+                level_style.get(ODF_STYLE_NS + 'num-prefix', ''),
+                level_style.get(ODF_STYLE_NS + 'num-suffix', ''),
+                int(level_style.get(ODF_TEXT_NS + 'start-value', '1')),
+                int(level_style.get(ODF_TEXT_NS + 'display-levels', '1')),
+            )
+        elif level_style.tag == ODF_TEXT_NS + 'list-level-style-bullet':
+            levels[level] = ('bullet', '', '', 1, 1)
+    return levels
+
+def _load_odf_list_styles(archive):
+    """Collect the named list styles from styles.xml"""
+    styles = {}
+    try:
+        xml_stream = archive.open('styles.xml')
+    except KeyError:
+        return styles
+    with xml_stream:
+        for _, elem in ET.iterparse(xml_stream):
+            if elem.tag == ODF_LIST_STYLE:
+                styles[elem.get(ODF_STYLE_NS + 'name')] = _odf_list_levels(elem)
+                elem.clear()
+    return styles
+
+class _OdfListCounters:
+    """Track ODF list numbering while list items stream past"""
+
+    def __init__(self, styles):
+        self.styles = styles
+        self.counters = {}  # style name -> {level: count}
+
+    def restart(self, style_name):
+        self.counters.pop(style_name, None)
+
+    def marker(self, style_name, level, start_override=None):
+        """Return the rendered marker for the next item at this level of a list style"""
+        levels = self.styles.get(style_name)
+        if not levels:
+            return ''
+        counters = self.counters.setdefault(style_name, {})
+
+        num_fmt, prefix, suffix, start, display_levels = levels.get(level, ('decimal', '', '.', 1, 1))
+        if start_override is not None:
+            counters[level] = start_override
+        else:
+            counters[level] = counters.get(level, start - 1) + 1
+        for deeper in [lvl for lvl in counters if lvl > level]:
+            del counters[deeper]
+
+        if num_fmt == 'bullet':
+            return f"{BULLET_MARKER} "
+        if num_fmt == 'none':
+            return ''
+
+        shown = []
+        for lvl in range(level - display_levels + 1, level + 1):
+            lvl_fmt, _, _, lvl_start, _ = levels.get(lvl, ('decimal', '', '', 1, 1))
+            shown.append(_format_number(counters.get(lvl, lvl_start), lvl_fmt))
+        return f"{prefix}{'.'.join(shown)}{suffix} "
+
+def iter_odt_paragraphs(source):
+    """Yield the text of each ODT paragraph and heading in document order.
+
+    content.xml is streamed with iterparse: text in spans, links and list
+    items is kept, list numbering is rendered from the list styles, and
+    annotations, footnote bodies and tracked changes (deleted text) are
+    skipped. Table-cell paragraphs are included.
+    """
+    with _open_zip(source) as archive:
+        counters = _OdfListCounters(_load_odf_list_styles(archive))
+
+        with archive.open('content.xml') as xml_stream:
+            body = None
+            lists = []            # stack of [style name, item start value, item needs marker]
+            paragraph_depth = 0
+            skip_depth = 0        # inside an ODF_SKIP element, whose paragraphs aren't running text
+            marker = ''
+
+            for event, elem in ET.iterparse(xml_stream, events=('start', 'end')):
+                tag = elem.tag
+
+                if tag in ODF_SKIP:
+                    if event == 'start':
+                        skip_depth += 1
+                    else:
+                        skip_depth -= 1
+                        if not paragraph_depth:
+                            # Inside a paragraph its tail is still needed by _odf_text
+                            elem.clear()
+                    continue
+                if skip_depth:
+                    continue
+
+                if event == 'start':
+                    if tag in (ODF_P, ODF_H):
+                        if paragraph_depth == 0:
+                            marker = ''
+                            if lists and lists[-1][2]:
+                                # First paragraph of a list item carries its number
+                                style_name, start_value, _ = lists[-1]
+                                marker = counters.marker(style_name, len(lists), start_value)
+                                lists[-1][1:] = [None, False]
+                        paragraph_depth += 1
+                    elif tag == ODF_LIST:
+                        style_name = elem.get(ODF_TEXT_NS + 'style-name') or (lists[-1][0] if lists else None)
+                        continues = (elem.get(ODF_TEXT_NS + 'continue-numbering') == 'true'
+                                     or elem.get(ODF_TEXT_NS + 'continue-list'))
+                        if not lists and not continues:
+                            counters.restart(style_name)
+                        lists.append([style_name, None, False])
+                    elif tag == ODF_LIST_ITEM and lists:
+                        start_value = elem.get(ODF_TEXT_NS + 'start-value')
+                        lists[-1][1:] = [int(start_value) if start_value else None, True]
+                    elif tag == ODF_TEXT_BODY:
+                        body = elem
+                    continue
+
+                if tag == ODF_LIST_STYLE:
+                    # Automatic list styles come before the body in content.xml
+                    counters.styles[elem.get(ODF_STYLE_NS + 'name')] = _odf_list_levels(elem)
+                    elem.clear()
+                elif tag == ODF_LIST and lists:
+                    lists.pop()
+                elif tag in (ODF_P, ODF_H):
+                    paragraph_depth -= 1
+                    if paragraph_depth:
+                        continue
+                    parts = []
+                    _odf_text(elem, parts)
+                    elem.clear()
+                    if body is not None and not lists:
+                        # Drop finished top-level content from the tree
+                        body.clear()
+                    yield marker + ''.join(parts)
+
+def extract_odt_text(source):
+    """Extract all paragraph text from an ODT, one paragraph per line"""
+    return '\n'.join(iter_odt_paragraphs(source))
+
+def iter_ods_rows(source, max_columns=None):
+    """Yield the first sheet of an ODS as lists of cell strings.
+
+    Repeated cells and rows are expanded, except that trailing empty cells and
+    rows (which spreadsheets repeat up to the sheet size) are dropped.
+    """
+    with _open_zip(source) as archive, archive.open('content.xml') as xml_stream:
+        row = None
+        row_repeat = 1
+        pending_cells = 0  # empty cells not yet known to be trailing
+        pending_rows = 0   # empty rows not yet known to be trailing
+        in_cell = 0
+
+        for event, elem in ET.iterparse(xml_stream, events=('start', 'end')):
+            tag = elem.tag
+            if event == 'start':
+                if tag == ODF_TABLE_ROW:
+                    row = []
+                    pending_cells = 0
+                    row_repeat = int(elem.get(ODF_TABLE_NS + 'number-rows-repeated', '1'))
+                elif tag in ODF_TABLE_CELLS:
+                    in_cell += 1
+                continue
+
+            if tag in ODF_TABLE_CELLS and row is not None:
+                in_cell -= 1
+                if in_cell:
+                    continue
+                parts = []
+                for child in elem:
+                    if child.tag in (ODF_P, ODF_H):
+                        if parts:
+                            parts.append('\n')
+                        _odf_text(child, parts)
+                text = ''.join(parts).strip()
+                if not text:
+                    value = elem.get(ODF_OFFICE_NS + 'value')
+                    text = value.strip() if value else ''
+                repeat = int(elem.get(ODF_TABLE_NS + 'number-columns-repeated', '1'))
+                elem.clear()
+
+                if not text:
+                    pending_cells += repeat
+                    continue
+                row.extend([''] * pending_cells + [text] * repeat)
+                pending_cells = 0
+                if max_columns is not None:
+                    del row[max_columns:]
+            elif tag == ODF_TABLE_ROW and row is not None:
+                elem.clear()
+                if not any(row):
+                    pending_rows += row_repeat
+                else:
+                    for _ in range(pending_rows):
+                        yield []
+                    pending_rows = 0
+                    for _ in range(row_repeat):
+                        yield list(row)
+                row = None
+            elif tag == ODF_TABLE:
+                # Only the first sheet is read
+                return
+
+# --- Page counts ------------------------------------------------------------
+# Word and LibreOffice store the page count from the last save in the document
+# metadata; these readers return None when it is missing.
+
+_DOCX_PAGES = re.compile(rb'<(?:\w+:)?Pages>(\d+)</(?:\w+:)?Pages>')
+_ODF_PAGES = re.compile(rb'meta:page-count="(\d+)"')
+_RTF_PAGES = re.compile(rb'\\nofpages(\d+)')
+
+def _zip_member_page_count(source, member, pattern):
+    with _open_zip(source) as archive:
+        try:
+            match = pattern.search(archive.read(member))
+        except KeyError:
+            return None
+    return int(match.group(1)) if match else None
+
+def docx_page_count(source):
+    """Page count recorded in docProps/app.xml"""
+    return _zip_member_page_count(source, 'docProps/app.xml', _DOCX_PAGES)
+
+def odt_page_count(source):
+    """Page count recorded in meta.xml"""
+    return _zip_member_page_count(source, 'meta.xml', _ODF_PAGES)
+
+def rtf_page_count(source):
+    """Page count recorded in the RTF \\info group"""
+    match = _RTF_PAGES.search(_read_source(source))
+    return int(match.group(1)) if match else None
@@ -2,6 +2,18 @@ import streamlit as st
 import sys
 import traceback
 
+from streamlit_compat import fragment, rerun_fragment, FRAGMENTS_SUPPORTED
+from background_jobs import JOB_POLL_SECONDS
+
+# Formatted questions shown per page in the results preview
+PREVIEW_PAGE_SIZE = 10
+
+# Flagged questions listed in the live preview
+LIVE_PREVIEW_MAX_FLAGS = 10
+
+# Shown when a session's generated files were dropped by the artifact store
+EXPIRED_RESULTS_MESSAGE = "⌛ These results were cleared after being idle. Process the exam again to regenerate the files."
+
 # Configure page
 st.set_page_config(
     page_title="ExamSoft RTF Formatter - Charleston School of Law",
@@ -9,21 +21,9 @@ st.set_page_config(
     layout="wide"
 )
 
-def render_text_paste_method():
+def render_text_paste_method(SHAREPOINT_AVAILABLE):
     """Render the text paste method UI"""
-    from safe_formatter import (
-        clean_text_encoding, parse_questions_from_text, generate_filename,
-        create_rtf_content, generate_instructions_docx, 
-        generate_docx_with_questions, convert_docx_to_rtf_via_api,
-        get_converter_endpoint, is_using_azure, upload_to_sharepoint_corrected
-    )
-    
-    # Try to import SharePoint functionality
-    try:
-        from persistent_auth import initialize_persistent_auth, render_persistent_auth_ui, render_auth_status, sign_out_persistent
-        SHAREPOINT_AVAILABLE = True
-    except (ImportError, AttributeError):
-        SHAREPOINT_AVAILABLE = False
+    from safe_formatter import clean_text_encoding
 
     # File naming inputs
     col1, col2, col3 = st.columns(3)
@@ -56,6 +56,10 @@ def render_text_paste_method():
     )
     use_asterisk_method = answer_method.startswith("Asterisk")
 
+    if st.checkbox("🔎 Live preview while editing", key="live_preview",
+                   help="Re-parse the questions and answer key whenever a text box changes and show counts and answer key problems before processing."):
+        render_live_preview(questions_input, answer_key_input, use_asterisk_method)
+
     # Initialize session state
     if 'processed_data' not in st.session_state:
         st.session_state.processed_data = None
@@ -70,96 +74,86 @@ def render_text_paste_method():
             answer_key = parse_answer_key_with_header_detection(answer_key_input)
             st.write(f"Answer key loaded: {len(answer_key)} answers")
 
-            # Generate filenames
-            instructions_filename = generate_filename(course_input, section_input, professor_input, "ins", "docx")
-            exam_filename = generate_filename(course_input, section_input, professor_input, "exm", "rtf")
-
             # Process content
             instructions_text = clean_text_encoding(instructions_input.strip()) if instructions_input.strip() else ""
             questions_text = questions_input.strip()
 
-            # Parse questions
-            questions_list = parse_questions_from_text(questions_text, answer_key, use_asterisk_method)
+            process_exam(instructions_text, questions_text, answer_key, use_asterisk_method,
+                         course_input, section_input, professor_input, method_prefix="paste")
 
-            if questions_list:
-                # Count questions
-                mc_count = sum(1 for q in questions_list if not q.startswith("Type: E"))
-                essay_count = sum(1 for q in questions_list if q.startswith("Type: E"))
-
-                # Generate files
-                instructions_docx = None
-                if instructions_text:
-                    instructions_docx = generate_instructions_docx(instructions_text)
-
-                exam_rtf_content = create_rtf_content(
-                    questions_list, 
-                    answer_key if not use_asterisk_method else None, 
-                    not use_asterisk_method
-                )
-
-                # Try LibreOffice conversion
-                exam_rtf_bytes = None
-                try:
-                    import tempfile
-                    import os
-                    with tempfile.TemporaryDirectory() as tmpdir:
-                        docx_path = os.path.join(tmpdir, "ExamSoft_Export.docx")
-                        rtf_path = os.path.join(tmpdir, "ExamSoft_Export.rtf")
-                        generate_docx_with_questions(questions_list, '', docx_path)
-                        
-                        api_endpoint = get_converter_endpoint()
-                        convert_docx_to_rtf_via_api(docx_path, rtf_path, api_url=api_endpoint)
-                        with open(rtf_path, "rb") as f:
-                            exam_rtf_bytes = f.read()
-                        
-                        if is_using_azure():
-                            st.success("✅ RTF generated using Azure LibreOffice API")
-                        else:
-                            st.success("✅ RTF generated using local LibreOffice Docker API")
-                except Exception as e:
-                    st.error(f"❌ LibreOffice API conversion failed: {e}")
-                    st.info("🔄 Using basic RTF conversion as fallback.")
-
-                # Store results
-                st.session_state.processed_data = {
-                    'instructions_text': instructions_text,
-                    'instructions_docx': instructions_docx,
-                    'instructions_filename': instructions_filename,
-                    'questions_list': questions_list,
-                    'exam_rtf_content': exam_rtf_content,
-                    'exam_rtf_bytes': exam_rtf_bytes,
-                    'exam_filename': exam_filename,
-                    'mc_count': mc_count,
-                    'essay_count': essay_count,
-                    'answer_key': answer_key,
-                    'use_asterisk_method': use_asterisk_method
-                }
-
-                st.success(f"Processed {len(questions_list)} questions successfully!")
-                st.info(f"Found {mc_count} multiple choice questions and {essay_count} essay questions")
-            else:
-                st.error("No questions were found or formatted")
+    render_processing_job("paste")
 
     # Display results
     if st.session_state.processed_data:
         render_results(SHAREPOINT_AVAILABLE, method_prefix="paste")
 
-def render_file_upload_method():
-    """Render the file upload method UI"""
-    from safe_formatter import (
-        clean_text_encoding, parse_questions_from_text, generate_filename,
-        create_rtf_content, generate_instructions_docx, 
-        generate_docx_with_questions, convert_docx_to_rtf_via_api,
-        get_converter_endpoint, is_using_azure, upload_to_sharepoint_corrected
+def render_live_preview(questions_input, answer_key_input, use_asterisk_method):
+    """Show question counts and answer key problems for the pasted text without processing it.
+
+    Text areas only report a change when they lose focus (or on Ctrl+Enter),
+    which debounces keystrokes. Unchanged inputs skip parsing entirely, and a
+    per-session BlockMemo re-formats only the question blocks that changed.
+    """
+    import time
+    import hashlib
+    from examsoft_core import (
+        BlockMemo, parse_questions_from_text, parse_answer_key_with_header_detection,
+        find_answer_mismatches, is_essay
     )
     
-    # Try to import SharePoint functionality
-    try:
-        from persistent_auth import initialize_persistent_auth, render_persistent_auth_ui, render_auth_status, sign_out_persistent
-        SHAREPOINT_AVAILABLE = True
-    except (ImportError, AttributeError):
-        SHAREPOINT_AVAILABLE = False
+    if not questions_input.strip():
+        st.caption("Paste questions above to see a live preview.")
+        return
+    
+    digest = hashlib.sha256(
+        f"{use_asterisk_method}\0{answer_key_input}\0{questions_input}".encode('utf-8')
+    ).hexdigest()
+    preview = st.session_state.get('live_preview_result')
+    
+    if preview is None or preview['digest'] != digest:
+        memo = st.session_state.setdefault('live_preview_memo', BlockMemo())
+        misses_before = memo.misses
+        started = time.perf_counter()
+        
+        answer_key = parse_answer_key_with_header_detection(answer_key_input)
+        questions = parse_questions_from_text(questions_input.strip(), answer_key, use_asterisk_method, memo=memo)
+        
+        preview = {
+            'digest': digest,
+            'questions': questions,
+            'answer_count': len(answer_key),
+            'flags': find_answer_mismatches(questions, answer_key, use_asterisk_method),
+            'reformatted': memo.misses - misses_before,
+            'seconds': time.perf_counter() - started,
+        }
+        st.session_state.live_preview_result = preview
+    
+    questions = preview['questions']
+    essay_count = sum(1 for q in questions if is_essay(q))
+    mc_count = len(questions) - essay_count
+    
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Questions", len(questions))
+    col2.metric("Multiple choice", mc_count)
+    col3.metric("Essay", essay_count)
+    col4.metric("Answers in key", preview['answer_count'])
+    
+    if preview['answer_count'] and preview['answer_count'] != mc_count:
+        st.warning(f"⚠️ The answer key has {preview['answer_count']} answers for {mc_count} multiple choice questions")
+    
+    flags = preview['flags']
+    if flags:
+        with st.expander(f"⚠️ {len(flags)} question(s) may not match the answer key"):
+            for index in sorted(flags)[:LIVE_PREVIEW_MAX_FLAGS]:
+                st.write(f"**Question {index + 1}**: {flags[index]}")
+            if len(flags) > LIVE_PREVIEW_MAX_FLAGS:
+                st.caption(f"...and {len(flags) - LIVE_PREVIEW_MAX_FLAGS} more")
+    
+    st.caption(f"Parsed in {preview['seconds'] * 1000:.0f} ms · "
+               f"{preview['reformatted']} of {len(questions)} blocks re-formatted")
 
+def render_file_upload_method(SHAREPOINT_AVAILABLE):
+    """Render the file upload method UI"""
     # File naming inputs
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -218,13 +212,10 @@ def render_file_upload_method():
             st.error("Questions file is required. Please upload your questions file above.")
         else:
             try:
-                # Process instructions
-                instructions_text = ""
-                if instructions_file:
-                    instructions_text = extract_text_from_file(instructions_file)
-                
-                # Process questions file and auto-detect instructions
-                full_text = extract_text_from_file(questions_file)
+                # Read instructions, questions and answer key files concurrently
+                instructions_text, full_text, answer_key = extract_uploads(
+                    instructions_file, questions_file, answer_key_file
+                )
                 
                 # Try to automatically separate instructions and questions
                 parsed_instructions, parsed_questions = parse_instructions_and_questions(full_text)
@@ -271,10 +262,10 @@ def render_file_upload_method():
                     st.success("✅ Using auto-detected instructions from questions file!")
                 
                 # Process answer key
-                answer_key = []
-                if answer_key_file:
-                    st.write(f"📄 Processing answer key file: {answer_key_file.name} ({answer_key_file.type})")
-                    answer_key = extract_answer_key_from_file(answer_key_file)
+                if not answer_key_file and st.session_state.question_bank_answers:
+                    # Spreadsheet question banks can carry their own answer column
+                    answer_key = st.session_state.question_bank_answers
+                    st.info("ℹ️ Using the answer column from the questions spreadsheet.")
                 
                 if answer_key:
                     st.success(f"✅ Answer key loaded: {len(answer_key)} answers")
@@ -282,168 +273,165 @@ def render_file_upload_method():
                 else:
                     st.info("ℹ️ No answer key provided - answers will need to be marked manually in questions.")
 
-                # Generate filenames
-                instructions_filename = generate_filename(course_input, section_input, professor_input, "ins", "docx")
-                exam_filename = generate_filename(course_input, section_input, professor_input, "exm", "rtf")
-
-                # Parse questions
-                questions_list = parse_questions_from_text(questions_text, answer_key, use_asterisk_method)
-
-                if questions_list:
-                    # Count questions
-                    mc_count = sum(1 for q in questions_list if not q.startswith("Type: E"))
-                    essay_count = sum(1 for q in questions_list if q.startswith("Type: E"))
-
-                    # Generate files
-                    instructions_docx = None
-                    if instructions_text:
-                        instructions_docx = generate_instructions_docx(instructions_text)
-
-                    exam_rtf_content = create_rtf_content(
-                        questions_list, 
-                        answer_key if not use_asterisk_method else None, 
-                        not use_asterisk_method
-                    )
-
-                    # Try LibreOffice conversion
-                    exam_rtf_bytes = None
-                    try:
-                        import tempfile
-                        import os
-                        with tempfile.TemporaryDirectory() as tmpdir:
-                            docx_path = os.path.join(tmpdir, "ExamSoft_Export.docx")
-                            rtf_path = os.path.join(tmpdir, "ExamSoft_Export.rtf")
-                            generate_docx_with_questions(questions_list, '', docx_path)
-                            
-                            api_endpoint = get_converter_endpoint()
-                            convert_docx_to_rtf_via_api(docx_path, rtf_path, api_url=api_endpoint)
-                            with open(rtf_path, "rb") as f:
-                                exam_rtf_bytes = f.read()
-                            
-                            if is_using_azure():
-                                st.success("✅ RTF generated using Azure LibreOffice API")
-                            else:
-                                st.success("✅ RTF generated using local LibreOffice Docker API")
-                    except Exception as e:
-                        st.error(f"❌ LibreOffice API conversion failed: {e}")
-                        st.info("🔄 Using basic RTF conversion as fallback.")
-
-                    # Store results
-                    st.session_state.processed_data = {
-                        'instructions_text': instructions_text,
-                        'instructions_docx': instructions_docx,
-                        'instructions_filename': instructions_filename,
-                        'questions_list': questions_list,
-                        'exam_rtf_content': exam_rtf_content,
-                        'exam_rtf_bytes': exam_rtf_bytes,
-                        'exam_filename': exam_filename,
-                        'mc_count': mc_count,
-                        'essay_count': essay_count,
-                        'answer_key': answer_key,
-                        'use_asterisk_method': use_asterisk_method
-                    }
-
-                    st.success(f"Processed {len(questions_list)} questions successfully!")
-                    st.info(f"Found {mc_count} multiple choice questions and {essay_count} essay questions")
-                else:
-                    st.error("No questions were found or formatted")
+                process_exam(instructions_text, questions_text, answer_key, use_asterisk_method,
+                             course_input, section_input, professor_input, method_prefix="file")
                     
             except Exception as e:
                 st.error(f"Error processing files: {str(e)}")
                 st.error("Please check your file formats and try again.")
 
+    render_processing_job("file")
+
     # Display results
     if st.session_state.processed_data:
         render_results(SHAREPOINT_AVAILABLE, method_prefix="file")
 
-def extract_text_from_file(uploaded_file):
-    """Extract text content from uploaded file"""
-    import io
+@st.cache_resource
+def start_server_warmup():
+    """Warm-up for servers started with `streamlit run` rather than serve.py; runs once per process"""
+    from warmup import start_warmup
+    return start_warmup()
+
+@st.cache_resource
+def get_artifact_store():
+    """Generated files for every session, held once and referenced by handle from session state"""
+    from artifact_store import ArtifactStore
+    return ArtifactStore()
+
+@st.cache_resource
+def get_pipeline_cache():
+    """Processed exam packages shared by every session, keyed by an input digest"""
+    from content_cache import ContentCache
+    from processing_pipeline import PIPELINE_CACHE_BYTES
+    return ContentCache(max_bytes=PIPELINE_CACHE_BYTES)
+
+@st.cache_resource
+def get_disk_cache(namespace):
+    """SQLite cache shared by every server process on this host; None unless SHARED_CACHE_DB is set"""
+    from content_cache import DiskCache, SHARED_CACHE_DB
+    if not SHARED_CACHE_DB:
+        return None
+    try:
+        return DiskCache(SHARED_CACHE_DB, namespace)
+    except Exception as e:
+        print(f"⚠️ Shared disk cache unavailable ({SHARED_CACHE_DB}): {e}")
+        return None
+
+def process_exam(instructions_text, questions_text, answer_key, use_asterisk_method,
+                 course, section, professor, method_prefix):
+    """Submit the shared processing pipeline as a background job for this tab"""
+    from safe_formatter import get_converter_endpoint
+    from processing_pipeline import run_pipeline
+    from background_jobs import submit_job
     
-    file_type = uploaded_file.type
-    content = uploaded_file.read()
+    # The job keeps running across reruns; render_processing_job picks up the result
+    st.session_state[f"processing_job_{method_prefix}"] = submit_job(
+        "Processing exam", run_pipeline,
+        instructions_text, questions_text, answer_key, use_asterisk_method,
+        course, section, professor,
+        api_url=get_converter_endpoint(), cache=get_pipeline_cache(), store=get_artifact_store(),
+        shared_cache=get_disk_cache('pipeline')
+    )
+
+def render_processing_job(method_prefix):
+    """Show this tab's processing progress, then report and store the result once it is ready"""
+    from safe_formatter import is_using_azure
     
-    if file_type == "text/plain":
-        return content.decode('utf-8')
-    elif file_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-        # DOCX file
-        try:
-            from docx import Document
-            doc = Document(io.BytesIO(content))
-            return '\n'.join([paragraph.text for paragraph in doc.paragraphs])
-        except:
-            st.error("Failed to read DOCX file. Please ensure it's a valid Word document.")
-            return ""
-    elif file_type == "application/rtf" or uploaded_file.name.endswith('.rtf'):
-        # RTF file - basic text extraction
-        try:
-            from striprtf.striprtf import rtf_to_text
-            return rtf_to_text(content.decode('utf-8'))
-        except:
-            # Fallback to basic parsing
-            text = content.decode('utf-8', errors='ignore')
-            # Remove RTF control codes (basic cleanup)
-            import re
-            text = re.sub(r'\\[a-z]+\d*', '', text)
-            text = re.sub(r'[{}]', '', text)
-            return text.strip()
-    elif file_type == "text/csv":
-        # CSV file
-        try:
-            import pandas as pd
-            df = pd.read_csv(io.StringIO(content.decode('utf-8')))
-            return '\n'.join([' '.join(str(val) for val in row if pd.notna(val)) for _, row in df.iterrows()])
-        except:
-            st.error("Failed to read CSV file. Please ensure it's properly formatted.")
-            return ""
-    elif file_type == "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet":
-        # XLSX file
-        try:
-            import pandas as pd
-            df = pd.read_excel(io.BytesIO(content))
-            return '\n'.join([' '.join(str(val) for val in row if pd.notna(val)) for _, row in df.iterrows()])
-        except ImportError:
-            st.error("❌ Pandas library not available for Excel files. Please convert to CSV or TXT format.")
-            return ""
-        except Exception as e:
-            st.error(f"❌ Failed to read Excel file: {str(e)}")
-            st.info("💡 Try converting your Excel file to CSV or TXT format.")
-            return ""
-    elif uploaded_file.name.endswith('.odt'):
-        # ODT file (OpenDocument Text)
-        try:
-            from odf.text import P
-            from odf.opendocument import load
-            doc = load(io.BytesIO(content))
-            paragraphs = doc.getElementsByType(P)
-            text_content = []
-            for p in paragraphs:
-                text_content.append(str(p))
-            return '\n'.join(text_content)
-        except ImportError:
-            st.error("❌ ODT support requires 'odfpy' library. Please convert to DOCX or TXT format.")
-            return ""
-        except Exception as e:
-            st.error(f"❌ Failed to read ODT file: {str(e)}")
-            st.info("💡 Try converting your ODT file to DOCX or TXT format.")
-            return ""
-    elif uploaded_file.name.endswith('.ods'):
-        # ODS file (OpenDocument Spreadsheet)
-        try:
-            import pandas as pd
-            # Try using pandas with odf support
-            df = pd.read_excel(io.BytesIO(content), engine='odf')
-            return '\n'.join([' '.join(str(val) for val in row if pd.notna(val)) for _, row in df.iterrows()])
-        except ImportError:
-            st.error("❌ ODS support requires additional libraries. Please convert to XLSX or CSV format.")
-            return ""
-        except Exception as e:
-            st.error(f"❌ Failed to read ODS file: {str(e)}")
-            st.info("💡 Try converting your ODS file to XLSX or CSV format.")
-            return ""
+    job = st.session_state.get(f"processing_job_{method_prefix}")
+    if job is None:
+        return
+    if not job.done():
+        render_job_poller(f"processing_job_{method_prefix}")
+        return
+    
+    st.session_state.pop(f"processing_job_{method_prefix}")
+    try:
+        data, reused = job.result()
+    except Exception as e:
+        st.error(f"Error processing files: {str(e)}")
+        return
+    
+    if data is None:
+        st.error("No questions were found or formatted")
+        return
+    
+    if reused:
+        st.info("♻️ Inputs unchanged - reusing the files generated earlier.")
+    elif data['exam_rtf_bytes']:
+        if is_using_azure():
+            st.success("✅ RTF generated using Azure LibreOffice API")
+        else:
+            st.success("✅ RTF generated using local LibreOffice Docker API")
     else:
-        st.error(f"Unsupported file type: {file_type}")
+        st.error(f"❌ LibreOffice API conversion failed: {data['conversion_error']}")
+        st.info("🔄 Using basic RTF conversion as fallback.")
+    
+    st.session_state.processed_data = data
+    
+    st.success(f"Processed {data['mc_count'] + data['essay_count']} questions successfully!")
+    st.info(f"Found {data['mc_count']} multiple choice questions and {data['essay_count']} essay questions")
+
+def rerun_while_jobs_run():
+    """Poll background jobs by rerunning the script; only for Streamlit releases without fragments"""
+    from background_jobs import BackgroundJob
+    import time
+    
+    if any(isinstance(value, BackgroundJob) and not value.done() for value in st.session_state.values()):
+        time.sleep(JOB_POLL_SECONDS)
+        st.rerun()
+
+@st.cache_resource
+def get_shared_extraction_cache():
+    """Extraction results shared by every session in this server process"""
+    from content_cache import ContentCache, SHARED_CACHE_BYTES
+    return ContentCache(max_bytes=SHARED_CACHE_BYTES)
+
+def get_extraction_caches():
+    """This session's extraction cache, the process-wide one, then the host-wide disk tier if enabled"""
+    if 'extraction_cache' not in st.session_state:
+        from content_cache import ContentCache, SESSION_CACHE_BYTES
+        st.session_state.extraction_cache = ContentCache(max_bytes=SESSION_CACHE_BYTES)
+    caches = (st.session_state.extraction_cache, get_shared_extraction_cache())
+    disk_cache = get_disk_cache('extraction')
+    return caches + (disk_cache,) if disk_cache is not None else caches
+
+def read_upload_text(content, filename, caches=()):
+    """Sniff and extract an upload's bytes; safe to call from worker threads"""
+    from extractor_registry import extract_document
+    # The format is sniffed from the file's bytes, not the browser's MIME type.
+    # Results are cached by content hash, so reruns with the same upload are instant.
+    return extract_document(content, filename, caches=caches)
+
+def report_text_extraction(uploaded_file, result, error):
+    """Show the outcome of read_upload_text and return the text ('' on failure)"""
+    from extractor_registry import UnsupportedFormatError
+    
+    if isinstance(error, UnsupportedFormatError):
+        st.error(f"❌ {error}")
+        return ""
+    if isinstance(error, ImportError):
+        st.error(f"❌ Missing library for {uploaded_file.name}: {error.name}. Please convert to DOCX or TXT format.")
+        return ""
+    if error is not None:
+        st.error(f"❌ Failed to read {uploaded_file.name}: {str(error)}")
+        st.info("💡 Try converting your file to DOCX or TXT format.")
         return ""
+    
+    details = f", {result['pages']} pages" if result['pages'] else ""
+    st.caption(f"📄 {uploaded_file.name}: read as {result['label']}{details}")
+    if result['answers']:
+        st.session_state.question_bank_answers = result['answers']
+    return result['text']
+
+def extract_text_from_file(uploaded_file):
+    """Extract text content from uploaded file"""
+    from upload_spool import spooled_upload
+    try:
+        with spooled_upload(uploaded_file) as content:
+            result = read_upload_text(content, uploaded_file.name, get_extraction_caches())
+    except Exception as e:
+        return report_text_extraction(uploaded_file, None, e)
+    return report_text_extraction(uploaded_file, result, None)
 
 def parse_instructions_and_questions(text):
     """
@@ -547,81 +535,122 @@ def preview_parsed_content(instructions_text, questions_text):
     
     return instructions_text, questions_text
 
+def read_upload_answer_key(content, filename):
+    """Read answers from an answer key upload; safe to call from worker threads.
+
+    ``content`` is bytes-like (small uploads) or a binary file object such as
+    the MappedFile spooled_upload yields for large ones, which is read in place.
+    """
+    import io
+    from answer_key_reader import read_answer_key
+    if isinstance(content, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(content)
+    else:
+        source = content
+        source.seek(0)
+    # Stream the first sheet in read-only mode and pick the answer column
+    return read_answer_key(source, filename)
+
+def report_answer_key(uploaded_file, raw_answers, error):
+    """Show the outcome of read_upload_answer_key and return the answers ([] on failure)"""
+    is_spreadsheet = uploaded_file.name.lower().endswith(('.xlsx', '.ods'))
+    
+    if error is not None:
+        if is_spreadsheet:
+            st.error(f"❌ Failed to read Excel answer key file: {str(error)}")
+            st.info("💡 Try converting your Excel file to CSV or TXT format, or check that the first column contains your answer key.")
+        else:
+            st.error(f"Failed to read answer key file: {str(error)}")
+        return []
+    
+    if not is_spreadsheet:
+        return raw_answers
+    
+    st.success(f"✅ Found {len(raw_answers)} answers in Excel file")
+    
+    # Add validation and guidance
+    if len(raw_answers) < 10:
+        st.warning(f"⚠️ Only {len(raw_answers)} answers found. This seems low for a typical exam.")
+        with st.expander("💡 Excel File Tips"):
+            st.write("• Put one answer per row in the first column (A, B, C, D)")
+            st.write("• Don't include headers like 'Answer Key' or 'Question'")
+            st.write("• Make sure there are no empty rows between answers")
+            st.write("• Save as .xlsx format for best compatibility")
+        st.info("• Make sure there are no empty rows between answers")
+        st.info("• Save as .xlsx format")
+    elif len(raw_answers) != 40:
+        expected_from_instructions = 40  # You mentioned 40 questions
+        st.info(f"📋 Found {len(raw_answers)} answers, expected around {expected_from_instructions}")
+        if len(raw_answers) == 39:
+            st.warning("⚠️ Missing 1 answer! Check your Excel file for:")
+            st.info("• Empty rows that might contain an answer")
+            st.info("• Answers that got filtered as headers")
+            st.info("• The last row - sometimes it gets cut off")
+    else:
+        st.success(f"✅ Perfect! Found {len(raw_answers)} answers")
+    
+    return raw_answers
+
 def extract_answer_key_from_file(uploaded_file):
     """Extract answer key from uploaded file"""
-    import io
+    try:
+        answers = read_upload_answer_key(uploaded_file, uploaded_file.name)
+    except Exception as e:
+        return report_answer_key(uploaded_file, [], e)
+    return report_answer_key(uploaded_file, answers, None)
+
+def extract_uploads(instructions_file, questions_file, answer_key_file):
+    """Extract the three uploads concurrently, showing per-file progress.
     
-    file_type = uploaded_file.type
-    content = uploaded_file.read()
+    Returns (instructions_text, full_text, answer_key).
+    """
+    from contextlib import ExitStack
+    from extraction_orchestrator import run_extractions
+    from upload_spool import spooled_upload
     
-    if file_type == "text/plain":
-        text = content.decode('utf-8')
-        return [line.strip() for line in text.splitlines() if line.strip()]
-    elif file_type == "text/csv":
-        try:
-            import pandas as pd
-            df = pd.read_csv(io.StringIO(content.decode('utf-8')))
-            # Take first column as answer key
-            return [str(val).strip() for val in df.iloc[:, 0] if pd.notna(val)]
-        except:
-            st.error("Failed to read CSV answer key file.")
-            return []
-    elif file_type == "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet":
-        try:
-            import pandas as pd
-            # Read Excel with additional parameters to handle edge cases
-            df = pd.read_excel(
-                io.BytesIO(content), 
-                header=None,  # Don't assume first row is header
-                keep_default_na=False,  # Don't convert strings like 'NA' to NaN
-                na_values=[''],  # Only treat empty strings as NaN
-            )
-            
-            # Process first column as answer key
-            first_column = df.iloc[:, 0]
-            
-            # Extract answers, handling various edge cases
-            raw_answers = []
-            for val in first_column:
-                if pd.notna(val):  # Not NaN/None
-                    str_val = str(val).strip()
-                    if str_val:  # Not empty string
-                        raw_answers.append(str_val)
-            
-            st.success(f"✅ Found {len(raw_answers)} answers in Excel file")
-            
-            # Add validation and guidance
-            if len(raw_answers) < 10:
-                st.warning(f"⚠️ Only {len(raw_answers)} answers found. This seems low for a typical exam.")
-                with st.expander("💡 Excel File Tips"):
-                    st.write("• Put one answer per row in the first column (A, B, C, D)")
-                    st.write("• Don't include headers like 'Answer Key' or 'Question'")
-                    st.write("• Make sure there are no empty rows between answers")
-                    st.write("• Save as .xlsx format for best compatibility")
-                st.info("• Make sure there are no empty rows between answers")
-                st.info("• Save as .xlsx format")
-            elif len(raw_answers) != 40:
-                expected_from_instructions = 40  # You mentioned 40 questions
-                st.info(f"📋 Found {len(raw_answers)} answers, expected around {expected_from_instructions}")
-                if len(raw_answers) == 39:
-                    st.warning("⚠️ Missing 1 answer! Check your Excel file for:")
-                    st.info("• Empty rows that might contain an answer")
-                    st.info("• Answers that got filtered as headers")
-                    st.info("• The last row - sometimes it gets cut off")
+    # Session state is only touched here, on the script thread
+    caches = get_extraction_caches()
+    uploads = {'questions': questions_file}
+    if instructions_file:
+        uploads['instructions'] = instructions_file
+    if answer_key_file:
+        uploads['answer_key'] = answer_key_file
+    
+    progress = st.progress(0.0, text=f"Reading {len(uploads)} file(s)...")
+    
+    def on_update(name, outcome, done, total):
+        state = "failed" if outcome['error'] else "read"
+        progress.progress(done / total, text=f"{uploads[name].name} {state} in {outcome['seconds']:.1f}s ({done}/{total})")
+    
+    # Uploads are shared as memoryviews, or memory-mapped spool files when large,
+    # and released as soon as every extraction has finished
+    with ExitStack() as stack:
+        tasks = {}
+        for name, uploaded_file in uploads.items():
+            content = stack.enter_context(spooled_upload(uploaded_file))
+            if name == 'answer_key':
+                tasks[name] = (read_upload_answer_key, content, uploaded_file.name)
             else:
-                st.success(f"✅ Perfect! Found {len(raw_answers)} answers")
-            
-            return raw_answers
-        except ImportError:
-            st.error("❌ Pandas library not available for Excel files. Please convert to CSV or TXT format.")
-            return []
-        except Exception as e:
-            st.error(f"❌ Failed to read Excel answer key file: {str(e)}")
-            st.info("💡 Try converting your Excel file to CSV or TXT format, or check that the first column contains your answer key.")
-            return []
-    else:
-        st.error(f"Unsupported answer key file type: {file_type}")
-        return []
+                tasks[name] = (read_upload_text, content, uploaded_file.name, caches)
+        outcomes = run_extractions(tasks, on_update)
+    progress.empty()
+    
+    instructions_text = ""
+    if 'instructions' in outcomes:
+        outcome = outcomes['instructions']
+        instructions_text = report_text_extraction(instructions_file, outcome['result'], outcome['error'])
+    
+    st.session_state.question_bank_answers = []
+    outcome = outcomes['questions']
+    full_text = report_text_extraction(questions_file, outcome['result'], outcome['error'])
+    
+    answer_key = []
+    if 'answer_key' in outcomes:
+        st.write(f"📄 Processing answer key file: {answer_key_file.name} ({answer_key_file.type})")
+        outcome = outcomes['answer_key']
+        answer_key = report_answer_key(answer_key_file, outcome['result'], outcome['error'])
+    
+    return instructions_text, full_text, answer_key
 
 def upload_to_sharepoint_with_site(access_token, file_content, filename, site_id, path):
     """Upload file to a specific SharePoint site and path"""
@@ -776,8 +805,14 @@ def save_favorite_folder(name, site_id, path, is_default=False):
     
     st.session_state.favorite_folders = favorites
 
+@fragment
 def render_folder_browser(access_token, site_id, method_prefix):
-    """Render an advanced folder browser with tree view and favorites"""
+    """Render an advanced folder browser with tree view and favorites.
+
+    Runs as a fragment: opening folders and picking favorites rerun only the
+    browser. The selection is kept in session state for the upload panel
+    (see selected_upload_path).
+    """
     st.write("📁 **Choose Upload Folder:**")
     
     # Load favorites
@@ -818,7 +853,7 @@ def render_folder_browser(access_token, site_id, method_prefix):
                         is_default=True
                     )
                     st.success("Set as default folder!")
-                    st.rerun()
+                    rerun_fragment()
         else:
             st.info("No favorite folders saved yet. Use 'Browse Folders' to add some!")
     
@@ -841,7 +876,7 @@ def render_folder_browser(access_token, site_id, method_prefix):
                 if st.button("🏠 Root", key=f"breadcrumb_root_{method_prefix}"):
                     st.session_state[f'current_folder_path_{method_prefix}'] = ""
                     st.session_state[f'current_folder_id_{method_prefix}'] = None
-                    st.rerun()
+                    rerun_fragment()
             
             for i, part in enumerate(path_parts):
                 with breadcrumb_cols[i + 1]:
@@ -850,13 +885,17 @@ def render_folder_browser(access_token, site_id, method_prefix):
                         st.session_state[f'current_folder_path_{method_prefix}'] = partial_path
                         # Clear the folder ID so it gets looked up again
                         st.session_state[f'current_folder_id_{method_prefix}'] = None
-                        st.rerun()
+                        rerun_fragment()
         else:
             st.write("📍 **Current location**: Root")
         
-        # Load current folder contents
-        with st.spinner("Loading folders..."):
-            folders = get_folder_tree(access_token, site_id, current_folder_id, current_path)
+        # Load current folder contents once; revisiting a folder reuses the listing
+        folder_cache = st.session_state.setdefault('available_folders', {})
+        cache_key = (site_id, current_folder_id, current_path)
+        if cache_key not in folder_cache:
+            with st.spinner("Loading folders..."):
+                folder_cache[cache_key] = get_folder_tree(access_token, site_id, current_folder_id, current_path)
+        folders = folder_cache[cache_key]
         
         if folders:
             st.write("📁 **Available Folders:**")
@@ -878,7 +917,7 @@ def render_folder_browser(access_token, site_id, method_prefix):
                         if st.button("📂 Open", key=f"open_{folder['id']}_{method_prefix}", help=f"Browse into {folder['name']}"):
                             st.session_state[f'current_folder_path_{method_prefix}'] = folder['path']
                             st.session_state[f'current_folder_id_{method_prefix}'] = folder['id']
-                            st.rerun()
+                            rerun_fragment()
                     
                     with col3:
                         if st.button("🎯 Select", key=f"select_{folder['id']}_{method_prefix}", help=f"Upload to {folder['name']}"):
@@ -900,7 +939,7 @@ def render_folder_browser(access_token, site_id, method_prefix):
                                 if st.button("💾 Save", key=f"save_fav_{folder['id']}_{method_prefix}"):
                                     save_favorite_folder(fav_name, site_id, folder['path'], make_default)
                                     st.success("Saved to favorites!")
-                                    st.rerun()
+                                    rerun_fragment()
                             break
                     
                     st.divider()  # Visual separator between folders
@@ -940,20 +979,22 @@ def render_folder_browser(access_token, site_id, method_prefix):
                 if st.button("💾 Save", key=f"manual_save_fav_{method_prefix}"):
                     save_favorite_folder(fav_name, site_id, selected_folder_path, make_default)
                     st.success("Saved to favorites!")
-                    st.rerun()
+                    rerun_fragment()
     
-    # Return the selected path (URL encode spaces)
-    if selected_folder_path:
-        # Store in session state for persistence
-        st.session_state[f'final_folder_path_{method_prefix}'] = selected_folder_path
-        return selected_folder_path.replace(' ', '%20') + ('/' if not selected_folder_path.endswith('/') else '')
-    
-    # Check if we have a stored selection
+    # A fragment's return value is dropped when only the fragment reruns, so the
+    # upload panel reads the selection from session state; rerun the app once
+    # when it changes so that panel shows the new folder
+    stored_key = f'final_folder_path_{method_prefix}'
+    if selected_folder_path and selected_folder_path != st.session_state.get(stored_key):
+        st.session_state[stored_key] = selected_folder_path
+        st.rerun()
+
+def selected_upload_path(method_prefix):
+    """The folder chosen in the folder browser, URL-encoded for Graph, or "" if none"""
     stored_path = st.session_state.get(f'final_folder_path_{method_prefix}', '')
-    if stored_path:
-        return stored_path.replace(' ', '%20') + ('/' if not stored_path.endswith('/') else '')
-    
-    return ""
+    if not stored_path:
+        return ""
+    return stored_path.replace(' ', '%20') + ('/' if not stored_path.endswith('/') else '')
 
 def send_notification_email(access_token, recipients, subject, body, uploaded_files):
     """Send email notification using Microsoft Graph API with robust error handling"""
@@ -1076,11 +1117,180 @@ def send_notification_email(access_token, recipients, subject, body, uploaded_fi
         traceback.print_exc()
         return False, f"Email error: {str(e)}"
 
-def render_results(SHAREPOINT_AVAILABLE, method_prefix=""):
-    """Render the results section (shared between both methods)"""
+def upload_files_to_sharepoint(access_token, uploads, site_info, report):
+    """Upload (file type, content, filename) entries in a background job and return the results"""
     from safe_formatter import upload_to_sharepoint_corrected
     
-    data = st.session_state.processed_data
+    total = sum(len(content) for _, content, _ in uploads) or 1
+    sent = 0
+    upload_results = []
+    
+    for file_type, content, filename in uploads:
+        report(sent / total, f"Uploading {file_type}...")
+        
+        def on_progress(done, size, file_type=file_type, base=sent):
+            report((base + done) / total, f"Uploading {file_type}... {(base + done) * 100 // total}%")
+        
+        if site_info:
+            # Upload to custom site/folder
+            success, result = upload_to_sharepoint_with_site(
+                access_token, content, filename, site_info['site_id'], site_info['path']
+            )
+        else:
+            # Upload to default location
+            success, result = upload_to_sharepoint_corrected(
+                access_token, content, filename, on_progress=on_progress
+            )
+        upload_results.append((file_type, success, result))
+        sent += len(content)
+    
+    report(1.0, "Upload finished")
+    return upload_results
+
+def render_job_progress(job):
+    """Show a running background job's latest stage"""
+    fraction, message = job.progress()
+    st.progress(fraction, text=f"⏳ {message} ({job.elapsed():.0f}s)")
+
+@fragment(run_every=JOB_POLL_SECONDS)
+def render_job_poller(job_key):
+    """Progress of the background job in session_state[job_key], refreshed without rerunning the app"""
+    job = st.session_state.get(job_key)
+    if job is None:
+        return
+    if job.done():
+        # One full rerun hands the finished job to the code that shows its results
+        st.rerun()
+    render_job_progress(job)
+
+def render_sharepoint_job(method_prefix):
+    """Show progress of this tab's SharePoint upload, then its results and email once done"""
+    job = st.session_state.get(f"sharepoint_job_{method_prefix}")
+    if job is None:
+        return
+    if not job.done():
+        render_job_poller(f"sharepoint_job_{method_prefix}")
+        return
+    
+    st.session_state.pop(f"sharepoint_job_{method_prefix}")
+    email = st.session_state.pop(f"sharepoint_email_{method_prefix}", {})
+    try:
+        upload_results = job.result()
+    except Exception as e:
+        st.error(f"Process error: {str(e)}")
+        return
+    
+    # Show upload results
+    uploaded_files = []
+    for file_type, success, result in upload_results:
+        if success:
+            st.success(f"✅ {file_type} uploaded to SharePoint!")
+            if isinstance(result, dict) and 'url' in result:
+                st.write(f"🔗 **{file_type} URL:** {result['url']}")
+                uploaded_files.append(f"{file_type}: {result['url']}")
+        else:
+            st.error(f"❌ Failed to upload {file_type}: {result}")
+    
+    # Send email if requested
+    if email.get('send'):
+        try:
+            email_success, email_message = send_notification_email(
+                st.session_state.get('sp_access_token'),
+                email['recipients'],
+                email['subject'],
+                email['body'],
+                uploaded_files
+            )
+            if email_success:
+                st.success("✅ Email notifications sent!")
+            else:
+                st.warning(f"⚠️ Upload successful but email failed: {email_message}")
+                # Show detailed error message
+                with st.expander("📧 Email Error Details"):
+                    st.write(email_message)
+                    if "Mail.Send scope required" in email_message:
+                        st.info("💡 **Solution**: Sign out and sign back in to get email permissions")
+                    elif "Unauthorized" in email_message:
+                        st.info("💡 **Solution**: Your session expired. Sign out and sign back in")
+        except Exception as email_error:
+            st.warning(f"⚠️ Upload successful but email failed: {str(email_error)}")
+            with st.expander("📧 Email Error Details"):
+                st.error(f"Technical error: {str(email_error)}")
+                st.info("💡 Try signing out and signing back in, or skip email for now")
+    
+    if all(success for _, success, _ in upload_results):
+        st.balloons()
+
+@fragment
+def render_question_preview(data, method_prefix):
+    """Page through every formatted question, optionally only those with answer key problems.
+
+    Only one page of questions is rendered per run, so paging costs the same
+    for a 10-question quiz and a 300-question exam.
+    """
+    questions = data['questions_list']
+    flags = data.get('answer_flags', {})
+    
+    st.subheader(f"Questions Preview ({len(questions)} questions)")
+    
+    show_flagged = False
+    if flags:
+        st.warning(f"⚠️ {len(flags)} question(s) may not match the answer key")
+        show_flagged = st.checkbox("Show only flagged questions", key=f"preview_flagged_{method_prefix}")
+    
+    indices = sorted(flags) if show_flagged else range(len(questions))
+    pages = max(1, -(-len(indices) // PREVIEW_PAGE_SIZE))
+    
+    page_key = f"preview_page_{method_prefix}"
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = 1
+    
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        page = st.number_input("Page", min_value=1, max_value=pages, step=1, key=page_key)
+    
+    start = (page - 1) * PREVIEW_PAGE_SIZE
+    page_indices = indices[start:start + PREVIEW_PAGE_SIZE]
+    with col2:
+        if page_indices:
+            st.caption(f"Showing {start + 1}-{start + len(page_indices)} of {len(indices)} · page {page} of {pages}")
+    
+    for index in page_indices:
+        if index in flags:
+            st.warning(f"Question {index + 1}: {flags[index]}")
+        st.text(questions[index])
+        st.markdown("---")
+
+def build_download_bundle(store, record, include_exam_docx):
+    """The Download All ZIP, or a ZIP with the expiry notice if the files were dropped before the click.
+
+    On newer Streamlit this runs when the button is clicked, outside the
+    script run, so the warning only shows where it is built with the page.
+    """
+    from artifact_store import ArtifactExpired
+    from download_bundle import build_bundle_file, notice_bundle_file
+    try:
+        return build_bundle_file(store.load_record(record), include_exam_docx)
+    except ArtifactExpired:
+        st.warning(EXPIRED_RESULTS_MESSAGE)
+        return notice_bundle_file(EXPIRED_RESULTS_MESSAGE)
+
+@fragment
+def render_results(SHAREPOINT_AVAILABLE, method_prefix=""):
+    """Render the results section (shared between both methods).
+
+    Runs as a fragment, so download checkboxes and the SharePoint panel rerun
+    only this section rather than the whole app.
+    """
+    from artifact_store import ArtifactExpired
+    
+    # Session state holds handles; load the files for this run only
+    try:
+        data = get_artifact_store().load_record(st.session_state.processed_data)
+    except ArtifactExpired:
+        st.warning(EXPIRED_RESULTS_MESSAGE)
+        st.session_state.processed_data = None
+        return
     
     st.markdown("---")
     st.subheader("Download Files")
@@ -1090,10 +1300,7 @@ def render_results(SHAREPOINT_AVAILABLE, method_prefix=""):
         st.subheader("Instructions Preview")
         st.text(data['instructions_text'][:500] + "..." if len(data['instructions_text']) > 500 else data['instructions_text'])
     
-    st.subheader("Questions Preview (First 3)")
-    for i, q in enumerate(data['questions_list'][:3]):
-        st.text(q[:200] + "..." if len(q) > 200 else q)
-        st.markdown("---")
+    render_question_preview(data, method_prefix)
     
     # Download options
     col1, col2 = st.columns(2)
@@ -1133,6 +1340,24 @@ def render_results(SHAREPOINT_AVAILABLE, method_prefix=""):
                     key=f"download_exam_basic_{method_prefix}_btn"
                 )
 
+    # Everything in one ZIP, built from the stored files when the button is clicked
+    from download_bundle import bundle_filename
+    from streamlit_compat import deferred_download
+    
+    record = st.session_state.processed_data
+    store = get_artifact_store()
+    include_exam_docx = st.checkbox(
+        "Include the exam DOCX sent to LibreOffice", key=f"bundle_docx_{method_prefix}_cb"
+    ) if data.get('exam_docx') else False
+    st.download_button(
+        label="📦 Download All (ZIP)",
+        data=deferred_download(lambda: build_download_bundle(store, record, include_exam_docx)),
+        file_name=bundle_filename(data),
+        mime="application/zip",
+        use_container_width=True,
+        key=f"download_all_{method_prefix}_btn"
+    )
+
     # SharePoint Upload
     if SHAREPOINT_AVAILABLE:
         st.markdown("---")
@@ -1182,11 +1407,12 @@ def render_results(SHAREPOINT_AVAILABLE, method_prefix=""):
                     st.write(f"🔗 **URL**: {selected_site_data['webUrl']}")
                     
                     # Advanced folder browser
-                    selected_folder_path = render_folder_browser(
+                    render_folder_browser(
                         st.session_state.get('sp_access_token'), 
                         selected_site_data['id'], 
                         method_prefix
                     )
+                    selected_folder_path = selected_upload_path(method_prefix)
                         
                     site_info = {
                         'site_id': selected_site_data['id'],
@@ -1268,95 +1494,31 @@ This email was sent automatically by the ExamSoft RTF Formatter tool.""",
             
             if st.button("🚀 Upload to SharePoint", use_container_width=True, key=f"sharepoint_upload_{method_prefix}_btn"):
                 try:
-                    with st.spinner("Processing upload and email..."):
-                        access_token = st.session_state.get('sp_access_token')
-                        
-                        upload_results = []
-                        
-                        # Upload instructions
-                        if upload_instructions_sp and data['instructions_docx']:
-                            if site_info:
-                                # Upload to custom site/folder
-                                success, result = upload_to_sharepoint_with_site(
-                                    access_token, 
-                                    data['instructions_docx'], 
-                                    data['instructions_filename'],
-                                    site_info['site_id'],
-                                    site_info['path']
-                                )
-                            else:
-                                # Upload to default location
-                                success, result = upload_to_sharepoint_corrected(
-                                    access_token, 
-                                    data['instructions_docx'], 
-                                    data['instructions_filename']
-                                )
-                            upload_results.append(("Instructions", success, result))
-                        
-                        # Upload exam
-                        if upload_exam_sp:
-                            rtf_content = data.get('exam_rtf_bytes') or data.get('exam_rtf_content')
-                            if rtf_content:
-                                if site_info:
-                                    # Upload to custom site/folder
-                                    success, result = upload_to_sharepoint_with_site(
-                                        access_token, 
-                                        rtf_content, 
-                                        data['exam_filename'],
-                                        site_info['site_id'],
-                                        site_info['path']
-                                    )
-                                else:
-                                    # Upload to default location
-                                    success, result = upload_to_sharepoint_corrected(
-                                        access_token, 
-                                        rtf_content, 
-                                        data['exam_filename']
-                                    )
-                                upload_results.append(("Exam", success, result))
-                        
-                        # Show upload results
-                        uploaded_files = []
-                        for file_type, success, result in upload_results:
-                            if success:
-                                st.success(f"✅ {file_type} uploaded to SharePoint!")
-                                if isinstance(result, dict) and 'url' in result:
-                                    st.write(f"🔗 **{file_type} URL:** {result['url']}")
-                                    uploaded_files.append(f"{file_type}: {result['url']}")
-                            else:
-                                st.error(f"❌ Failed to upload {file_type}: {result}")
-                        
-                        # Send email if requested
-                        if send_email and email_recipients.strip():
-                            try:
-                                email_success, email_message = send_notification_email(
-                                    access_token,
-                                    email_recipients.strip().split('\n'),
-                                    email_subject,
-                                    email_body,
-                                    uploaded_files
-                                )
-                                if email_success:
-                                    st.success("✅ Email notifications sent!")
-                                else:
-                                    st.warning(f"⚠️ Upload successful but email failed: {email_message}")
-                                    # Show detailed error message
-                                    with st.expander("📧 Email Error Details"):
-                                        st.write(email_message)
-                                        if "Mail.Send scope required" in email_message:
-                                            st.info("💡 **Solution**: Sign out and sign back in to get email permissions")
-                                        elif "Unauthorized" in email_message:
-                                            st.info("💡 **Solution**: Your session expired. Sign out and sign back in")
-                            except Exception as email_error:
-                                st.warning(f"⚠️ Upload successful but email failed: {str(email_error)}")
-                                with st.expander("📧 Email Error Details"):
-                                    st.error(f"Technical error: {str(email_error)}")
-                                    st.info("💡 Try signing out and signing back in, or skip email for now")
-                        
-                        if all(success for _, success, _ in upload_results):
-                            st.balloons()
+                    access_token = st.session_state.get('sp_access_token')
+                    
+                    uploads = []
+                    if upload_instructions_sp and data['instructions_docx']:
+                        uploads.append(("Instructions", data['instructions_docx'], data['instructions_filename']))
+                    if upload_exam_sp:
+                        rtf_content = data.get('exam_rtf_bytes') or data.get('exam_rtf_content')
+                        if rtf_content:
+                            uploads.append(("Exam", rtf_content, data['exam_filename']))
+                    
+                    # Uploads run in the background so reruns don't cut them off
+                    from background_jobs import submit_job
+                    st.session_state[f"sharepoint_job_{method_prefix}"] = submit_job(
+                        "SharePoint upload", upload_files_to_sharepoint, access_token, uploads, site_info
+                    )
+                    st.session_state[f"sharepoint_email_{method_prefix}"] = {
+                        'send': send_email and bool(email_recipients.strip()),
+                        'recipients': email_recipients.strip().split('\n'),
+                        'subject': email_subject,
+                        'body': email_body,
+                    }
                 except Exception as e:
                     st.error(f"Process error: {str(e)}")
+            
+            render_sharepoint_job(method_prefix)
         else:
             st.info("🔐 **Sign in with Microsoft 365** in the sidebar to upload to SharePoint")
 
@@ -1370,9 +1532,81 @@ This email was sent automatically by the ExamSoft RTF Formatter tool.""",
             st.success("📝 Form cleared! Ready for next exam.")
             st.rerun()
 
+def format_bytes(size):
+    """Human-readable byte count"""
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+def session_memory_bytes():
+    """Approximate memory held by this session's state (caches counted by their own tally)"""
+    from content_cache import ContentCache, estimate_size
+    
+    total = 0
+    for value in st.session_state.values():
+        if isinstance(value, ContentCache):
+            total += value.stats()['bytes']
+        elif hasattr(value, '__dict__'):
+            total += estimate_size(vars(value))
+        else:
+            total += estimate_size(value)
+    return total
+
+@fragment
+def render_performance_panel():
+    """Cache and artifact store use for the process, and memory used by this session"""
+    from artifact_store import record_artifact_bytes
+    
+    with st.expander("📊 Performance"):
+        st.button("🔄 Refresh stats", key="refresh_performance_stats")
+        
+        st.write("**This session**")
+        st.write(f"Session state: {format_bytes(session_memory_bytes())}")
+        st.write(f"Stored files referenced: {format_bytes(record_artifact_bytes(st.session_state.get('processed_data')))}")
+        
+        store = get_artifact_store().stats()
+        st.write("**Artifact store (all sessions)**")
+        st.write(f"Memory: {format_bytes(store['memory_bytes'])} of {format_bytes(store['max_memory_bytes'])}")
+        st.write(f"Disk: {format_bytes(store['disk_bytes'])} of {format_bytes(store['max_disk_bytes'])} "
+                 f"({store['spilled_entries']} of {store['entries']} files spilled)")
+        st.caption(f"{store['spills']} spills · {store['expirations']} expired after "
+                   f"{get_artifact_store().ttl_seconds // 60} idle minutes")
+        
+        for label, cache in (("Processing cache", get_pipeline_cache()),
+                             ("Extraction cache", get_shared_extraction_cache())):
+            stats = cache.stats()
+            lookups = stats['hits'] + stats['misses']
+            hit_rate = f"{stats['hits'] / lookups:.0%}" if lookups else "n/a"
+            st.write(f"**{label}**")
+            st.write(f"{stats['entries']} entries · {format_bytes(stats['bytes'])} of "
+                     f"{format_bytes(stats['max_bytes'])} · hit rate {hit_rate}")
+        
+        disk_caches = [(label, get_disk_cache(namespace))
+                       for label, namespace in (("Processing", 'pipeline'), ("Extraction", 'extraction'))]
+        if all(cache is None for _, cache in disk_caches):
+            st.caption("Disk cache shared between server processes is off (set SHARED_CACHE_DB to enable)")
+        else:
+            st.write("**Disk cache (all server processes)**")
+            for label, cache in disk_caches:
+                if cache is None:
+                    continue
+                stats = cache.stats()
+                lookups = stats['hits'] + stats['misses']
+                hit_rate = f"{stats['hits'] / lookups:.0%}" if lookups else "n/a"
+                st.write(f"{label}: {stats['entries']} entries · {format_bytes(stats['bytes'])} · "
+                         f"hit rate {hit_rate} here")
+            evictions = sum(cache.evictions for _, cache in disk_caches if cache is not None)
+            expirations = sum(cache.expirations for _, cache in disk_caches if cache is not None)
+            st.caption(f"Database capped at {format_bytes(stats['max_bytes'])} · "
+                       f"{evictions} evictions and {expirations} expired entries by this process")
+
 def main():
     """Main application function"""
     try:
+        start_server_warmup()
+        
         # Try to import SharePoint functionality
         try:
             from persistent_auth import initialize_persistent_auth, render_persistent_auth_ui, render_auth_status, sign_out_persistent
@@ -1435,11 +1669,11 @@ def main():
         
         with tab1:
             st.write("Paste your instructions, exam questions, and answer key below. No file upload needed.")
-            render_text_paste_method()
+            render_text_paste_method(SHAREPOINT_AVAILABLE)
             
         with tab2:
             st.write("Upload docx, rtf, text, csv, or xlsx files to extract and format your exam content.")
-            render_file_upload_method()
+            render_file_upload_method(SHAREPOINT_AVAILABLE)
 
         # SharePoint authentication in sidebar
         if SHAREPOINT_AVAILABLE:
@@ -1461,6 +1695,13 @@ def main():
             except Exception as e:
                 st.sidebar.error(f"Auth error: {e}")
 
+        with st.sidebar:
+            render_performance_panel()
+
+        # Progress bars poll in their own fragments; without fragments rerun the app instead
+        if not FRAGMENTS_SUPPORTED:
+            rerun_while_jobs_run()
+
     except ImportError as e:
         st.error(f"❌ Import Error: {e}")
         st.error("Please ensure all required packages are installed.")
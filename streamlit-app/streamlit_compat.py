@@ -0,0 +1,47 @@
+# Streamlit features that differ between the versions we deploy on
+# Fragments arrived as st.experimental_fragment (1.33) and became st.fragment
+# (1.37); on older releases the decorated panels simply run with the script.
+# Newer releases also build download data only when the button is clicked.
+
+import streamlit as st
+from streamlit.errors import StreamlitAPIException
+
+# False on releases before fragments; panels then run with the whole script
+FRAGMENTS_SUPPORTED = bool(getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None))
+
+def fragment(func=None, *, run_every=None):
+    """Decorate a panel so its widgets rerun only that panel where fragments are supported"""
+    decorator = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None)
+    if decorator is None:
+        return func if func is not None else (lambda f: f)
+    if func is None:
+        return decorator(run_every=run_every)
+    return decorator(func, run_every=run_every)
+
+def rerun_fragment(fallback_to_app=True):
+    """Rerun the current fragment, or the whole app when a fragment rerun isn't possible.
+
+    Fragment-scoped reruns only work while the fragment itself is rerunning;
+    during a full-app run this reruns the app, or does nothing when
+    ``fallback_to_app`` is False.
+    """
+    try:
+        st.rerun(scope="fragment")
+    except (TypeError, StreamlitAPIException):
+        # Older Streamlit, or called during a full-app run
+        if fallback_to_app:
+            st.rerun()
+
+def _download_accepts_callable():
+    """True if st.download_button can build its data when clicked (newer Streamlit)"""
+    try:
+        from streamlit.elements.widgets import button
+    except ImportError:
+        return False
+    return 'Callable' in str(getattr(button, 'DownloadButtonDataType', ''))
+
+DOWNLOAD_ACCEPTS_CALLABLE = _download_accepts_callable()
+
+def deferred_download(build):
+    """Data for st.download_button: ``build`` itself where it runs on click, else its result now"""
+    return build if DOWNLOAD_ACCEPTS_CALLABLE else build()
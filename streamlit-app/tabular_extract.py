@@ -0,0 +1,185 @@
+# Columnar text extraction for CSV, XLSX and ODS question files
+# Builds question text with whole-column string operations instead of
+# per-row iterrows() joins, and reads large CSV banks in chunks.
+
+import io
+import re
+
+import pandas as pd
+
+# Rows per chunk when reading CSV files
+CSV_CHUNK_ROWS = 5000
+
+# Normalized header names for a question-bank layout
+QUESTION_HEADERS = {'question', 'questiontext', 'questionstem', 'stem', 'prompt', 'q'}
+ANSWER_HEADERS = {'answer', 'correctanswer', 'correct', 'key', 'answerkey', 'correctchoice'}
+NUMBER_HEADERS = {'number', 'no', 'num', 'qno', 'qnum', 'questionnumber', 'questionno', ''}
+CHOICE_LETTERS = ('A', 'B', 'C', 'D')
+CHOICE_PREFIXES = ('', 'choice', 'option', 'answer')
+
+def _normalize_header(header):
+    """Lower-case a column header and drop everything but letters and digits"""
+    return re.sub(r'[^a-z0-9]', '', str(header).lower())
+
+def detect_question_bank_layout(columns):
+    """Map question-bank roles to column names, or return None for other layouts.
+
+    A bank needs a question column and at least two choice columns (A-D);
+    number and answer columns are optional.
+    """
+    layout = {'question': None, 'number': None, 'answer': None, 'choices': {}}
+
+    for column in columns:
+        header = _normalize_header(column)
+        if header in QUESTION_HEADERS and layout['question'] is None:
+            layout['question'] = column
+        elif header in ANSWER_HEADERS and layout['answer'] is None:
+            layout['answer'] = column
+        elif header in NUMBER_HEADERS and layout['number'] is None:
+            layout['number'] = column
+        else:
+            for letter in CHOICE_LETTERS:
+                if header in {prefix + letter.lower() for prefix in CHOICE_PREFIXES}:
+                    layout['choices'].setdefault(letter, column)
+                    break
+
+    if layout['question'] is None or len(layout['choices']) < 2:
+        return None
+    return layout
+
+def _clean(series):
+    """Column as stripped strings with missing cells as ''"""
+    return series.fillna('').astype(str).str.strip()
+
+def _question_numbers(frame, layout, start):
+    """Question numbers from the number column, falling back to row position"""
+    position = pd.Series(range(start, start + len(frame)), index=frame.index).astype(str)
+    if layout['number'] is None:
+        return position
+    numbers = _clean(frame[layout['number']]).str.extract(r'^(\d+)', expand=False)
+    return numbers.fillna(position)
+
+def _bank_answers(frame, layout):
+    """Upper-case answer letters, '' where the answer cell is empty or not A-D"""
+    if layout['answer'] is None:
+        return pd.Series('', index=frame.index)
+    answers = _clean(frame[layout['answer']]).str.extract(r'^([A-Da-d])\b', expand=False)
+    return answers.fillna('').str.upper()
+
+def bank_frame_to_text(frame, layout, start=1):
+    """Render a question-bank frame as numbered questions with lettered choices"""
+    question = _clean(frame[layout['question']])
+    blocks = _question_numbers(frame, layout, start) + '. ' + question
+
+    for letter, column in sorted(layout['choices'].items()):
+        choice = _clean(frame[column])
+        blocks = blocks + (f'\n{letter}. ' + choice).where(choice.ne(''), '')
+
+    return '\n\n'.join(blocks[question.ne('')].tolist())
+
+def bank_frame_to_records(frame, layout, start=1):
+    """Turn a question-bank frame into question dicts (number, question, choices, answer)"""
+    question = _clean(frame[layout['question']])
+    keep = question.ne('')
+    numbers = _question_numbers(frame, layout, start)[keep]
+    answers = _bank_answers(frame, layout)[keep]
+    choice_columns = {letter: _clean(frame[column])[keep].tolist()
+                      for letter, column in sorted(layout['choices'].items())}
+
+    records = []
+    for index, (number, text, answer) in enumerate(zip(numbers, question[keep], answers)):
+        choices = {letter: values[index] for letter, values in choice_columns.items() if values[index]}
+        records.append({'number': int(number), 'question': text, 'choices': choices, 'answer': answer})
+    return records
+
+def frame_to_text(frame):
+    """Join each row's non-empty cells with spaces, one row per line"""
+    lines = pd.Series('', index=frame.index)
+    for column in frame.columns:
+        cell = _clean(frame[column])
+        separator = pd.Series(' ', index=frame.index).where(lines.ne('') & cell.ne(''), '')
+        lines = lines + separator + cell
+    return '\n'.join(lines[lines.ne('')].tolist())
+
+def ods_frame(source):
+    """First ODS sheet as a DataFrame of strings, streamed from content.xml (no odfpy)"""
+    from stream_extractors import iter_ods_rows
+    rows = list(iter_ods_rows(source))
+    if not rows:
+        return pd.DataFrame(dtype=str)
+
+    width = max(len(row) for row in rows)
+    header, seen = [], {}
+    for index, name in enumerate(rows[0] + [''] * (width - len(rows[0]))):
+        # Match read_excel's names for blank and duplicate headers
+        name = name or f'Unnamed: {index}'
+        if name in seen:
+            seen[name] += 1
+            name = f'{name}.{seen[name]}'
+        else:
+            seen[name] = 0
+        header.append(name)
+
+    body = [row + [''] * (width - len(row)) for row in rows[1:]]
+    return pd.DataFrame(body, columns=header, dtype=str)
+
+def iter_tabular_frames(source, filename, chunksize=CSV_CHUNK_ROWS):
+    """Yield DataFrames of string cells: CSV in chunks, spreadsheets whole"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    elif hasattr(source, 'seek'):
+        source.seek(0)
+
+    name = filename.lower()
+    if name.endswith('.csv'):
+        from input_decoding import detect_stream_encoding
+        yield from pd.read_csv(source, dtype=str, keep_default_na=False,
+                               encoding=detect_stream_encoding(source), encoding_errors='replace',
+                               chunksize=chunksize)
+    elif name.endswith('.ods'):
+        yield ods_frame(source)
+    else:
+        yield pd.read_excel(source, dtype=str, keep_default_na=False)
+
+def extract_tabular_text(source, filename, chunksize=CSV_CHUNK_ROWS):
+    """Extract question text from a CSV, XLSX or ODS file.
+
+    Question-bank sheets (question, A-D and optional answer columns) become
+    numbered questions with lettered choices; any other layout becomes one
+    line of space-separated cells per row. Returns ``(text, answers)`` where
+    ``answers`` holds the bank's answer column, or [] when there is none.
+    """
+    chunks = []
+    answers = []
+    layout = None
+    start = 1
+
+    for index, frame in enumerate(iter_tabular_frames(source, filename, chunksize)):
+        if index == 0:
+            layout = detect_question_bank_layout(frame.columns)
+        if layout is None:
+            chunks.append(frame_to_text(frame))
+            continue
+        chunks.append(bank_frame_to_text(frame, layout, start))
+        if layout['answer'] is not None:
+            question = _clean(frame[layout['question']])
+            answers.extend(_bank_answers(frame, layout)[question.ne('')].tolist())
+        start += len(frame)
+
+    separator = '\n\n' if layout is not None else '\n'
+    return separator.join(chunk for chunk in chunks if chunk), answers
+
+def extract_question_records(source, filename, chunksize=CSV_CHUNK_ROWS):
+    """Read a question-bank file into question dicts, or [] if it is not a bank layout"""
+    records = []
+    layout = None
+    start = 1
+
+    for index, frame in enumerate(iter_tabular_frames(source, filename, chunksize)):
+        if index == 0:
+            layout = detect_question_bank_layout(frame.columns)
+            if layout is None:
+                return []
+        records.extend(bank_frame_to_records(frame, layout, start))
+        start += len(frame)
+    return records
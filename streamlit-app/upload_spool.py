@@ -0,0 +1,67 @@
+# Zero-copy access to uploaded files for the extractors
+# Small uploads are handed over as a memoryview of Streamlit's buffer. Large
+# ones are spooled to a temp file and memory-mapped, so extraction works on
+# file-backed pages the OS can drop under memory pressure instead of on
+# extra in-memory copies of the upload.
+
+import io
+import os
+import mmap
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+# Uploads larger than this are spooled to disk
+SPOOL_THRESHOLD_BYTES = int(os.getenv('UPLOAD_SPOOL_THRESHOLD_MB', '8')) * 1024 * 1024
+
+# Directory for spool files (system temp dir when unset)
+SPOOL_DIR = os.getenv('UPLOAD_SPOOL_DIR') or None
+
+# Copy size when spooling
+SPOOL_CHUNK_BYTES = 1024 * 1024
+
+class MappedFile(mmap.mmap):
+    """Read-only memory map that also passes for a binary file object (zipfile, pandas)"""
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def writable(self):
+        return False
+
+def upload_size(uploaded_file):
+    """Size of an uploaded file in bytes without reading it"""
+    position = uploaded_file.tell()
+    size = uploaded_file.seek(0, io.SEEK_END)
+    uploaded_file.seek(position)
+    return size
+
+@contextmanager
+def spooled_upload(uploaded_file, threshold=SPOOL_THRESHOLD_BYTES):
+    """Yield the upload's bytes as a memoryview (small) or a MappedFile (large).
+
+    Both are bytes-like for hashing and regex scanning; MappedFile can also be
+    handed to zipfile. The yielded object is only valid inside the block.
+    """
+    if upload_size(uploaded_file) <= threshold:
+        buffer = uploaded_file.getbuffer()
+        try:
+            yield buffer
+        finally:
+            buffer.release()
+        return
+
+    with tempfile.TemporaryFile(prefix='upload-', dir=SPOOL_DIR) as spool:
+        uploaded_file.seek(0)
+        shutil.copyfileobj(uploaded_file, spool, SPOOL_CHUNK_BYTES)
+        spool.flush()
+        uploaded_file.seek(0)
+
+        mapped = MappedFile(spool.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield mapped
+        finally:
+            mapped.close()
@@ -0,0 +1,103 @@
+# Server-start warm-up so the first user after a restart isn't the slow one
+# Imports the heavy libraries, exercises the parser and RTF formatter once (so
+# their regular expressions are compiled and cached), opens a pooled
+# connection to the converter, builds the DOCX template and runs MSAL
+# authority discovery. serve.py starts this as the server boots; the app also
+# starts it once per process in case it was launched with `streamlit run`.
+
+import os
+import time
+import importlib
+import threading
+
+# Set WARMUP_ON_START=0 to skip warm-up (e.g. when the converter is offline in development)
+WARMUP_ENABLED = os.getenv('WARMUP_ON_START', '1') != '0'
+
+# Modules the first request would otherwise wait on, heaviest first
+WARMUP_MODULES = (
+    'pandas', 'docx', 'msal', 'requests', 'openpyxl',
+    'examsoft_core', 'processing_pipeline', 'extractor_registry', 'answer_key_reader',
+    'converter_client', 'artifact_store', 'download_bundle', 'safe_formatter',
+)
+
+# Small exam exercising the MC, asterisk and essay paths of the parser
+SAMPLE_QUESTIONS = """1. Which court hears appeals from the district courts?
+A. The state supreme court
+*B. The circuit court of appeals
+C. The county court
+D. The tax court
+
+2. Discuss the elements of negligence.
+"""
+
+_warmup_lock = threading.Lock()
+_warmup_thread = None
+
+def preload_modules():
+    """Import the heavy modules; missing optional ones are skipped"""
+    for name in WARMUP_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            print(f"⚠️ Warm-up skipped {name}: {e}")
+
+def warm_regex_tables():
+    """Parse and format a sample exam so the parser's patterns are compiled and cached"""
+    from examsoft_core import (
+        parse_questions_from_text, parse_answer_key_with_header_detection,
+        create_rtf_content, find_answer_mismatches
+    )
+    answer_key = parse_answer_key_with_header_detection("1. B\n2. Essay")
+    for use_asterisk_method in (True, False):
+        questions = parse_questions_from_text(SAMPLE_QUESTIONS, answer_key, use_asterisk_method)
+        create_rtf_content(questions, answer_key, not use_asterisk_method)
+        find_answer_mismatches(questions, answer_key, use_asterisk_method)
+
+def warm_converter():
+    """Open a keep-alive connection to the converter"""
+    from converter_client import warm_up
+    return warm_up()
+
+def warm_docx_template():
+    """Build the blank DOCX template both generated files start from"""
+    from examsoft_core.docx_writer import warm_up
+    warm_up()
+
+def warm_msal():
+    """Cache MSAL authority discovery for the first sign-in"""
+    from persistent_auth import warm_up_msal
+    return warm_up_msal()
+
+WARMUP_STEPS = (
+    ("modules", preload_modules),
+    ("regex tables", warm_regex_tables),
+    ("DOCX template", warm_docx_template),
+    ("converter connection", warm_converter),
+    ("MSAL discovery", warm_msal),
+)
+
+def run_warmup():
+    """Run every warm-up step, logging failures, and return {step: seconds}"""
+    timings = {}
+    for name, step in WARMUP_STEPS:
+        started = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            print(f"⚠️ Warm-up step '{name}' failed: {e}")
+        timings[name] = time.perf_counter() - started
+
+    summary = ', '.join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in timings.items())
+    print(f"🔥 Warm-up finished: {summary}")
+    return timings
+
+def start_warmup():
+    """Start warm-up in a background thread once per process; returns the thread or None"""
+    global _warmup_thread
+    if not WARMUP_ENABLED:
+        return None
+    with _warmup_lock:
+        if _warmup_thread is None:
+            _warmup_thread = threading.Thread(target=run_warmup, name='warmup', daemon=True)
+            _warmup_thread.start()
+        return _warmup_thread
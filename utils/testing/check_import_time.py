@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Check that the formatting core imports quickly and without heavy libraries
+
+Runs `python -X importtime -c "import examsoft_core"` from streamlit-app/ and
+fails if the cumulative import time is over budget or if Streamlit, pandas,
+python-docx, requests or msal were imported along the way.
+
+Usage: python utils/testing/check_import_time.py [budget_ms]
+"""
+
+import os
+import sys
+import subprocess
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'streamlit-app')
+
+# Cumulative import time allowed for the core package
+BUDGET_MS = float(os.getenv('CORE_IMPORT_BUDGET_MS', '100'))
+
+# Modules the core must only load on first use
+HEAVY_MODULES = ('streamlit', 'pandas', 'docx', 'requests', 'msal', 'openpyxl', 'odf')
+
+# Runs per check; the fastest is reported so a noisy run doesn't fail the check
+RUNS = 3
+
+def measure_import(module='examsoft_core'):
+    """Return (cumulative microseconds for the module, set of top-level packages imported)"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=APP_DIR, capture_output=True, text=True, check=True
+    )
+
+    cumulative = None
+    imported = set()
+    for line in result.stderr.splitlines():
+        # "import time:   self [us] | cumulative | imported package"
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative_us, name = (part.strip() for part in line[len('import time:'):].split('|'))
+        if not cumulative_us.isdigit():
+            continue
+        imported.add(name.split('.')[0])
+        if name == module:
+            cumulative = int(cumulative_us)
+    return cumulative, imported
+
+def main():
+    budget_ms = float(sys.argv[1]) if len(sys.argv) > 1 else BUDGET_MS
+
+    best_ms = None
+    imported = set()
+    for _ in range(RUNS):
+        cumulative, imported = measure_import()
+        if cumulative is None:
+            print("❌ examsoft_core was not imported")
+            return 1
+        run_ms = cumulative / 1000
+        best_ms = run_ms if best_ms is None else min(best_ms, run_ms)
+
+    heavy = sorted(name for name in HEAVY_MODULES if name in imported)
+
+    print(f"import examsoft_core: {best_ms:.1f} ms (budget {budget_ms:.0f} ms)")
+    if heavy:
+        print(f"❌ Heavy modules imported at load time: {', '.join(heavy)}")
+    if best_ms > budget_ms:
+        print("❌ Import time over budget")
+    if heavy or best_ms > budget_ms:
+        return 1
+
+    print("✅ Core import is within budget")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())